@@ -1,4 +1,5 @@
 from django.db import models
+from django.contrib.postgres.indexes import BrinIndex
 from django.utils.translation import ugettext_lazy as _
 
 from apps.common.constants import (
@@ -29,6 +30,7 @@ class Order(models.Model):
         BOOKED = 'BOOKED', _('Забронирован')
         ACTIVE = 'ACTIVE', _('Активен')
         COMPLETED = 'COMPLETED', _('Завершен')
+        CANCELING = 'CANCELING', _('Отмена')
         CANCELED = 'CANCELED', _('Отменен')
         REJECTED = 'REJECTED', _('Отклонен банком')
         ON_REINIT = 'ON_REINIT', _('На реинициализации')
@@ -49,6 +51,16 @@ class Order(models.Model):
         auto_now_add=True,
         verbose_name=_('Created at'),
     )
+    # Версия данных заказа. Увеличивается при каждой смене статуса
+    # и изменении заказа. Используется для условных GET-запросов.
+    version = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Version'),
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name=_('Updated at'),
+    )
     amount = models.DecimalField(
         max_digits=FieldConstraint.MONEY_DECIMAL_DIGITS,
         decimal_places=FieldConstraint.MONEY_DECIMAL_PLACES,
@@ -101,6 +113,10 @@ class Order(models.Model):
     class Meta:
         verbose_name = _('Order')
         verbose_name_plural = _('Orders')
+        indexes = [
+            # Для keyset-пагинации списков заказов.
+            models.Index(fields=['-created_at', '-id'], name='order_created_at_id_idx'),
+        ]
 
     def __str__(self):
         return f'{self.vehicle.model} {self.status} {self.starts_at} {self.ends_at}'
@@ -118,6 +134,294 @@ class Order(models.Model):
         return self.return_district == District.PICKUP
 
 
+class OrderPipelineCheckpoint(models.Model):
+    """
+    Модель контрольной точки запуска пайплайна заказа.
+
+    Одна запись на этап в рамках одного запуска. Запуск определяется
+    заказом, его платежом и начальным этапом (см. `OrderPipelineCheckpointService.get_run_id`),
+    а не ID задачи Celery. По успешно выполненным этапам запуск
+    продолжается с места остановки любой задачей.
+    """
+
+    class Outcome(models.TextChoices):
+        """Результаты выполнения этапа"""
+
+        STARTED = 'STARTED', _('Выполняется')
+        SUCCESS = 'SUCCESS', _('Выполнен')
+        FAILED = 'FAILED', _('Ошибка')
+
+    run_id = models.CharField(
+        max_length=64,
+        verbose_name=_('Run ID'),
+    )
+    order = models.ForeignKey(
+        'rent.Order',
+        on_delete=models.CASCADE,
+        related_name='pipeline_checkpoints',
+        verbose_name=_('Order'),
+    )
+    stage = models.CharField(
+        max_length=32,
+        verbose_name=_('Stage'),
+    )
+    outcome = models.CharField(
+        max_length=7,
+        choices=Outcome.choices,
+        default=Outcome.STARTED,
+        verbose_name=_('Outcome'),
+    )
+    duration = models.FloatField(
+        null=True,
+        verbose_name=_('Duration'),
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_('Created at'),
+    )
+
+    class Meta:
+        verbose_name = _('Order pipeline checkpoint')
+        verbose_name_plural = _('Order pipeline checkpoints')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['run_id', 'stage'],
+                name='order_pipeline_checkpoint_run_stage_unique',
+            ),
+            # Одновременно у заказа может выполняться только один этап.
+            # Так обнаруживаются параллельные дубли запуска пайплайна.
+            models.UniqueConstraint(
+                fields=['order'],
+                condition=models.Q(outcome='STARTED'),
+                name='order_pipeline_checkpoint_single_started',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.run_id} {self.stage} {self.outcome}'
+
+
+class OrderLease(models.Model):
+    """
+    Модель аренды (lease) блокировки заказа.
+
+    Пока аренда не истекла, обрабатывать заказ может только ее владелец.
+    Если владелец упал, не освободив блокировку, она освобождается
+    сама по истечении срока.
+    """
+
+    order = models.OneToOneField(
+        'rent.Order',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='lease',
+        verbose_name=_('Order'),
+    )
+    owner = models.CharField(
+        max_length=128,
+        verbose_name=_('Owner'),
+    )
+    expires_at = models.DateTimeField(
+        verbose_name=_('Expires at'),
+    )
+
+    class Meta:
+        verbose_name = _('Order lease')
+        verbose_name_plural = _('Order leases')
+
+    def __str__(self) -> str:
+        return f'{self.order_id} {self.owner} {self.expires_at}'
+
+
+class OrderStatusTransition(models.Model):
+    """
+    Модель записи журнала переходов статусов заказа.
+
+    Журнал только пополняется. Запись добавляется тем же запросом,
+    которым меняется статус заказа (см. `OrderStatusService`).
+    Записи идут в порядке времени, поэтому по времени используется
+    компактный BRIN-индекс.
+    """
+
+    order = models.ForeignKey(
+        'rent.Order',
+        on_delete=models.CASCADE,
+        related_name='status_transitions',
+        verbose_name=_('Order'),
+    )
+    from_status = models.CharField(
+        max_length=23,
+        choices=Order.Status.choices,
+        verbose_name=_('From status'),
+    )
+    to_status = models.CharField(
+        max_length=23,
+        choices=Order.Status.choices,
+        verbose_name=_('To status'),
+    )
+    created_at = models.DateTimeField(
+        verbose_name=_('Created at'),
+    )
+    # Кто сменил статус: менеджер, клиент, задача, банк.
+    actor = models.CharField(
+        max_length=64,
+        blank=True,
+        verbose_name=_('Actor'),
+    )
+    # Пайп, в котором сменился статус.
+    pipe = models.CharField(
+        max_length=64,
+        blank=True,
+        verbose_name=_('Pipe'),
+    )
+
+    class Meta:
+        verbose_name = _('Order status transition')
+        verbose_name_plural = _('Order status transitions')
+        indexes = [
+            BrinIndex(fields=['created_at'], name='order_status_trans_brin_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.order_id} {self.from_status} -> {self.to_status} {self.created_at}'
+
+
+class OrderStatusRollup(models.Model):
+    """
+    Модель дневной сводки по статусу заказов.
+
+    Строится по журналу переходов периодической задачей
+    и используется для воронки и задержек в дашборде менеджера.
+    """
+
+    day = models.DateField(
+        verbose_name=_('Day'),
+    )
+    status = models.CharField(
+        max_length=23,
+        choices=Order.Status.choices,
+        verbose_name=_('Status'),
+    )
+    # Кол-во переходов в статус за день.
+    entered_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Entered count'),
+    )
+    # Кол-во переходов из статуса за день.
+    exited_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Exited count'),
+    )
+    # Суммарное и максимальное время нахождения в статусе
+    # заказов, вышедших из него за день, в секундах.
+    dwell_seconds_total = models.FloatField(
+        default=0,
+        verbose_name=_('Total dwell seconds'),
+    )
+    dwell_seconds_max = models.FloatField(
+        default=0,
+        verbose_name=_('Max dwell seconds'),
+    )
+
+    class Meta:
+        verbose_name = _('Order status rollup')
+        verbose_name_plural = _('Order status rollups')
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'status'], name='order_status_rollup_day_status_unique'),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.day} {self.status}'
+
+
+class OrderNotice(models.Model):
+    """
+    Модель уведомления о заказе в исходящей очереди (outbox).
+
+    Уведомление записывается в той же транзакции, что и смена статуса
+    заказа, а отправляется отдельной задачей (см. `OrderNoticeOutbox`).
+    Так задержки и сбои SMS и push-сервисов не влияют на обработку заказа.
+    """
+
+    class Kind(models.TextChoices):
+        """Виды уведомлений"""
+
+        ORDER_AWAIT_PAYMENT = 'ORDER_AWAIT_PAYMENT', _('Ожидание оплаты')
+        ORDER_WITHOUT_DOCS = 'ORDER_WITHOUT_DOCS', _('Заказ без документов')
+        DOCUMENTS_VERIFY_FAILED = 'DOCUMENTS_VERIFY_FAILED', _('Ошибка проверки документов')
+        ORDER_CONFIRMED = 'ORDER_CONFIRMED', _('Заказ подтвержден')
+        ORDER_CANCELED = 'ORDER_CANCELED', _('Заказ отменен')
+
+    class Status(models.TextChoices):
+        """Статусы отправки уведомления"""
+
+        PENDING = 'PENDING', _('Ожидает отправки')
+        SENT = 'SENT', _('Отправлено')
+        SKIPPED = 'SKIPPED', _('Пропущено как дубль')
+        FAILED = 'FAILED', _('Ошибка отправки')
+
+    order = models.ForeignKey(
+        'rent.Order',
+        on_delete=models.CASCADE,
+        related_name='notices',
+        verbose_name=_('Order'),
+    )
+    kind = models.CharField(
+        max_length=23,
+        choices=Kind.choices,
+        verbose_name=_('Kind'),
+    )
+    # Ключ дедупликации от вызывающего кода. Дублями считаются только
+    # уведомления с одинаковым ключом (см. `OrderNoticeOutbox`).
+    dedup_key = models.CharField(
+        max_length=64,
+        blank=True,
+        default='',
+        verbose_name=_('Dedup key'),
+    )
+    status = models.CharField(
+        max_length=7,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name=_('Status'),
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name=_('Attempts'),
+    )
+    # Время следующей попытки отправки. Также служит арендой
+    # уведомления, взятого в отправку одним из воркеров.
+    next_attempt_at = models.DateTimeField(
+        verbose_name=_('Next attempt at'),
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name=_('Last error'),
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_('Created at'),
+    )
+    sent_at = models.DateTimeField(
+        null=True,
+        verbose_name=_('Sent at'),
+    )
+
+    class Meta:
+        verbose_name = _('Order notice')
+        verbose_name_plural = _('Order notices')
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at'],
+                condition=models.Q(status='PENDING'),
+                name='order_notice_pending_idx',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.order_id} {self.kind} {self.status}'
+
+
 # NOTE: Более лучшее решение было бы - полностью разделить
 #   периоды брони и заказы. Тогда мы бы имели возможность
 #   управлять периодами брони и связывать их с нужными заказами
@@ -3,7 +3,12 @@ from typing_extensions import Self
 from django.db import transaction
 from rest_framework.serializers import Serializer
 
-from ...models.order import TempBookedPeriod
+from apps.tinkoff_payments.services.payment_initialization.enums import PaymentStrategyType
+
+from ...models.order import (
+    Order,
+    TempBookedPeriod,
+)
 from ...services.rent.order_pipeline.dto import PipeOrderDTO
 from .order_pipeline.exceptions import NoResultOrderPipeException
 from ...services.rent.order_pipeline.pipes import InitPaymentSessionPipe
@@ -58,6 +63,25 @@ class CreateOrderServiceForAPI:
         # Проверка на бронь не нужна, т.к. она заложена в сериализаторе.
         self.__temp_booked_period = self.__temp_period_service.to_book(unsafe=True)
 
+    @transaction.atomic
+    def create_order(self) -> Order:
+        """
+        Создание заказа без инициализации платежа.
+
+        Используется при асинхронном создании заказа: платежная сессия
+        инициализируется позже задачей `order_init_payment_task`.
+        Заказ в статусе `NEW` уже занимает даты аренды.
+
+        :return: Созданный заказ.
+        """
+
+        return self.__serializer.save()
+
+    def get_payment_strategy(self) -> PaymentStrategyType:
+        """Получение выбранной стратегии оплаты"""
+
+        return self.__serializer.validated_data['payment_strategy']
+
     @transaction.atomic
     def create_order_and_init_payment(self) -> PipeOrderDTO:
         """
@@ -74,7 +98,7 @@ class CreateOrderServiceForAPI:
 
         # Инициализация платежной сессии с банком и сохранение данных в БД.
         init_payment_pipe = InitPaymentSessionPipe(
-            payment_strategy=self.__serializer.validated_data['payment_strategy'],
+            payment_strategy=self.get_payment_strategy(),
         )
         init_payment_pipe.invoke(PipeOrderDTO(order=new_order))
 
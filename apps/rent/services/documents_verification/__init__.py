@@ -0,0 +1,22 @@
+"""
+Пакет для кэширования результатов проверки документов клиентов.
+
+Проверка паспорта и водительского удостоверения идет через внешние
+сервисы и занимает много времени. Положительный результат проверки
+сохраняется в `DocumentsVerificationCache` и переиспользуется для
+следующих заказов клиента, пока не истек срок или не изменились документы.
+
+Сама проверка разбита на независимые проверки `DocumentCheck`, которые
+выполняет `DocumentChecksRunner`.
+"""
+
+from .cache import DocumentsVerificationCache
+from .checks import (
+    DocumentCheck,
+    FullDocumentsCheck,
+)
+from .runner import (
+    DocumentChecksRunner,
+    DocumentCheckResult,
+    DocumentsVerificationResult,
+)
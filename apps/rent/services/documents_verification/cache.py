@@ -0,0 +1,201 @@
+import hashlib
+import threading
+from typing import Final
+
+from django.conf import settings
+from django.core.cache import caches
+
+from apps.users.models.client_profile import ClientProfile
+
+from utils.caching import CacheStats
+
+from .runner import DocumentChecksRunner
+
+
+class DocumentsVerificationCache:
+    """
+    Кэш положительных результатов проверки документов клиентов.
+
+    Ключ - ID профиля клиента. Вместе с результатом хранится отпечаток
+    документов: хэш значений полей профиля, которые читают проверки
+    (`DocumentCheck.fields`). Если документы изменились, отпечаток
+    не совпадет, и результат считается промахом. Изменение остальных полей
+    профиля результат не сбрасывает. Отрицательные результаты не кэшируются,
+    т.к. клиент может исправить документы.
+
+    Кэш общий для всех процессов (алиас кэша Django из настройки
+    `RENT_DOCUMENTS_VERIFICATION_CACHE`), счетчики попаданий тоже.
+    Чтобы не делать лишних запросов к кэшу на каждую проверку, счетчики
+    копятся в памяти процесса и сбрасываются в общий кэш пачками
+    по `_STATS_FLUSH_EVERY` обращений.
+    Время жизни результата задается настройкой
+    `RENT_DOCUMENTS_VERIFICATION_CACHE_TTL`. Если оно равно 0, кэш отключен.
+    """
+
+    _KEY_TEMPLATE: Final[str] = 'rent:documents_verification:{client_profile_id}'
+    _COUNTER_KEY_TEMPLATE: Final[str] = 'rent:documents_verification:stats:{counter}'
+    _DEFAULT_TTL: Final[int] = 24 * 60 * 60
+    _STATS_FLUSH_EVERY: Final[int] = 50
+
+    # Поля профиля, которые не относятся к документам. Используются,
+    # если какая-либо проверка не объявила читаемые поля.
+    _DEFAULT_EXCLUDED_FIELDS: Final[tuple[str, ...]] = ('id', 'user', 'created_at', 'updated_at')
+
+    # Несброшенные счетчики текущего процесса.
+    __pending_stats: dict[str, int] = {'hits': 0, 'misses': 0}
+    __stats_lock = threading.Lock()
+
+    @classmethod
+    def is_verified(cls, client: ClientProfile) -> bool:
+        """
+        Проверка, что документы клиента уже успешно проверены.
+
+        :param client: Профиль клиента.
+
+        :return: Есть свежий положительный результат для текущих документов.
+        """
+
+        if not cls.get_ttl():
+            return False
+
+        fingerprint = cls.__get_cache().get(cls.__get_key(client.pk))
+        is_hit = fingerprint is not None and fingerprint == cls.get_fingerprint(client)
+        cls.__count('hits' if is_hit else 'misses')
+
+        return is_hit
+
+    @classmethod
+    def set_verified(cls, client: ClientProfile) -> None:
+        """
+        Сохранение положительного результата проверки документов.
+
+        Отпечаток снимается с профиля после проверки, т.к. сервис
+        проверки может обновить поля профиля.
+
+        :param client: Профиль клиента.
+        """
+
+        ttl = cls.get_ttl()
+        if ttl:
+            cls.__get_cache().set(cls.__get_key(client.pk), cls.get_fingerprint(client), ttl)
+
+    @classmethod
+    def invalidate(cls, client_profile_id: int) -> None:
+        """
+        Сброс результата проверки документов клиента.
+
+        :param client_profile_id: ID профиля клиента.
+        """
+
+        cls.__get_cache().delete(cls.__get_key(client_profile_id))
+
+    @classmethod
+    def get_fingerprint(cls, client: ClientProfile) -> str:
+        """
+        Получение отпечатка документов клиента.
+
+        Строится по названиям проверок и значениям полей профиля, которые
+        они читают. Если какая-либо проверка не объявила поля, берутся все
+        поля профиля, кроме перечисленных в настройке
+        `RENT_DOCUMENTS_VERIFICATION_EXCLUDED_FIELDS`. Для файлов берется путь
+        к файлу, поэтому загрузка нового скана меняет отпечаток.
+
+        :param client: Профиль клиента.
+        """
+
+        checks = DocumentChecksRunner.get_default_checks()
+        field_names: set[str] = set()
+        for check in checks:
+            check_fields = check.get_fields()
+            if not check_fields:
+                field_names = cls.__get_document_field_names(client)
+                break
+
+            field_names.update(check_fields)
+
+        values = [f'checks={",".join(sorted(check.name for check in checks))}'] + [
+            f'{name}={client._meta.get_field(name).value_to_string(client)}'
+            for name in sorted(field_names)
+        ]
+
+        return hashlib.sha256('\n'.join(values).encode()).hexdigest()
+
+    @classmethod
+    def get_stats(cls) -> CacheStats:
+        """
+        Получение статистики попаданий по всем процессам.
+
+        Не учитывает несброшенные счетчики других процессов.
+        """
+
+        counters = cls.__get_cache().get_many([
+            cls._COUNTER_KEY_TEMPLATE.format(counter=counter)
+            for counter in ('hits', 'misses')
+        ])
+        with cls.__stats_lock:
+            pending_stats = dict(cls.__pending_stats)
+
+        return CacheStats(
+            hits=counters.get(cls._COUNTER_KEY_TEMPLATE.format(counter='hits'), 0) + pending_stats['hits'],
+            misses=counters.get(cls._COUNTER_KEY_TEMPLATE.format(counter='misses'), 0) + pending_stats['misses'],
+            size=0,
+        )
+
+    @classmethod
+    def get_ttl(cls) -> int:
+        """Получение времени жизни результата в секундах"""
+
+        return getattr(settings, 'RENT_DOCUMENTS_VERIFICATION_CACHE_TTL', cls._DEFAULT_TTL)
+
+    @classmethod
+    def __count(cls, counter: str) -> None:
+        """Учет попадания или промаха"""
+
+        with cls.__stats_lock:
+            cls.__pending_stats[counter] += 1
+            if sum(cls.__pending_stats.values()) < cls._STATS_FLUSH_EVERY:
+                return
+
+            pending_stats, cls.__pending_stats = cls.__pending_stats, {'hits': 0, 'misses': 0}
+
+        cache = cls.__get_cache()
+        for name, delta in pending_stats.items():
+            if not delta:
+                continue
+
+            key = cls._COUNTER_KEY_TEMPLATE.format(counter=name)
+            # `add` не перезаписывает счетчик, созданный другим процессом.
+            if not cache.add(key, delta, timeout=None):
+                try:
+                    cache.incr(key, delta)
+                except ValueError:
+                    # Счетчик вытеснен между `add` и `incr`.
+                    cache.add(key, delta, timeout=None)
+
+    @classmethod
+    def __get_document_field_names(cls, client: ClientProfile) -> set[str]:
+        """Получение всех полей профиля, относящихся к документам"""
+
+        excluded_fields = getattr(
+            settings,
+            'RENT_DOCUMENTS_VERIFICATION_EXCLUDED_FIELDS',
+            cls._DEFAULT_EXCLUDED_FIELDS,
+        )
+
+        return {
+            field.name
+            for field in client._meta.concrete_fields
+            if field.name not in excluded_fields
+        }
+
+    @staticmethod
+    def __get_cache():
+        """Получение кэша Django для результатов проверки"""
+
+        return caches[getattr(settings, 'RENT_DOCUMENTS_VERIFICATION_CACHE', 'default')]
+
+    @classmethod
+    def __get_key(cls, client_profile_id: int) -> str:
+        """Получение ключа результата в кэше"""
+
+        return cls._KEY_TEMPLATE.format(client_profile_id=client_profile_id)
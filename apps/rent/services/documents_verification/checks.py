@@ -0,0 +1,81 @@
+from abc import (
+    ABC,
+    abstractmethod,
+)
+
+from django.conf import settings
+
+from apps.users.models.client_profile import ClientProfile
+from apps.users.services.documents_verification import ClientDocumentsVerificationService
+
+
+class DocumentCheck(ABC):
+    """
+    Абстрактный класс независимой проверки документов клиента.
+
+    Проверки выполняются по очереди (см. `DocumentChecksRunner`), но
+    проверка не должна зависеть от результатов других проверок и не должна
+    хранить состояние в объекте.
+    """
+
+    # Уникальное название проверки для результатов и метрик.
+    name: str = ''
+
+    # Ожидаемое время выполнения проверки в секундах. Проверка не прерывается,
+    # превышение попадает в журнал. Если None, не отслеживается.
+    expected_duration: float | None = None
+
+    # Поля профиля клиента, которые читает проверка. По ним строится отпечаток
+    # документов в `DocumentsVerificationCache`. Пустой кортеж - все поля профиля.
+    fields: tuple[str, ...] = ()
+
+    def get_fields(self) -> tuple[str, ...]:
+        """Получение полей профиля клиента, которые читает проверка"""
+
+        return self.fields
+
+    @abstractmethod
+    def run(self, client: ClientProfile) -> bool:
+        """
+        Выполнение проверки.
+
+        :param client: Профиль клиента.
+
+        :return: Документы прошли проверку.
+        """
+
+        raise NotImplementedError()
+
+
+class FullDocumentsCheck(DocumentCheck):
+    """
+    Полная проверка документов клиента одним вызовом
+    `ClientDocumentsVerificationService.verify`.
+
+    Проверка по умолчанию. Отдельные проверки (паспорт, водительское
+    удостоверение) подключаются настройкой `RENT_DOCUMENT_CHECKS`.
+
+    Поля профиля, которые читает сервис проверки, задаются настройкой
+    `RENT_FULL_DOCUMENTS_CHECK_FIELDS`.
+    """
+
+    name = 'full'
+    expected_duration = 90
+
+    def get_fields(self) -> tuple[str, ...]:
+        """Получение полей профиля клиента, которые читает проверка"""
+
+        return tuple(getattr(settings, 'RENT_FULL_DOCUMENTS_CHECK_FIELDS', self.fields))
+
+    def run(self, client: ClientProfile) -> bool:
+        """
+        Выполнение проверки.
+
+        :param client: Профиль клиента.
+
+        :return: Документы прошли проверку.
+        """
+
+        ClientDocumentsVerificationService().verify(client)
+
+        return client.is_full_verified_profile
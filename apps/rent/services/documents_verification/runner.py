@@ -0,0 +1,170 @@
+import time
+import logging
+from collections import Counter
+from dataclasses import (
+    field,
+    dataclass,
+)
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from utils.pipelines import PipeMetrics
+
+from apps.users.models.client_profile import ClientProfile
+
+from .checks import (
+    DocumentCheck,
+    FullDocumentsCheck,
+)
+from ..order_pipeline.instrumentation import get_order_pipeline_metrics_hook
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DocumentCheckResult:
+    """
+    Результат одной проверки документов.
+
+    :param name: Название проверки.
+    :param passed: Документы прошли проверку либо None, если проверка не выполнялась или упала.
+    :param duration: Время выполнения проверки в секундах.
+    :param error: Исключение проверки.
+    """
+
+    name: str
+    passed: bool | None
+    duration: float
+    error: BaseException | None = None
+
+
+@dataclass
+class DocumentsVerificationResult:
+    """
+    Результат проверки документов клиента.
+
+    :param checks: Результаты проверок, в т.ч. незавершенных.
+    """
+
+    checks: list[DocumentCheckResult] = field(default_factory=list)
+
+    @property
+    def failed(self) -> bool:
+        """Хотя бы одна проверка завершилась с отрицательным результатом"""
+
+        return any(check.passed is False for check in self.checks)
+
+    @property
+    def errors(self) -> list[DocumentCheckResult]:
+        """Проверки, завершившиеся ошибкой"""
+
+        return [check for check in self.checks if check.error is not None]
+
+    @property
+    def verified(self) -> bool:
+        """Все проверки завершились с положительным результатом"""
+
+        return bool(self.checks) and all(check.passed for check in self.checks)
+
+
+class DocumentChecksRunner:
+    """
+    Последовательный запуск независимых проверок документов клиента.
+
+    Проверки задаются путями к классам в настройке `RENT_DOCUMENT_CHECKS`
+    (по умолчанию `FullDocumentsCheck`). Если какая-либо проверка дала
+    отрицательный результат, следующие проверки не запускаются: результат
+    уже известен.
+
+    Проверки не прерываются: время внешних вызовов ограничивают таймауты
+    их HTTP-клиентов. Проверка, выполнявшаяся дольше
+    `DocumentCheck.expected_duration`, попадает в журнал.
+
+    Время каждой проверки передается получателю метрик пайплайна заказа.
+    """
+
+    def __init__(self, checks: list[DocumentCheck] | None = None) -> None:
+        """
+        Инициализатор класса.
+
+        :param checks: Проверки. По умолчанию из настройки `RENT_DOCUMENT_CHECKS`.
+
+        :raises ValueError: Если у проверок совпадают названия.
+        """
+
+        self.__checks = checks if checks is not None else self.get_default_checks()
+
+        # Результаты проверок собираются по названиям.
+        duplicate_names = [
+            name
+            for name, count in Counter(check.name for check in self.__checks).items()
+            if count > 1
+        ]
+        if duplicate_names:
+            raise ValueError(f'Проверки документов с одинаковыми названиями: {", ".join(duplicate_names)}')
+
+        self.__metrics_hook = get_order_pipeline_metrics_hook()
+
+    def run(self, client: ClientProfile) -> DocumentsVerificationResult:
+        """
+        Проверка документов клиента.
+
+        :param client: Профиль клиента.
+
+        :return: Результаты проверок, в т.ч. не запущенных.
+        """
+
+        result = DocumentsVerificationResult()
+
+        for check in self.__checks:
+            if result.failed:
+                # Результат уже отрицательный: проверка не запускается.
+                result.checks.append(DocumentCheckResult(name=check.name, passed=None, duration=0))
+                continue
+
+            result.checks.append(self.__run_check(check, client))
+
+        return result
+
+    def __run_check(self, check: DocumentCheck, client: ClientProfile) -> DocumentCheckResult:
+        """Выполнение одной проверки с замером времени"""
+
+        wall_started_at = time.perf_counter()
+        cpu_started_at = time.thread_time()
+        passed: bool | None = None
+        error: BaseException | None = None
+
+        try:
+            passed = check.run(client)
+        except Exception as e:
+            error = e
+
+        duration = time.perf_counter() - wall_started_at
+        if check.expected_duration is not None and duration > check.expected_duration:
+            logger.warning(
+                f'Проверка документов {check.name} выполнялась {duration:.1f} с '
+                f'при ожидаемых {check.expected_duration} с'
+            )
+
+        self.__metrics_hook.on_pipe_executed(
+            PipeMetrics(
+                pipe_name=f'DocumentCheck:{check.name}',
+                wall_time=duration,
+                cpu_time=time.thread_time() - cpu_started_at,
+                error=error,
+            )
+        )
+
+        return DocumentCheckResult(name=check.name, passed=passed, duration=duration, error=error)
+
+    @staticmethod
+    def get_default_checks() -> list[DocumentCheck]:
+        """Получение проверок из настройки `RENT_DOCUMENT_CHECKS`"""
+
+        check_paths = getattr(settings, 'RENT_DOCUMENT_CHECKS', None)
+        if check_paths is None:
+            return [FullDocumentsCheck()]
+
+        return [import_string(check_path)() for check_path in check_paths]
@@ -0,0 +1,13 @@
+"""
+Пакет для блокировки заказов на время обработки.
+
+Пайплайн заказа и ручные действия менеджера над заказом должны
+выполняться под блокировкой `OrderLockService.lock`, чтобы один заказ
+не обрабатывался параллельно (например, платеж не подтверждался дважды).
+"""
+
+from .service import OrderLockService
+from .exceptions import (
+    OrderLockedException,
+    OrderLockLostException,
+)
@@ -0,0 +1,22 @@
+class OrderLockedException(Exception):
+    """Исключение, когда заказ заблокирован другим обработчиком"""
+
+    def __init__(self, order_id: int, *args, **kwargs) -> None:
+        """Инициализатор класса"""
+
+        self.order_id = order_id
+        self.message = f'Заказ №{order_id} уже обрабатывается, повторите попытку позже'
+
+        super().__init__(self.message)
+
+
+class OrderLockLostException(Exception):
+    """Исключение, когда аренда блокировки заказа перехвачена другим обработчиком"""
+
+    def __init__(self, order_id: int, *args, **kwargs) -> None:
+        """Инициализатор класса"""
+
+        self.order_id = order_id
+        self.message = f'Блокировка заказа №{order_id} истекла и перехвачена другим обработчиком'
+
+        super().__init__(self.message)
@@ -0,0 +1,181 @@
+import uuid
+from datetime import timedelta
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    Final,
+    Iterator,
+)
+
+from django.conf import settings
+from django.db import (
+    IntegrityError,
+    transaction,
+)
+from django.db.models import Q
+from django.utils import timezone
+
+from ...models import OrderLease
+from .exceptions import (
+    OrderLockedException,
+    OrderLockLostException,
+)
+
+
+class OrderLockService:
+    """
+    Сервис блокировки заказов на время обработки.
+
+    Блокировка - это аренда с ограниченным сроком в таблице `OrderLease`.
+    Обработка заказа (пайплайн, ручные действия менеджера) может длиться
+    дольше одной транзакции, поэтому блокировка строки заказа не подходит.
+
+    Захват выполняется одним условным запросом: истекшая аренда
+    перехватывается `UPDATE ... WHERE expires_at <= now()`, а отсутствующая
+    создается `INSERT`, который при гонке упирается в первичный ключ.
+    Блокировка не реентерабельна.
+
+    Длительная обработка продлевает аренду между этапами (`renew_held`),
+    поэтому аренда истекает только у зависшего обработчика. Если аренду
+    уже перехватил другой обработчик, продление выбрасывает
+    `OrderLockLostException`, и следующий этап не выполняется.
+    """
+
+    _DEFAULT_TTL: Final[int] = 10 * 60
+
+    # Блокировки, захваченные в текущем контексте через `lock`: ID заказа -> владелец.
+    __held: ContextVar[dict[int, str]] = ContextVar('order_lock_held', default={})
+
+    @classmethod
+    def acquire(cls, order_id: int, owner: str, ttl: int | None = None) -> bool:
+        """
+        Захват блокировки заказа.
+
+        Повторный захват тем же владельцем продлевает аренду, поэтому
+        у каждого выполнения обработки должен быть свой владелец.
+
+        :param order_id: ID заказа.
+        :param owner: Идентификатор владельца блокировки.
+        :param ttl: Срок аренды в секундах. По умолчанию из настройки `RENT_ORDER_LOCK_TTL`.
+
+        :return: Блокировка захвачена.
+        """
+
+        now = timezone.now()
+        expires_at = now + timedelta(seconds=ttl or cls.get_default_ttl())
+
+        taken_over = (
+            OrderLease.objects
+                .filter(Q(expires_at__lte=now) | Q(owner=owner), order_id=order_id)  # noqa: E131
+                .update(owner=owner, expires_at=expires_at)  # noqa: E131
+        )
+        if taken_over:
+            return True
+
+        try:
+            with transaction.atomic():
+                OrderLease.objects.create(order_id=order_id, owner=owner, expires_at=expires_at)
+        except IntegrityError:
+            return False
+
+        return True
+
+    @classmethod
+    def renew(cls, order_id: int, owner: str, ttl: int | None = None) -> bool:
+        """
+        Продление аренды блокировки заказа.
+
+        В отличие от `acquire` не перехватывает чужую аренду.
+
+        :param order_id: ID заказа.
+        :param owner: Идентификатор владельца блокировки.
+        :param ttl: Срок аренды в секундах. По умолчанию из настройки `RENT_ORDER_LOCK_TTL`.
+
+        :return: Аренда продлена, т.е. блокировка все еще у владельца.
+        """
+
+        expires_at = timezone.now() + timedelta(seconds=ttl or cls.get_default_ttl())
+
+        return bool(
+            OrderLease.objects
+                .filter(order_id=order_id, owner=owner)  # noqa: E131
+                .update(expires_at=expires_at)  # noqa: E131
+        )
+
+    @classmethod
+    def renew_held(cls, order_id: int) -> None:
+        """
+        Продление аренды блокировки заказа, захваченной в текущем контексте.
+
+        Вызывается между этапами длительной обработки. Если заказ
+        не заблокирован в текущем контексте, ничего не делает.
+
+        :param order_id: ID заказа.
+
+        :raises OrderLockLostException: Если аренду перехватил другой обработчик.
+        """
+
+        owner = cls.__held.get().get(order_id)
+        if owner is not None and not cls.renew(order_id, owner):
+            raise OrderLockLostException(order_id)
+
+    @classmethod
+    def is_held(cls, order_id: int) -> bool:
+        """
+        Проверка, что заказ заблокирован в текущем контексте через `lock`.
+
+        :param order_id: ID заказа.
+        """
+
+        return order_id in cls.__held.get()
+
+    @classmethod
+    def release(cls, order_id: int, owner: str) -> None:
+        """
+        Освобождение блокировки заказа.
+
+        Блокировка, перехваченная другим владельцем после истечения
+        аренды, не освобождается.
+
+        :param order_id: ID заказа.
+        :param owner: Идентификатор владельца блокировки.
+        """
+
+        OrderLease.objects.filter(order_id=order_id, owner=owner).delete()
+
+    @classmethod
+    @contextmanager
+    def lock(
+        cls,
+        order_id: int,
+        owner: str | None = None,
+        ttl: int | None = None,
+    ) -> Iterator[str]:
+        """
+        Контекстный менеджер блокировки заказа.
+
+        :param order_id: ID заказа.
+        :param owner: Идентификатор владельца. По умолчанию случайный.
+        :param ttl: Срок аренды в секундах.
+
+        :raises OrderLockedException: Если заказ заблокирован другим владельцем.
+
+        :return: Идентификатор владельца блокировки.
+        """
+
+        owner = owner or uuid.uuid4().hex
+        if not cls.acquire(order_id, owner, ttl):
+            raise OrderLockedException(order_id)
+
+        held_token = cls.__held.set({**cls.__held.get(), order_id: owner})
+        try:
+            yield owner
+        finally:
+            cls.__held.reset(held_token)
+            cls.release(order_id, owner)
+
+    @classmethod
+    def get_default_ttl(cls) -> int:
+        """Получение срока аренды по умолчанию в секундах"""
+
+        return getattr(settings, 'RENT_ORDER_LOCK_TTL', cls._DEFAULT_TTL)
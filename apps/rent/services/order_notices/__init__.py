@@ -0,0 +1,10 @@
+"""
+Пакет для отправки уведомлений о заказах через исходящую очередь.
+
+Пайпы и API не отправляют уведомления сами, а записывают их
+в очередь `OrderNoticeOutbox.enqueue` в той же транзакции, что и смену
+статуса заказа. Уведомления отправляет задача `order_notices_delivery_task`.
+"""
+
+from .outbox import OrderNoticeOutbox
+from .senders import get_notice_sender_class
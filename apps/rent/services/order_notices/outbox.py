@@ -0,0 +1,197 @@
+import logging
+from datetime import timedelta
+from collections import defaultdict
+from typing import (
+    Final,
+    Iterable,
+)
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from ...models import (
+    Order,
+    OrderNotice,
+)
+from .senders import get_notice_sender_class
+
+
+logger = logging.getLogger(__name__)
+
+
+class OrderNoticeOutbox:
+    """
+    Исходящая очередь уведомлений о заказах.
+
+    Уведомления записываются в таблицу `OrderNotice` в текущей транзакции,
+    поэтому уведомление о смене статуса появится, только если смена
+    статуса зафиксирована.
+
+    Отправка выполняется пачками: воркер забирает готовые к отправке
+    уведомления с `SELECT ... FOR UPDATE SKIP LOCKED` и продлевает им время
+    следующей попытки, чтобы другие воркеры не взяли их повторно. Затем
+    уведомления отправляются вне транзакции, сгруппированные по виду
+    (одним отправщиком на пачку).
+
+    Дубли (то же уведомление о том же заказе в пачке или недавно отправленное)
+    не отправляются. Уведомления с разными ключами дедупликации дублями
+    не считаются: так явная повторная отправка (например, менеджером)
+    не теряется. Неудачная отправка повторяется с экспоненциальной
+    задержкой, пока не исчерпано кол-во попыток.
+    """
+
+    _DEFAULT_BATCH_SIZE: Final[int] = 100
+    _DEFAULT_MAX_ATTEMPTS: Final[int] = 5
+    _DEFAULT_BACKOFF: Final[int] = 30
+    _DEFAULT_DEDUP_WINDOW: Final[int] = 60
+
+    # Время, на которое уведомления закрепляются за воркером.
+    _CLAIM_TTL: Final[int] = 5 * 60
+
+    @classmethod
+    def enqueue(cls, orders: Iterable[Order], kind: OrderNotice.Kind, dedup_key: str = '') -> None:
+        """
+        Постановка уведомлений о заказах в очередь.
+
+        :param orders: Заказы.
+        :param kind: Вид уведомления.
+        :param dedup_key:
+            Ключ дедупликации. Дублями считаются уведомления того же вида
+            о том же заказе только с тем же ключом. Например, ID платежа
+            для уведомления с платежной ссылкой либо уникальный ключ
+            для явной повторной отправки.
+        """
+
+        now = timezone.now()
+        OrderNotice.objects.bulk_create([
+            OrderNotice(order=order, kind=kind, dedup_key=dedup_key, next_attempt_at=now)
+            for order in orders
+        ])
+
+    @classmethod
+    def deliver_batch(cls) -> int:
+        """
+        Отправка пачки готовых к отправке уведомлений.
+
+        Размер пачки задается настройкой `RENT_ORDER_NOTICES_BATCH_SIZE`.
+
+        :return: Кол-во обработанных уведомлений.
+        """
+
+        notices = cls.__claim(cls.get_batch_size())
+        if not notices:
+            return 0
+
+        notices_by_kind: dict[str, list[OrderNotice]] = defaultdict(list)
+        for notice in cls.__skip_duplicates(notices):
+            notices_by_kind[notice.kind].append(notice)
+
+        for kind, kind_notices in notices_by_kind.items():
+            cls.__send(OrderNotice.Kind(kind), kind_notices)
+
+        OrderNotice.objects.bulk_update(
+            notices,
+            fields=['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at'],
+        )
+
+        return len(notices)
+
+    @classmethod
+    def get_batch_size(cls) -> int:
+        """Получение размера пачки отправляемых уведомлений"""
+
+        return getattr(settings, 'RENT_ORDER_NOTICES_BATCH_SIZE', cls._DEFAULT_BATCH_SIZE)
+
+    @classmethod
+    def __claim(cls, batch_size: int) -> list[OrderNotice]:
+        """Получение пачки уведомлений с закреплением за текущим воркером"""
+
+        now = timezone.now()
+
+        with transaction.atomic():
+            notice_ids = list(
+                OrderNotice.objects
+                    .select_for_update(skip_locked=True)  # noqa: E131
+                    .filter(status=OrderNotice.Status.PENDING, next_attempt_at__lte=now)  # noqa: E131
+                    .order_by('next_attempt_at')  # noqa: E131
+                    .values_list('pk', flat=True)[:batch_size]  # noqa: E131
+            )
+            OrderNotice.objects.filter(pk__in=notice_ids).update(
+                next_attempt_at=now + timedelta(seconds=cls._CLAIM_TTL),
+            )
+
+        return list(
+            OrderNotice.objects
+                .select_related('order__user', 'order__payment_data')  # noqa: E131
+                .filter(pk__in=notice_ids)  # noqa: E131
+                .order_by('pk')  # noqa: E131
+        )
+
+    @classmethod
+    def __skip_duplicates(cls, notices: list[OrderNotice]) -> list[OrderNotice]:
+        """
+        Пометка дублей уведомлений как пропущенных.
+
+        Дубль - уведомление того же вида о том же заказе с тем же ключом
+        дедупликации, которое уже есть в пачке или было отправлено за последние
+        `RENT_ORDER_NOTICES_DEDUP_WINDOW` секунд (например, при повторной
+        обработке заказа).
+
+        :return: Уведомления, которые нужно отправить.
+        """
+
+        dedup_window = getattr(settings, 'RENT_ORDER_NOTICES_DEDUP_WINDOW', cls._DEFAULT_DEDUP_WINDOW)
+        seen = set(
+            OrderNotice.objects
+                .filter(  # noqa: E131
+                    status=OrderNotice.Status.SENT,
+                    order_id__in={notice.order_id for notice in notices},
+                    sent_at__gte=timezone.now() - timedelta(seconds=dedup_window),
+                )
+                .values_list('order_id', 'kind', 'dedup_key')  # noqa: E131
+        )
+
+        to_send: list[OrderNotice] = []
+        for notice in notices:
+            key = (notice.order_id, notice.kind, notice.dedup_key)
+            if key in seen:
+                notice.status = OrderNotice.Status.SKIPPED
+                continue
+
+            seen.add(key)
+            to_send.append(notice)
+
+        return to_send
+
+    @classmethod
+    def __send(cls, kind: OrderNotice.Kind, notices: list[OrderNotice]) -> None:
+        """Отправка уведомлений одного вида"""
+
+        sender_class = get_notice_sender_class(kind)
+        max_attempts = getattr(settings, 'RENT_ORDER_NOTICES_MAX_ATTEMPTS', cls._DEFAULT_MAX_ATTEMPTS)
+        backoff = getattr(settings, 'RENT_ORDER_NOTICES_BACKOFF', cls._DEFAULT_BACKOFF)
+
+        for notice in notices:
+            notice.attempts += 1
+
+            try:
+                sender_class.send(notice.order)
+            except Exception as e:
+                logger.warning(
+                    f'Ошибка отправки уведомления {kind} о заказе №{notice.order_id}, '
+                    f'попытка {notice.attempts}',
+                    exc_info=e,
+                )
+                notice.last_error = repr(e)
+
+                if notice.attempts >= max_attempts:
+                    notice.status = OrderNotice.Status.FAILED
+                else:
+                    notice.next_attempt_at = timezone.now() + timedelta(
+                        seconds=backoff * 2 ** (notice.attempts - 1),
+                    )
+                continue
+
+            notice.status = OrderNotice.Status.SENT
+            notice.sent_at = timezone.now()
@@ -0,0 +1,34 @@
+from typing import Type
+
+from apps.notifications.services.senders.abstract import NoticeSender
+from apps.notifications.services.senders import (
+    OrderCanceledNoticeSender,
+    OrderAwaitPaymentNoticeSender,
+)
+from apps.notifications.services.senders.order_confirmed import OrderConfirmedNoticeSender
+from apps.notifications.services.senders.order_without_docs import OrderWithoutDocsNoticeSender
+from apps.notifications.services.senders.documents_verify_failed import (
+    DocumentsVerifyFailedNoticeSender,
+)
+
+from ...models import OrderNotice
+
+
+# Отправщики по видам уведомлений.
+_NOTICE_SENDERS: dict[OrderNotice.Kind, Type[NoticeSender]] = {
+    OrderNotice.Kind.ORDER_AWAIT_PAYMENT: OrderAwaitPaymentNoticeSender,
+    OrderNotice.Kind.ORDER_WITHOUT_DOCS: OrderWithoutDocsNoticeSender,
+    OrderNotice.Kind.DOCUMENTS_VERIFY_FAILED: DocumentsVerifyFailedNoticeSender,
+    OrderNotice.Kind.ORDER_CONFIRMED: OrderConfirmedNoticeSender,
+    OrderNotice.Kind.ORDER_CANCELED: OrderCanceledNoticeSender,
+}
+
+
+def get_notice_sender_class(kind: OrderNotice.Kind) -> Type[NoticeSender]:
+    """
+    Получение класса отправщика уведомления.
+
+    :param kind: Вид уведомления.
+    """
+
+    return _NOTICE_SENDERS[kind]
@@ -0,0 +1,164 @@
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections
+
+from utils.pipelines import (
+    AsyncPipeline,
+    ProcessablePipe,
+)
+
+from .dto import PipeOrderDTO
+from ..order_lock import OrderLockService
+from ..order_status import OrderStatusContext
+from .checkpoints import OrderPipelineCheckpointService
+from .plan import (
+    OrderPipelinePlan,
+    OrderPipelineContext,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class _OrderPipelinePlanPipe(ProcessablePipe[PipeOrderDTO]):
+    """
+    Шаг асинхронного пайплайна, выполняющий весь план заказа.
+
+    Пайпы заказа синхронные (ORM Django и HTTP-клиент банка), а некоторые
+    из них открывают транзакцию. Поэтому план одного заказа целиком
+    выполняется в одном потоке пула, а параллельно обрабатываются
+    разные заказы.
+
+    Заказ обрабатывается под блокировкой `OrderLockService`. Если заказ
+    уже обрабатывается, его обработка завершается `OrderLockedException`.
+
+    Шаг всегда последний, поэтому реализует только `ProcessablePipe`
+    и не поддерживает цепочку через `invoke`/`set_next`.
+    """
+
+    def __init__(
+        self,
+        plan: OrderPipelinePlan,
+        checkpoints: bool = False,
+        timeout: float | None = None,
+    ) -> None:
+        """
+        Инициализатор класса.
+
+        :param plan: План обработки заказа.
+        :param checkpoints: Сохранять контрольные точки запуска.
+        :param timeout: Ожидаемое время обработки заказа в секундах. Превышение только логируется.
+        """
+
+        self.__plan = plan
+        self.__checkpoints = checkpoints
+        self.__timeout = timeout
+        # Потоки пула не наследуют контекст, поэтому
+        # инициатора смены статусов передаем явно.
+        self.__actor = OrderStatusContext.get_actor()
+
+    def process(self, order_data: PipeOrderDTO) -> OrderPipelineContext:
+        """
+        Обработка заказа по плану.
+
+        :param order_data: Данные о заказе.
+
+        :return: Контекст запуска плана.
+        """
+
+        order = order_data.order
+        run_id = (
+            OrderPipelineCheckpointService.get_run_id(
+                order.pk,
+                order_data.payment_data.payment_id,
+                self.__plan.stages[0],
+            )
+            if self.__checkpoints
+            else None
+        )
+
+        started_at = time.monotonic()
+        try:
+            with OrderStatusContext.bind(actor=self.__actor), OrderLockService.lock(order.pk):
+                # Заказ мог быть загружен до захвата блокировки.
+                order.refresh_from_db(fields=['status'])
+
+                return self.__plan.invoke(order_data, run_id=run_id)
+        finally:
+            duration = time.monotonic() - started_at
+            if self.__timeout is not None and duration > self.__timeout:
+                logger.warning(
+                    f'Заказ №{order.pk} обрабатывался {duration:.1f} с '
+                    f'при ожидаемых {self.__timeout} с'
+                )
+
+            # Потоки пула живут дольше одного заказа, поэтому
+            # соединения с БД закрываем по тем же правилам, что и после запроса.
+            close_old_connections()
+
+
+class OrderPipelineAsyncRunner:
+    """
+    Обработка нескольких заказов по плану в одном цикле событий.
+
+    Заказы обрабатываются параллельно в ограниченном пуле потоков.
+    Ошибка обработки одного заказа не влияет на обработку остальных.
+
+    Обработка заказа не прерывается по времени: брошенный план продолжил бы
+    менять статусы и обращаться к банку в потоке пула уже после освобождения
+    блокировки заказа. Время внешних вызовов ограничивают таймауты этапов
+    и HTTP-клиентов, а превышение ожидаемого времени обработки заказа
+    только логируется (так же, как в `OrderPipelinePlan`).
+    """
+
+    def __init__(
+        self,
+        plan: OrderPipelinePlan,
+        concurrency: int,
+        timeout: float | None = None,
+    ) -> None:
+        """
+        Инициализатор класса.
+
+        :param plan: План обработки заказа.
+        :param concurrency: Кол-во одновременно обрабатываемых заказов.
+        :param timeout: Ожидаемое время обработки одного заказа в секундах. Превышение только логируется.
+        """
+
+        self.__plan = plan
+        self.__concurrency = concurrency
+        self.__timeout = timeout
+
+    def run(
+        self,
+        orders_data: list[PipeOrderDTO],
+        checkpoints: bool = False,
+    ) -> list[OrderPipelineContext | BaseException]:
+        """
+        Обработка заказов.
+
+        :param orders_data: Данные о заказах.
+        :param checkpoints: Сохранять контрольные точки запусков.
+            ID запуска определяется по каждому заказу.
+
+        :return: Контексты запусков либо исключения в порядке входных данных.
+        """
+
+        return asyncio.run(self.__run(orders_data, checkpoints))
+
+    async def __run(
+        self,
+        orders_data: list[PipeOrderDTO],
+        checkpoints: bool,
+    ) -> list[OrderPipelineContext | BaseException]:
+        """Обработка заказов в цикле событий"""
+
+        with ThreadPoolExecutor(max_workers=self.__concurrency) as executor:
+            pipeline = AsyncPipeline(executor=executor).pipe(
+                _OrderPipelinePlanPipe(self.__plan, checkpoints, self.__timeout),
+            )
+
+            return await pipeline.process_many(orders_data, self.__concurrency)
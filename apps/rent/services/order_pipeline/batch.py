@@ -0,0 +1,40 @@
+from ...models import Order
+from .dto import PipeOrderDTO
+from .pipes.base import BaseOrderPipe
+from .exceptions import InvalidOrderStatusPipeException
+from ..order_status import OrderStatusService
+
+
+def set_batch_statuses(
+    pipe: BaseOrderPipe,
+    orders_data: list[PipeOrderDTO],
+    results: list[PipeOrderDTO | Exception],
+    new_statuses: list[tuple[int, Order.Status]],
+) -> list[int]:
+    """
+    Смена статусов заказов при пакетной обработке пайпом.
+
+    Если статус заказа параллельно сменили, и переход не применился,
+    в результат обработки заказа записывается исключение неверного статуса.
+
+    :param pipe: Пайп, обрабатывающий заказы.
+    :param orders_data: Данные о заказах.
+    :param results: Результаты обработки заказов.
+    :param new_statuses: Пары из индекса заказа и его нового статуса.
+
+    :return: Индексы заказов, у которых статус был сменен.
+    """
+
+    applied = OrderStatusService.set_statuses([
+        (orders_data[i].order, new_status)
+        for i, new_status in new_statuses
+    ])
+
+    applied_indexes: list[int] = []
+    for (i, _), is_applied in zip(new_statuses, applied):
+        if is_applied:
+            applied_indexes.append(i)
+        else:
+            results[i] = InvalidOrderStatusPipeException(order=orders_data[i].order, pipe=pipe)
+
+    return applied_indexes
@@ -1,6 +1,8 @@
-from typing import Final
-
-from utils.pipelines import Pipeline
+import threading
+from typing import (
+    Type,
+    Final,
+)
 
 from .pipes import (
     BaseOrderPipe,
@@ -8,7 +10,8 @@ from .pipes import (
     VerifyDocumentsPipe,
     CheckingExistsDocumentsPipe,
 )
-from .dto import PipeOrderDTO
+from .plan import OrderPipelinePlan
+from .instrumentation import get_order_pipeline_executor
 from .stages import OrderProcessStage
 
 
@@ -23,15 +26,21 @@ class OrderPipelineBuilder:
     сразу с проверки документов и далее по пайплайну.
     Или если мы знаем, что проверка была пройдена, можем сразу
     перейти к последнему шагу - подтверждению.
+
+    План для каждой стадии компилируется один раз на процесс
+    и далее переиспользуется.
     """
 
     # Этапы расположены в порядке их выполнения.
-    _ORDER_PIPE_MAP: Final[dict[OrderProcessStage, BaseOrderPipe]] = {
-        OrderProcessStage.CHECKING_EXISTS_DOCUMENTS: CheckingExistsDocumentsPipe(),
-        OrderProcessStage.VERIFY_DOCUMENTS: VerifyDocumentsPipe(),
-        OrderProcessStage.CONFIRM_ORDER: ConfirmOrderPipe(),
+    _ORDER_PIPE_MAP: Final[dict[OrderProcessStage, Type[BaseOrderPipe]]] = {
+        OrderProcessStage.CHECKING_EXISTS_DOCUMENTS: CheckingExistsDocumentsPipe,
+        OrderProcessStage.VERIFY_DOCUMENTS: VerifyDocumentsPipe,
+        OrderProcessStage.CONFIRM_ORDER: ConfirmOrderPipe,
     }
 
+    __compiled_plans: dict[OrderProcessStage, OrderPipelinePlan] = {}
+    __lock = threading.Lock()
+
     def __init__(self, start_stage: OrderProcessStage) -> None:
         """
         Инициализатор класса.
@@ -45,18 +54,29 @@ class OrderPipelineBuilder:
 
         self.__start_stage = start_stage
 
-    def build(self) -> Pipeline[PipeOrderDTO]:
-        """Сборка пайплайна для заказов"""
+    def build(self) -> OrderPipelinePlan:
+        """Получение скомпилированного плана обработки заказов"""
 
-        pipeline = Pipeline[PipeOrderDTO]()
-        start_stage_passed = False
+        plan = self.__compiled_plans.get(self.__start_stage)
+        if plan is not None:
+            return plan
 
-        # Сборка пайплайна, начиная с указанного шага.
-        for stage, pipe in self._ORDER_PIPE_MAP.items():
-            if self.__start_stage == stage:
-                start_stage_passed = True
+        with self.__lock:
+            plan = self.__compiled_plans.get(self.__start_stage)
+            if plan is None:
+                plan = self.__compile()
+                self.__compiled_plans[self.__start_stage] = plan
 
-            if start_stage_passed:
-                pipeline.pipe(pipe)
+        return plan
 
-        return pipeline
+    def __compile(self) -> OrderPipelinePlan:
+        """Компиляция плана, начиная с указанного шага"""
+
+        stages = list(self._ORDER_PIPE_MAP)
+        stages = stages[stages.index(self.__start_stage):]
+
+        return OrderPipelinePlan(
+            stages=tuple(stages),
+            pipes=tuple(self._ORDER_PIPE_MAP[stage]() for stage in stages),
+            executor=get_order_pipeline_executor(),
+        )
@@ -0,0 +1,179 @@
+import uuid
+from datetime import timedelta
+from typing import Final
+
+from django.conf import settings
+from django.db import (
+    IntegrityError,
+    transaction,
+)
+from django.db.models import Q
+from django.utils import timezone
+
+from ...models import (
+    OrderLease,
+    OrderPipelineCheckpoint,
+)
+from ..order_lock import OrderLockService
+from .stages import OrderProcessStage
+from .exceptions import DuplicateOrderPipelineRunException
+
+
+class OrderPipelineCheckpointService:
+    """
+    Сервис контрольных точек запусков пайплайна заказа.
+
+    Перед выполнением этапа создается запись со статусом `STARTED`, после -
+    она переводится в `SUCCESS` или `FAILED`. Ограничение уникальности
+    не дает создать вторую запись `STARTED` по тому же заказу, поэтому
+    параллельный дубль запуска завершается ошибкой до выполнения этапа.
+
+    Запись `STARTED` могла остаться после падения воркера. Она помечается
+    как `FAILED` и этап выполняется заново, только если аренда блокировки
+    заказа прежнего выполнения истекла: пока она жива, прежнее выполнение
+    (в том числе повторно доставленная копия той же задачи с тем же
+    запуском) может продолжаться.
+
+    Запуск определяется заказом, а не задачей Celery (см. `get_run_id`),
+    поэтому обработку продолжает любая задача того же запуска.
+    """
+
+    _DEFAULT_STALE_TIMEOUT: Final[timedelta] = timedelta(minutes=30)
+
+    @staticmethod
+    def get_run_id(order_id: int, payment_id: str, start_stage: OrderProcessStage) -> str:
+        """
+        Получение ID запуска пайплайна заказа.
+
+        Запуск определяется заказом, его платежом и этапом, с которого
+        начата обработка. Повторное уведомление банка о том же платеже,
+        повторная доставка или потерянная и заново поставленная задача
+        продолжают тот же запуск с места остановки.
+
+        :param order_id: ID заказа.
+        :param payment_id: ID платежа заказа.
+        :param start_stage: Этап, с которого начата обработка.
+        """
+
+        return f'{order_id}:{payment_id}:{start_stage.value}'
+
+    @staticmethod
+    def new_run_id(order_id: int) -> str:
+        """
+        Получение ID нового запуска пайплайна заказа.
+
+        Используется при явном перезапуске обработки (например, менеджером),
+        когда уже выполненные этапы нужно выполнить заново.
+
+        :param order_id: ID заказа.
+        """
+
+        return f'{order_id}:{uuid.uuid4().hex}'
+
+    @classmethod
+    def get_completed_stages(cls, run_id: str) -> set[OrderProcessStage]:
+        """
+        Получение успешно выполненных этапов запуска.
+
+        :param run_id: ID запуска.
+        """
+
+        return {
+            OrderProcessStage(stage)
+            for stage in OrderPipelineCheckpoint.objects.filter(
+                run_id=run_id,
+                outcome=OrderPipelineCheckpoint.Outcome.SUCCESS,
+            ).values_list('stage', flat=True)
+        }
+
+    @classmethod
+    def start(
+        cls,
+        run_id: str,
+        order_id: int,
+        stage: OrderProcessStage,
+    ) -> OrderPipelineCheckpoint:
+        """
+        Создание контрольной точки начала этапа.
+
+        :param run_id: ID запуска.
+        :param order_id: ID заказа.
+        :param stage: Этап обработки заказа.
+
+        :raises DuplicateOrderPipelineRunException: Если по заказу
+            выполняется другой запуск.
+        """
+
+        try:
+            with transaction.atomic():
+                cls.__release_abandoned(order_id)
+
+                checkpoint, _ = OrderPipelineCheckpoint.objects.update_or_create(
+                    run_id=run_id,
+                    stage=stage.value,
+                    defaults={
+                        'order_id': order_id,
+                        'outcome': OrderPipelineCheckpoint.Outcome.STARTED,
+                        'duration': None,
+                        'created_at': timezone.now(),
+                    },
+                )
+        except IntegrityError as e:
+            raise DuplicateOrderPipelineRunException(order_id=order_id, run_id=run_id) from e
+
+        return checkpoint
+
+    @classmethod
+    def finish(
+        cls,
+        checkpoint: OrderPipelineCheckpoint,
+        succeeded: bool,
+        duration: float,
+    ) -> None:
+        """
+        Фиксация результата этапа.
+
+        :param checkpoint: Контрольная точка начала этапа.
+        :param succeeded: Этап выполнен успешно.
+        :param duration: Время выполнения этапа в секундах.
+        """
+
+        OrderPipelineCheckpoint.objects.filter(pk=checkpoint.pk).update(
+            outcome=(
+                OrderPipelineCheckpoint.Outcome.SUCCESS
+                if succeeded
+                else OrderPipelineCheckpoint.Outcome.FAILED
+            ),
+            duration=duration,
+        )
+
+    @classmethod
+    def __release_abandoned(cls, order_id: int) -> None:
+        """
+        Пометка брошенных этапов заказа как упавших.
+
+        Если заказ заблокирован в текущем контексте, аренда прежнего
+        выполнения уже истекла или освобождена, и все его этапы брошены.
+        Без блокировки брошенными считаются только устаревшие этапы
+        и только при отсутствии живой аренды заказа.
+        """
+
+        now = timezone.now()
+
+        if OrderLockService.is_held(order_id):
+            abandoned = Q()
+        elif OrderLease.objects.filter(order_id=order_id, expires_at__gt=now).exists():
+            return
+        else:
+            stale_timeout = getattr(
+                settings,
+                'RENT_ORDER_PIPELINE_STALE_CHECKPOINT',
+                cls._DEFAULT_STALE_TIMEOUT,
+            )
+            abandoned = Q(created_at__lt=now - stale_timeout)
+
+        (
+            OrderPipelineCheckpoint.objects
+                .filter(abandoned, order_id=order_id, outcome=OrderPipelineCheckpoint.Outcome.STARTED)  # noqa: E131
+                .update(outcome=OrderPipelineCheckpoint.Outcome.FAILED)  # noqa: E131
+        )
@@ -0,0 +1,53 @@
+from contextvars import copy_context
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    TypeVar,
+    Callable,
+)
+
+from django.conf import settings
+from django.db import connection
+
+
+_T = TypeVar('_T')
+_R = TypeVar('_R')
+
+
+def run_concurrently(func: Callable[[_T], _R], items: list[_T]) -> list[_R | Exception]:
+    """
+    Параллельный вызов функции для каждого элемента в пуле потоков.
+
+    Используется для внешних вызовов при пакетной обработке заказов.
+    Размер пула задается настройкой `RENT_ORDER_PIPELINE_BATCH_WORKERS`.
+    Единственный вызов выполняется в текущем потоке.
+
+    :param func: Вызываемая функция.
+    :param items: Аргументы вызовов.
+
+    :return: Результаты либо исключения в порядке аргументов.
+    """
+
+    def call(item: _T) -> _R | Exception:
+        try:
+            return func(item)
+        except Exception as e:
+            return e
+
+    # Потоки получают копию контекста вызывающего кода (например,
+    # инициатора смены статусов, см. `OrderStatusContext`).
+    context = copy_context()
+
+    def call_in_thread(item: _T) -> _R | Exception:
+        try:
+            return context.copy().run(call, item)
+        finally:
+            # Потоки пула живут только во время вызова.
+            connection.close()
+
+    # Единственный вызов выполняем в текущем потоке без создания пула.
+    if len(items) <= 1:
+        return [call(item) for item in items]
+
+    max_workers = min(getattr(settings, 'RENT_ORDER_PIPELINE_BATCH_WORKERS', 8), len(items))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(call_in_thread, items))
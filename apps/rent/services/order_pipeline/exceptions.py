@@ -61,3 +61,48 @@ class NoResultOrderPipeException(Exception):
             'Ошибка получения результата этапа пайплайна\n'
             'Этап обработки: {pipe_name}\n'
         )
+
+
+class DuplicateOrderPipelineRunException(Exception):
+    """
+    Исключение, когда по заказу уже выполняется
+    другой запуск пайплайна.
+    """
+
+    def __init__(self, order_id: int, run_id: str, *args, **kwargs) -> None:
+        """Инициализатор класса"""
+
+        self.order_id = order_id
+        self.run_id = run_id
+        self.message = (
+            f'Заказ №{order_id} уже обрабатывается другим запуском пайплайна\n'
+            f'Текущий запуск: {run_id}'
+        )
+
+        super().__init__(self.message)
+
+
+class OrderPipelineRequeueException(Exception):
+    """
+    Исключение, когда обработку заказа нужно повторить
+    позже в фоне согласно политике пайпа.
+    """
+
+    def __init__(
+        self,
+        pipe: BaseOrderPipe,
+        delay: int,
+        max_requeues: int,
+        *args, **kwargs,
+    ) -> None:
+        """Инициализатор класса"""
+
+        self.pipe = pipe
+        self.delay = delay
+        self.max_requeues = max_requeues
+        self.message = (
+            f'Этап {pipe.get_pipe_name()} не выполнен, '
+            f'повтор обработки через {delay} сек.'
+        )
+
+        super().__init__(self.message)
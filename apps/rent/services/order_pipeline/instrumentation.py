@@ -0,0 +1,78 @@
+import logging
+from contextlib import ExitStack
+from typing_extensions import Self
+
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+from utils.pipelines import (
+    QueryCounter,
+    PipelineExecutor,
+    PipeMetricsHook,
+    LoggingPipeMetricsHook,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class DjangoQueryCounter(QueryCounter):
+    """Счетчик запросов к БД через обертку выполнения запросов Django"""
+
+    def __init__(self) -> None:
+        """Инициализатор класса"""
+
+        self.__count = 0
+        self.__stack = ExitStack()
+
+    def __enter__(self) -> Self:
+        """Начало подсчета запросов"""
+
+        self.__stack.enter_context(connection.execute_wrapper(self.__wrapper))
+
+        return self
+
+    def __exit__(self, *args, **kwargs) -> None:
+        """Окончание подсчета запросов"""
+
+        self.__stack.close()
+
+    @property
+    def count(self) -> int:
+        """Кол-во выполненных запросов"""
+
+        return self.__count
+
+    def __wrapper(self, execute, sql, params, many, context):
+        """Обертка выполнения запроса"""
+
+        self.__count += 1
+
+        return execute(sql, params, many, context)
+
+
+def get_order_pipeline_metrics_hook() -> PipeMetricsHook:
+    """
+    Получение получателя метрик пайплайна заказа.
+
+    Получатель задается путем к классу в настройке
+    `RENT_ORDER_PIPELINE_METRICS_HOOK`. По умолчанию метрики пишутся в лог.
+    """
+
+    hook_path = getattr(settings, 'RENT_ORDER_PIPELINE_METRICS_HOOK', None)
+
+    return (
+        import_string(hook_path)()
+        if hook_path is not None
+        else LoggingPipeMetricsHook(logger)
+    )
+
+
+def get_order_pipeline_executor() -> PipelineExecutor:
+    """Получение исполнителя пайплайна заказа с получателем метрик"""
+
+    return PipelineExecutor(
+        metrics_hook=get_order_pipeline_metrics_hook(),
+        query_counter_class=DjangoQueryCounter,
+    )
@@ -6,11 +6,33 @@ from abc import (
 from utils.pipelines import PipeLike
 
 from ..dto import PipeOrderDTO
+from ..policy import PipePolicy
 from ....models import Order
+from ...order_status import OrderStatusContext
 
 
 class BaseOrderPipe(PipeLike[PipeOrderDTO], ABC):
-    """Абстрактный класс шага пайплайна заказа"""
+    """
+    Абстрактный класс шага пайплайна заказа.
+
+    Полезная работа пайпа выполняется в методе `process`, который не хранит
+    состояние в объекте пайпа. Поэтому один объект пайпа можно безопасно
+    использовать в нескольких потоках одновременно (см. `OrderPipelinePlan`).
+
+    Метод `invoke` сохраняет результат в объекте пайпа и запускает следующий
+    шаг. Он нужен для использования пайпа отдельно, как сервиса.
+
+    Метод `process_batch` обрабатывает сразу несколько заказов. По умолчанию
+    заказы обрабатываются по одному, но пайп может переопределить его, чтобы
+    менять статусы одним запросом и выполнять внешние вызовы параллельно.
+
+    Обработка ошибок (время выполнения, повторы, статус при неудаче,
+    повторная постановка в очередь) объявляется политикой `_POLICY`
+    и применяется планом обработки заказа (см. `OrderPipelinePlan`).
+    """
+
+    # Политика выполнения пайпа. По умолчанию без повторов.
+    _POLICY: PipePolicy = PipePolicy()
 
     def __init__(self) -> None:
         """Инициализатор класса"""
@@ -18,6 +40,69 @@ class BaseOrderPipe(PipeLike[PipeOrderDTO], ABC):
         self._result: PipeOrderDTO | None = None
         self._next: BaseOrderPipe | None = None
 
+    def invoke(self, order_data: PipeOrderDTO) -> None:
+        """
+        Запуск шага пайплайна.
+
+        :param order_data: Данные о заказе.
+        """
+
+        with OrderStatusContext.bind(pipe=self.get_pipe_name()):
+            self._result = self.process(order_data)
+
+        if self._next is not None:
+            self._next.invoke(self._result)
+
+    @abstractmethod
+    def process(self, order_data: PipeOrderDTO) -> PipeOrderDTO:
+        """
+        Выполнение полезной работы пайпа.
+
+        :param order_data: Данные о заказе.
+
+        :return: DTO с обработанными данными заказа.
+        """
+
+        raise NotImplementedError()
+
+    def process_batch(self, orders_data: list[PipeOrderDTO]) -> list[PipeOrderDTO | Exception]:
+        """
+        Пакетная обработка заказов.
+
+        Ошибка обработки одного заказа не прерывает обработку остальных.
+
+        :param orders_data: Данные о заказах.
+
+        :return: DTO с обработанными данными либо исключения в порядке входных данных.
+        """
+
+        results: list[PipeOrderDTO | Exception] = []
+        for order_data in orders_data:
+            try:
+                results.append(self.process(order_data))
+            except Exception as e:
+                results.append(e)
+
+        return results
+
+    def _process_as_batch(self, order_data: PipeOrderDTO) -> PipeOrderDTO:
+        """
+        Обработка одного заказа через `process_batch`.
+
+        Для пайпов, переопределивших `process_batch`, чтобы у одиночной
+        и пакетной обработки была одна реализация.
+
+        :param order_data: Данные о заказе.
+
+        :return: DTO с обработанными данными заказа.
+        """
+
+        result = self.process_batch([order_data])[0]
+        if isinstance(result, Exception):
+            raise result
+
+        return result
+
     def get_result(self) -> PipeOrderDTO | None:
         """
         Получение результата работы пайпа.
@@ -37,6 +122,12 @@ class BaseOrderPipe(PipeLike[PipeOrderDTO], ABC):
 
         self._next = next_pipe
 
+    @classmethod
+    def get_policy(cls) -> PipePolicy:
+        """Получение политики выполнения пайпа"""
+
+        return cls._POLICY
+
     @classmethod
     def get_pipe_name(cls) -> str:
         """Получение названия пайпа"""
@@ -1,16 +1,19 @@
-from typing import Type
-
-from apps.notifications.services.senders.abstract import NoticeSender
-from apps.notifications.services.senders import OrderCanceledNoticeSender
+from django.db import transaction
 
+from apps.tinkoff_payments.services.core.terminal_pool import TinkoffTerminalPool
 from apps.tinkoff_payments.services.payment_cancellation_service import (
     TinkoffPaymentCancellationService,
 )
 
-from ....models import Order
+from ....models import (
+    Order,
+    OrderNotice,
+)
 from ..dto import PipeOrderDTO
 from .base import BaseOrderPipe
 from ..exceptions import InvalidOrderStatusPipeException
+from ...order_status import OrderStatusService
+from ...order_notices import OrderNoticeOutbox
 
 
 class CancelOrderPipe(BaseOrderPipe):
@@ -18,6 +21,11 @@ class CancelOrderPipe(BaseOrderPipe):
     Шаг пайплайна для отмены заказа.
 
     Не участвует при сборке основного пайплайна в билдере.
+
+    Перед обращением к банку заказ занимается статусом `CANCELING`,
+    поэтому параллельное подтверждение или повторная отмена не пройдут
+    проверку статуса и не обратятся к банку. Если банк не отменил
+    платеж, заказ возвращается в прежний статус, и отмену можно повторить.
     """
 
     # Чтобы выполнить операцию, заказ должен иметь один из этих статусов.
@@ -32,30 +40,37 @@ class CancelOrderPipe(BaseOrderPipe):
         Order.Status.APPROVAL_SUCCESS,
         Order.Status.CONFIRM_PAYMENT_FAILED,
         Order.Status.BOOKED,
+        # Отмена, прерванная падением обработчика.
+        Order.Status.CANCELING,
     ]
-    default_notice_sender_class: Type[NoticeSender] = OrderCanceledNoticeSender
+    default_notice_kind: OrderNotice.Kind = OrderNotice.Kind.ORDER_CANCELED
 
-    def __init__(self, notice_sender: NoticeSender | None = None) -> None:
+    def __init__(self, notice_kind: OrderNotice.Kind | None = None) -> None:
         """
         Инициализатор класса.
 
-        :param notice_sender:
-            Отправщик уведомления после отмены заказа.
-            По-умолчанию используется `OrderCanceledNoticeSender`.
+        :param notice_kind:
+            Вид уведомления после отмены заказа.
+            По-умолчанию используется `OrderNotice.Kind.ORDER_CANCELED`.
         """
 
         super().__init__()
 
-        self.__notice_sender = notice_sender or self.default_notice_sender_class()
+        self.__notice_kind = notice_kind or self.default_notice_kind
 
-    def invoke(self, order_data: PipeOrderDTO) -> None:
+    def process(self, order_data: PipeOrderDTO) -> PipeOrderDTO:
         """
         Запуск шага пайплайна.
 
-        Отменяем платеж у заказа, переводим в статус `CANCELED` и отправляем
-        уведомления об отмене.
+        Занимаем заказ статусом `CANCELING`, отменяем платеж у заказа,
+        переводим в статус `CANCELED` и ставим уведомление об отмене в очередь.
 
         :param order_data: Данные о заказе.
+
+        :raises TinkoffResponseException: Если банк не отменил платеж.
+            Заказ при этом возвращается в прежний статус.
+
+        :return: DTO с обработанными данными заказа.
         """
 
         order = order_data.order
@@ -63,16 +78,38 @@ class CancelOrderPipe(BaseOrderPipe):
         if not self.is_valid_status(order.status):
             raise InvalidOrderStatusPipeException(order=order, pipe=self)
 
-        payment_data = order_data.payment_data
-
-        TinkoffPaymentCancellationService(payment_data.payment_id).cancel()
-
-        order.status = Order.Status.CANCELED
-        order.save(update_fields=('status',))
-
-        self._result = order_data
+        previous_status = order.status
+        if not OrderStatusService.set_status(order, Order.Status.CANCELING):
+            raise InvalidOrderStatusPipeException(order=order, pipe=self)
 
-        self.__notice_sender.send(order)
+        # У заказа, созданного асинхронно, платежа может еще не быть.
+        payment_data = order_data.payment_data
+        if payment_data is not None:
+            try:
+                # Платеж отменяется через выдавший его терминал.
+                TinkoffPaymentCancellationService(
+                    payment_id=payment_data.payment_id,
+                    api_client=TinkoffTerminalPool.get_client(payment_data.terminal_key),
+                ).cancel()
+            except Exception:
+                OrderStatusService.set_status(
+                    order,
+                    Order.Status(previous_status),
+                    from_statuses=[Order.Status.CANCELING],
+                )
+                raise
+
+        with transaction.atomic():
+            if not OrderStatusService.set_status(
+                order,
+                Order.Status.CANCELED,
+                from_statuses=[Order.Status.CANCELING],
+            ):
+                raise InvalidOrderStatusPipeException(order=order, pipe=self)
+
+            OrderNoticeOutbox.enqueue([order], self.__notice_kind)
+
+        return order_data
 
     @classmethod
     def get_pipe_name(cls) -> str:
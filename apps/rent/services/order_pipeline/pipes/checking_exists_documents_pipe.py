@@ -1,13 +1,18 @@
+from django.db import transaction
+
 from utils.pipelines.exceptions import PipeProcessException
 
 from apps.tinkoff_payments.services.payment_initialization.enums import PaymentStrategyType
 
-from apps.notifications.services.senders.order_without_docs import OrderWithoutDocsNoticeSender
-
-from ....models import Order
+from ....models import (
+    Order,
+    OrderNotice,
+)
 from ..dto import PipeOrderDTO
 from .base import BaseOrderPipe
 from ..exceptions import InvalidOrderStatusPipeException
+from ..batch import set_batch_statuses
+from ...order_notices import OrderNoticeOutbox
 
 
 class CheckingExistsDocumentsPipe(BaseOrderPipe):
@@ -31,40 +36,63 @@ class CheckingExistsDocumentsPipe(BaseOrderPipe):
 
         return 'Проверка наличия документов'
 
-    def invoke(self, order_data: PipeOrderDTO) -> None:
+    def process(self, order_data: PipeOrderDTO) -> PipeOrderDTO:
         """
         Запуск шага пайплайна.
 
         :param order_data: Данные о заказе.
-        """
-
-        order = order_data.order
-
-        if not self.is_valid_status(order.status):
-            raise InvalidOrderStatusPipeException(order=order, pipe=self)
 
-        payment_data = order_data.payment_data
-
-        # В случае, если заказ пришел без документов, т.е. оформляется через менеджера.
-        if order.with_manager:
-            order.status = Order.Status.WITHOUT_DOCS
-            order.save(update_fields=('status',))
+        :return: DTO с обработанными данными заказа.
+        """
 
-            OrderWithoutDocsNoticeSender.send(order)
+        return self._process_as_batch(order_data)
 
-            raise PipeProcessException(pipe=self, message='Заказ без документов')
+    def process_batch(self, orders_data: list[PipeOrderDTO]) -> list[PipeOrderDTO | Exception]:
+        """
+        Пакетная обработка заказов.
 
-        if payment_data.payment_strategy == PaymentStrategyType.CARD:
-            order.status = Order.Status.RESERVATION_SUCCESS
-        else:
-            order.status = Order.Status.PAYMENT_SUCCESS
+        Статусы всех заказов меняются одним запросом на каждый статус.
 
-        order.save(update_fields=('status',))
+        :param orders_data: Данные о заказах.
 
-        self._result = order_data
+        :return: DTO с обработанными данными либо исключения в порядке входных данных.
+        """
 
-        if self._next is not None:
-            self._next.invoke(order_data)
+        results: list[PipeOrderDTO | Exception] = []
+        new_statuses: list[tuple[int, Order.Status]] = []
+
+        for i, order_data in enumerate(orders_data):
+            order = order_data.order
+
+            if not self.is_valid_status(order.status):
+                results.append(InvalidOrderStatusPipeException(order=order, pipe=self))
+                continue
+
+            # В случае, если заказ пришел без документов, т.е. оформляется через менеджера.
+            if order.with_manager:
+                new_statuses.append((i, Order.Status.WITHOUT_DOCS))
+                results.append(PipeProcessException(pipe=self, message='Заказ без документов'))
+                continue
+
+            if order_data.payment_data.payment_strategy == PaymentStrategyType.CARD:
+                new_statuses.append((i, Order.Status.RESERVATION_SUCCESS))
+            else:
+                new_statuses.append((i, Order.Status.PAYMENT_SUCCESS))
+
+            results.append(order_data)
+
+        with transaction.atomic():
+            applied = set_batch_statuses(self, orders_data, results, new_statuses)
+            OrderNoticeOutbox.enqueue(
+                [
+                    orders_data[i].order
+                    for i in applied
+                    if orders_data[i].order.status == Order.Status.WITHOUT_DOCS
+                ],
+                OrderNotice.Kind.ORDER_WITHOUT_DOCS,
+            )
+
+        return results
 
     @classmethod
     def is_valid_status(cls, order_status: Order.Status) -> bool:
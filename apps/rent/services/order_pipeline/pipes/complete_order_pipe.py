@@ -2,6 +2,7 @@ from ..dto import PipeOrderDTO
 from ....models import Order
 from .base import BaseOrderPipe
 from ..exceptions import InvalidOrderStatusPipeException
+from ...order_status import OrderStatusService
 
 
 class CompleteOrderPipe(BaseOrderPipe):
@@ -23,11 +24,13 @@ class CompleteOrderPipe(BaseOrderPipe):
 
         return 'Завершение заказа'
 
-    def invoke(self, order_data: PipeOrderDTO) -> None:
+    def process(self, order_data: PipeOrderDTO) -> PipeOrderDTO:
         """
         Запуск шага пайплайна.
 
         :param order_data: Данные о заказе.
+
+        :return: DTO с обработанными данными заказа.
         """
 
         order = order_data.order
@@ -35,10 +38,10 @@ class CompleteOrderPipe(BaseOrderPipe):
         if not self.is_valid_status(order.status):
             raise InvalidOrderStatusPipeException(order=order, pipe=self)
 
-        order.status = Order.Status.COMPLETED
-        order.save(update_fields=('status',))
+        if not OrderStatusService.set_status(order, Order.Status.COMPLETED):
+            raise InvalidOrderStatusPipeException(order=order, pipe=self)
 
-        self._result = order_data
+        return order_data
 
     @classmethod
     def is_valid_status(cls, order_status: Order.Status) -> bool:
@@ -1,16 +1,29 @@
-from utils.pipelines.exceptions import PipeProcessException
+import logging
 
+from django.db import transaction
+
+from utils.pipelines.exceptions import PipeTransientException
+
+from apps.tinkoff_payments.services.core.terminal_pool import TinkoffTerminalPool
 from apps.tinkoff_payments.services.payment_confirmation_service import (
     TinkoffPaymentConfirmationService,
 )
 from apps.tinkoff_payments.services.payment_initialization.enums import PaymentStrategyType
 
-from apps.notifications.services.senders.order_confirmed import OrderConfirmedNoticeSender
-
 from ..dto import PipeOrderDTO
-from ....models import Order
+from ....models import (
+    Order,
+    OrderNotice,
+)
 from .base import BaseOrderPipe
 from ..exceptions import InvalidOrderStatusPipeException
+from ..batch import set_batch_statuses
+from ..policy import PipePolicy
+from ..concurrency import run_concurrently
+from ...order_notices import OrderNoticeOutbox
+
+
+logger = logging.getLogger(__name__)
 
 
 class ConfirmOrderPipe(BaseOrderPipe):
@@ -24,64 +37,133 @@ class ConfirmOrderPipe(BaseOrderPipe):
         Order.Status.CONFIRM_PAYMENT_FAILED,
     ]
 
+    # Сбои банка при подтверждении платежа повторяются, а если не помогло -
+    # заказ повторно ставится в очередь.
+    _POLICY: PipePolicy = PipePolicy(
+        timeout=60,
+        retries=2,
+        backoff=1.0,
+        fallback_status=Order.Status.CONFIRM_PAYMENT_FAILED,
+        requeue_delay=60,
+        max_requeues=5,
+    )
+
     @classmethod
     def get_pipe_name(cls) -> str:
         """Получение названия пайпа"""
 
         return 'Подтверждение заказа'
 
-    def invoke(self, order_data: PipeOrderDTO) -> None:
+    def process(self, order_data: PipeOrderDTO) -> PipeOrderDTO:
         """
         Запуск шага пайплайна.
 
         :param order_data: Данные о заказе.
-        """
 
-        order = order_data.order
-
-        if not self.is_valid_status(order.status):
-            raise InvalidOrderStatusPipeException(order=order, pipe=self)
-
-        payment_data = order_data.payment_data
-
-        # Для платежей через карту используется двух стадийная оплата
-        # для резервации суммы. Поэтому необходимо вручную подтвердить платеж.
-        if payment_data.payment_strategy == PaymentStrategyType.CARD:
-            self.__manual_confirm_payment(order_data)
+        :return: DTO с обработанными данными заказа.
+        """
 
-        order.status = Order.Status.BOOKED
-        order.save(update_fields=('status',))
+        return self._process_as_batch(order_data)
 
-        self._result = order_data
+    def process_batch(self, orders_data: list[PipeOrderDTO]) -> list[PipeOrderDTO | Exception]:
+        """
+        Пакетная обработка заказов.
 
-        OrderConfirmedNoticeSender.send(order)
+        Платежи подтверждаются в банке параллельно, а статусы заказов
+        меняются одним запросом на каждый статус.
 
-        if self._next is not None:
-            self._next.invoke(order_data)
+        :param orders_data: Данные о заказах.
 
-    def __manual_confirm_payment(self, order_data: PipeOrderDTO) -> None:
+        :return: DTO с обработанными данными либо исключения в порядке входных данных.
         """
-        Ручное подтверждение платежа.
 
-        :param order_data: DTO с данными о заказе.
+        results: list[PipeOrderDTO | Exception] = []
+        to_confirm: list[int] = []
+
+        for i, order_data in enumerate(orders_data):
+            if not self.is_valid_status(order_data.order.status):
+                results.append(InvalidOrderStatusPipeException(order=order_data.order, pipe=self))
+                continue
+
+            results.append(order_data)
+
+            # Для платежей через карту используется двух стадийная оплата
+            # для резервации суммы. Поэтому необходимо вручную подтвердить платеж.
+            if order_data.payment_data.payment_strategy == PaymentStrategyType.CARD:
+                to_confirm.append(i)
+
+        self.__manual_confirm_payments(orders_data, to_confirm, results)
+
+        with transaction.atomic():
+            booked = set_batch_statuses(
+                self,
+                orders_data,
+                results,
+                [
+                    (i, Order.Status.BOOKED)
+                    for i, result in enumerate(results)
+                    if not isinstance(result, Exception)
+                ],
+            )
+            OrderNoticeOutbox.enqueue(
+                [orders_data[i].order for i in booked],
+                OrderNotice.Kind.ORDER_CONFIRMED,
+            )
+
+        for i in booked:
+            logger.info(
+                f'Заказ №{orders_data[i].order.pk} подтвержден, '
+                f'платеж {orders_data[i].payment_data.payment_id}'
+            )
+
+        return results
+
+    def __manual_confirm_payments(
+        self,
+        orders_data: list[PipeOrderDTO],
+        to_confirm: list[int],
+        results: list[PipeOrderDTO | Exception],
+    ) -> None:
         """
+        Ручное подтверждение платежей.
 
-        order = order_data.order
-        payment_data = order_data.payment_data
-
-        order.status = Order.Status.AWAIT_CONFIRM_PAYMENT
-        order.save(update_fields=('status',))
-
-        try:
-            TinkoffPaymentConfirmationService(payment_data.payment_id).confirm()
-        except Exception as e:
-            order.status = Order.Status.CONFIRM_PAYMENT_FAILED
-            order.save(update_fields=('status',))
+        :param orders_data: Данные о заказах.
+        :param to_confirm: Индексы заказов, платежи которых нужно подтвердить.
+        :param results: Результаты обработки заказов. Для неудачных
+            подтверждений в них записываются исключения.
+        """
 
-            raise PipeProcessException(
-                pipe=self,
-                message='Ошибка подтверждения платежа',
-            ) from e
+        # Подтверждаем только платежи заказов, которые удалось перевести
+        # в `AWAIT_CONFIRM_PAYMENT`. Так платеж не подтверждается дважды
+        # при параллельной обработке заказа. Если обработчик упадет, заказ
+        # вернет задача `order_stale_claims_release_task`.
+        claimed = set_batch_statuses(
+            self,
+            orders_data,
+            results,
+            [(i, Order.Status.AWAIT_CONFIRM_PAYMENT) for i in to_confirm],
+        )
+
+        # Платеж подтверждается через выдавший его терминал.
+        confirm_results = run_concurrently(
+            lambda payment_data: TinkoffPaymentConfirmationService(
+                payment_id=payment_data.payment_id,
+                api_client=TinkoffTerminalPool.get_client(payment_data.terminal_key),
+            ).confirm(),
+            [orders_data[i].payment_data for i in claimed],
+        )
+
+        failed: list[tuple[int, Order.Status]] = []
+        for i, confirm_result in zip(claimed, confirm_results):
+            if isinstance(confirm_result, Exception):
+                results[i] = PipeTransientException(
+                    pipe=self,
+                    message='Ошибка подтверждения платежа',
+                )
+                results[i].__cause__ = confirm_result
+                failed.append((i, Order.Status.CONFIRM_PAYMENT_FAILED))
+
+        set_batch_statuses(self, orders_data, results, failed)
 
     @classmethod
     def is_valid_status(cls, order_status: Order.Status) -> bool:
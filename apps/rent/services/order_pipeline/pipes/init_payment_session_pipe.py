@@ -1,13 +1,17 @@
-from constance import config
+import logging
+import traceback
+
 from django.db import transaction
 
 from ....models import Order
 from .base import BaseOrderPipe
 from ..exceptions import InvalidOrderStatusPipeException
+from ...order_status import OrderStatusService
 from ....services.order_pipeline.dto import PipeOrderDTO
 
+from apps.tinkoff_payments.tasks import resolve_sbp_qr_task
 from apps.tinkoff_payments.models import TinkoffPaymentData
-from apps.tinkoff_payments.services.core.api_client import TinkoffPaymentsClient
+from apps.tinkoff_payments.services.core.terminal_pool import TinkoffTerminalPool
 from apps.tinkoff_payments.services.payment_initialization.data_builders import (
     AdvancePaymentDataBuilder,
 )
@@ -16,6 +20,13 @@ from apps.tinkoff_payments.services.payment_initialization.dto import ResponsePa
 from apps.tinkoff_payments.services.payment_initialization.payment_initializer_service import (
     TinkoffPaymentInitializerService,
 )
+from apps.tinkoff_payments.services.payment_initialization.qr_resolver import SBPQrResolver
+from apps.tinkoff_payments.services.payment_cancellation_service import (
+    TinkoffPaymentCancellationService,
+)
+
+
+logger = logging.getLogger(__name__)
 
 
 class InitPaymentSessionPipe(BaseOrderPipe):
@@ -24,6 +35,9 @@ class InitPaymentSessionPipe(BaseOrderPipe):
 
     Не участвует в основном пайплайне обработки заказа.
     Используется отдельно.
+
+    Если после инициализации платежа заказ не удалось перевести к оплате,
+    платеж отменяется в банке, чтобы клиент не оплатил отмененный заказ.
     """
 
     _ALLOWED_STATUSES: list[Order.Status] = [
@@ -43,14 +57,18 @@ class InitPaymentSessionPipe(BaseOrderPipe):
         :param payment_strategy: Стратегия оплаты (карты или СБП).
         """
 
+        super().__init__()
+
         self.__payment_strategy = payment_strategy
 
     @transaction.atomic
-    def invoke(self, order_data: PipeOrderDTO) -> None:
+    def process(self, order_data: PipeOrderDTO) -> PipeOrderDTO:
         """
         Запуск пайпа.
 
         :param order_data: Данные о заказе вместе с платежными данными.
+
+        :return: DTO с обработанными данными заказа.
         """
 
         order = order_data.order
@@ -58,29 +76,79 @@ class InitPaymentSessionPipe(BaseOrderPipe):
         if not self.is_valid_status(order.status):
             raise InvalidOrderStatusPipeException(order=order, pipe=self)
 
-        # Инициализируем платежную сессию с банком.
-        payment_init_dto = TinkoffPaymentInitializerService(
-            api_client=TinkoffPaymentsClient(
-                base_url=config.TINKOFF_API_URL,
-                terminal_key=config.TINKOFF_TERMINAL_KEY,
-                password=config.TINKOFF_PASSWORD,
-            ),
-            init_data_builder=AdvancePaymentDataBuilder(),
-        ).init(order, self.__payment_strategy)
+        # Инициализируем платежную сессию с банком через один из терминалов пула.
+        terminal = TinkoffTerminalPool.choose()
+        with TinkoffTerminalPool.track(terminal.terminal_key):
+            payment_init_dto = TinkoffPaymentInitializerService(
+                api_client=TinkoffTerminalPool.get_client(terminal.terminal_key),
+                init_data_builder=AdvancePaymentDataBuilder(),
+            ).init(order, self.__payment_strategy)
+
+        try:
+            payment_data = self.__save_payment_data(order, payment_init_dto)
+        except Exception:
+            # Платеж уже создан в банке, а платежные данные откатятся вместе
+            # с транзакцией. Отменяем платеж, пока знаем его ID.
+            self.__cancel_payment(payment_init_dto)
+            raise
+
+        return PipeOrderDTO(order, payment_data)
+
+    def __save_payment_data(self, order: Order, payment_init_dto: ResponsePaymentInitDTO) -> TinkoffPaymentData:
+        """
+        Сохранение платежных данных и перевод заказа к оплате.
+
+        :param order: Заказ.
+        :param payment_init_dto: DTO-объект с данными о платеже.
+
+        :raises InvalidOrderStatusPipeException: Если статус заказа сменился во время инициализации.
+
+        :return: Сохраненные платежные данные.
+        """
 
         # Сохраняем платежные данные в БД.
         payment_data = self.__dto_to_model(payment_init_dto)
         payment_data.save()
 
+        # QR-код для оплаты через СБП запрашиваем в фоне, не задерживая ответ клиенту.
+        if SBPQrResolver.is_pending(payment_data):
+            payment_id = payment_data.payment_id
+            transaction.on_commit(lambda: resolve_sbp_qr_task.delay(payment_id))
+
         # Меняем статус заказа в зависимости от стратегии оплаты.
         if payment_data.payment_strategy == PaymentStrategyType.CARD:
-            order.status = Order.Status.AWAIT_RESERVATION
+            new_status = Order.Status.AWAIT_RESERVATION
         else:
-            order.status = Order.Status.AWAIT_PAYMENT
+            new_status = Order.Status.AWAIT_PAYMENT
+
+        # Заказ мог быть отменен во время инициализации (например, как зависший).
+        if not OrderStatusService.set_status(order, new_status):
+            raise InvalidOrderStatusPipeException(order=order, pipe=self)
+
+        return payment_data
 
-        order.save(update_fields=('status',))
+    @staticmethod
+    def __cancel_payment(payment_init_dto: ResponsePaymentInitDTO) -> None:
+        """
+        Отмена платежа в банке.
+
+        Ошибка отмены только логируется, чтобы не скрыть исходную ошибку.
+
+        :param payment_init_dto: DTO-объект с данными о платеже.
+        """
 
-        self._result = PipeOrderDTO(order, payment_data)
+        try:
+            # Платеж отменяется через выдавший его терминал.
+            TinkoffPaymentCancellationService(
+                payment_id=payment_init_dto.payment_id,
+                api_client=TinkoffTerminalPool.get_client(payment_init_dto.terminal_key),
+            ).cancel()
+        except Exception:
+            logger.error(
+                f'Не удалось отменить платеж {payment_init_dto.payment_id} '
+                f'заказа №{payment_init_dto.order_id}\n'
+                f'Причина: {traceback.format_exc()}'
+            )
 
     def __dto_to_model(self, payment_init_dto: ResponsePaymentInitDTO) -> TinkoffPaymentData:
         """
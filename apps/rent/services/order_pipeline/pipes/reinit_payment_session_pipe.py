@@ -1,13 +1,17 @@
-from constance import config
 from django.db import transaction
 
 from ....models import Order
 from ..dto import PipeOrderDTO
 from .base import BaseOrderPipe
 from ..exceptions import InvalidOrderStatusPipeException
+from ...order_status import (
+    OrderReadCache,
+    OrderStatusService,
+)
 
+from apps.tinkoff_payments.tasks import resolve_sbp_qr_task
 from apps.tinkoff_payments.models import TinkoffPaymentData
-from apps.tinkoff_payments.services.core.api_client import TinkoffPaymentsClient
+from apps.tinkoff_payments.services.core.terminal_pool import TinkoffTerminalPool
 from apps.tinkoff_payments.services.payment_initialization.data_builders import (
     AdvancePaymentDataBuilder,
 )
@@ -16,6 +20,7 @@ from apps.tinkoff_payments.services.payment_initialization.dto import ResponsePa
 from apps.tinkoff_payments.services.payment_initialization.payment_initializer_service import (
     TinkoffPaymentInitializerService,
 )
+from apps.tinkoff_payments.services.payment_initialization.qr_resolver import SBPQrResolver
 
 
 class ReinitPaymentSessionPipe(BaseOrderPipe):
@@ -38,11 +43,13 @@ class ReinitPaymentSessionPipe(BaseOrderPipe):
 
         return 'Реинициализация платежной сессии'
 
-    def invoke(self, order_data: PipeOrderDTO) -> None:
+    def process(self, order_data: PipeOrderDTO) -> PipeOrderDTO:
         """
         Запуск пайпа.
 
         :param order_data: Данные о заказе вместе с платежными данными.
+
+        :return: DTO с обработанными данными заказа.
         """
 
         order = order_data.order
@@ -53,24 +60,21 @@ class ReinitPaymentSessionPipe(BaseOrderPipe):
         # Переведем в статус `ON_REINIT`, чтобы заказ снова стал
         # занимать период аренды, чтобы другие клиенты не могли
         # перехватить этот период.
-        order.status = Order.Status.ON_REINIT
-        order.save(update_fields=('status',))
+        if not OrderStatusService.set_status(order, Order.Status.ON_REINIT):
+            raise InvalidOrderStatusPipeException(order=order, pipe=self)
 
         payment_data = order_data.payment_data
 
         try:
-            # Инициализируем платежную сессию с банком.
-            payment_init_dto = TinkoffPaymentInitializerService(
-                api_client=TinkoffPaymentsClient(
-                    base_url=config.TINKOFF_API_URL,
-                    terminal_key=config.TINKOFF_TERMINAL_KEY,
-                    password=config.TINKOFF_PASSWORD,
-                ),
-                init_data_builder=AdvancePaymentDataBuilder(),
-            ).init(order, payment_data.payment_strategy)
+            # Инициализируем платежную сессию с банком через один из терминалов пула.
+            terminal = TinkoffTerminalPool.choose()
+            with TinkoffTerminalPool.track(terminal.terminal_key):
+                payment_init_dto = TinkoffPaymentInitializerService(
+                    api_client=TinkoffTerminalPool.get_client(terminal.terminal_key),
+                    init_data_builder=AdvancePaymentDataBuilder(),
+                ).init(order, payment_data.payment_strategy)
         except Exception:
-            order.status = Order.Status.REINIT_FAILED
-            order.save(update_fields=('status',))
+            OrderStatusService.set_status(order, Order.Status.REINIT_FAILED)
             raise
 
         with transaction.atomic():
@@ -81,15 +85,24 @@ class ReinitPaymentSessionPipe(BaseOrderPipe):
             payment_data = self.__dto_to_model(payment_init_dto)
             payment_data.save()
 
+            # QR-код для оплаты через СБП запрашиваем в фоне, не задерживая ответ клиенту.
+            if SBPQrResolver.is_pending(payment_data):
+                payment_id = payment_data.payment_id
+                transaction.on_commit(lambda: resolve_sbp_qr_task.delay(payment_id))
+
             # Меняем статус заказа в зависимости от стратегии оплаты.
             if payment_data.payment_strategy == PaymentStrategyType.CARD:
-                order.status = Order.Status.AWAIT_RESERVATION
+                new_status = Order.Status.AWAIT_RESERVATION
             else:
-                order.status = Order.Status.AWAIT_PAYMENT
+                new_status = Order.Status.AWAIT_PAYMENT
+
+            if not OrderStatusService.set_status(order, new_status):
+                raise InvalidOrderStatusPipeException(order=order, pipe=self)
 
-            order.save(update_fields=('status',))
+            # Старые платежные данные могли быть закэшированы.
+            transaction.on_commit(lambda: OrderReadCache.invalidate([order.pk]))
 
-        self._result = PipeOrderDTO(order, payment_data)
+        return PipeOrderDTO(order, payment_data)
 
     def __dto_to_model(self, payment_init_dto: ResponsePaymentInitDTO) -> TinkoffPaymentData:
         """
@@ -1,16 +1,27 @@
-from apps.users.models.client_profile import ClientProfile
-from apps.users.services.documents_verification import ClientDocumentsVerificationService
+from django.db import transaction
 
-from utils.pipelines.exceptions import PipeProcessException
+from apps.users.models.client_profile import ClientProfile
 
-from apps.notifications.services.senders.documents_verify_failed import (
-    DocumentsVerifyFailedNoticeSender,
+from utils.pipelines.exceptions import (
+    PipeProcessException,
+    PipeTransientException,
 )
 
 from ..dto import PipeOrderDTO
-from ....models import Order
+from ....models import (
+    Order,
+    OrderNotice,
+)
 from .base import BaseOrderPipe
 from ..exceptions import InvalidOrderStatusPipeException
+from ..batch import set_batch_statuses
+from ..policy import PipePolicy
+from ..concurrency import run_concurrently
+from ...order_notices import OrderNoticeOutbox
+from ...documents_verification import (
+    DocumentChecksRunner,
+    DocumentsVerificationCache,
+)
 
 
 class VerifyDocumentsPipe(BaseOrderPipe):
@@ -24,53 +35,110 @@ class VerifyDocumentsPipe(BaseOrderPipe):
         Order.Status.VERIFY_FAILED,
     ]
 
+    # Сбои сервиса проверки документов повторяются, а если не помогло -
+    # менеджеры и клиент уведомляются, а заказ повторно ставится в очередь.
+    _POLICY: PipePolicy = PipePolicy(
+        timeout=120,
+        retries=2,
+        backoff=2.0,
+        fallback_status=Order.Status.VERIFY_FAILED,
+        fallback_notice=OrderNotice.Kind.DOCUMENTS_VERIFY_FAILED,
+        requeue_delay=5 * 60,
+        max_requeues=3,
+    )
+
     @classmethod
     def get_pipe_name(cls) -> str:
         """Получение названия пайпа"""
 
         return 'Проверка документов'
 
-    def invoke(self, order_data: PipeOrderDTO) -> None:
+    def process(self, order_data: PipeOrderDTO) -> PipeOrderDTO:
         """
         Запуск шага пайплайна.
 
         :param order_data: Данные о заказе.
+
+        :return: DTO с обработанными данными заказа.
         """
 
-        order = order_data.order
+        return self._process_as_batch(order_data)
 
-        if not self.is_valid_status(order.status):
-            raise InvalidOrderStatusPipeException(order=order, pipe=self)
+    def process_batch(self, orders_data: list[PipeOrderDTO]) -> list[PipeOrderDTO | Exception]:
+        """
+        Пакетная обработка заказов.
 
-        order.status = Order.Status.ON_APPROVAL
-        order.save(update_fields=('status',))
+        Документы клиентов проверяются параллельно, а статусы заказов
+        меняются одним запросом на каждый статус. Клиенты со свежим
+        положительным результатом в `DocumentsVerificationCache`
+        сразу переводятся в `APPROVAL_SUCCESS`.
 
-        client: ClientProfile = order.user.client_profile
+        :param orders_data: Данные о заказах.
 
-        # Запуск проверки документов.
-        try:
-            service = ClientDocumentsVerificationService()
-            service.verify(client)
-        except Exception as e:
-            self.__handle_verify_failed(order_data)
+        :return: DTO с обработанными данными либо исключения в порядке входных данных.
+        """
 
-            raise PipeProcessException(
-                pipe=self,
-                message='Непредвиденная ошибка во время проверки документов',
-            ) from e
+        results: list[PipeOrderDTO | Exception] = []
+        to_claim: list[tuple[int, Order.Status]] = []
 
-        if not client.is_full_verified_profile:
-            self.__handle_verify_failed(order_data)
+        for i, order_data in enumerate(orders_data):
+            if not self.is_valid_status(order_data.order.status):
+                results.append(InvalidOrderStatusPipeException(order=order_data.order, pipe=self))
+                continue
 
-            raise PipeProcessException(pipe=self, message='Документы не прошли проверку')
+            results.append(order_data)
+            to_claim.append((i, Order.Status.ON_APPROVAL))
 
-        order.status = Order.Status.APPROVAL_SUCCESS
-        order.save(update_fields=('status',))
+        # Проверяем только заказы, которые удалось перевести в `ON_APPROVAL`.
+        # Так один заказ не проверяется параллельно несколькими воркерами.
+        # Если обработчик упадет, заказ вернет задача `order_stale_claims_release_task`.
+        to_verify = set_batch_statuses(self, orders_data, results, to_claim)
 
-        self._result = order_data
+        # Документы, успешно проверенные для прошлых заказов и с тех пор
+        # не изменившиеся, повторно не проверяем.
+        clients = {i: orders_data[i].order.user.client_profile for i in to_verify}
+        verified_by_cache = [i for i in to_verify if DocumentsVerificationCache.is_verified(clients[i])]
+        to_check = [i for i in to_verify if i not in verified_by_cache]
 
-        if self._next is not None:
-            self._next.invoke(order_data)
+        # Запуск проверки документов.
+        verify_results = dict(zip(
+            to_check,
+            run_concurrently(self.__verify_client, [clients[i] for i in to_check]),
+        ))
+        verify_results.update((i, True) for i in verified_by_cache)
+
+        new_statuses: list[tuple[int, Order.Status]] = []
+        to_notify: set[int] = set()
+
+        for i in to_verify:
+            is_verified = verify_results[i]
+            if isinstance(is_verified, Exception):
+                # О временных ошибках здесь не уведомляем, т.к. проверка будет
+                # повторена согласно политике пайпа, а уведомление об исчерпании
+                # попыток отправляет план обработки заказа (`fallback_notice`).
+                results[i] = PipeTransientException(
+                    pipe=self,
+                    message='Непредвиденная ошибка во время проверки документов',
+                )
+                results[i].__cause__ = is_verified
+            elif not is_verified:
+                results[i] = PipeProcessException(pipe=self, message='Документы не прошли проверку')
+                to_notify.add(i)
+
+            if isinstance(results[i], Exception):
+                new_statuses.append((i, Order.Status.VERIFY_FAILED))
+            else:
+                new_statuses.append((i, Order.Status.APPROVAL_SUCCESS))
+
+        # Уведомления менеджерам и клиенту о неудачной проверке.
+        with transaction.atomic():
+            applied = set_batch_statuses(self, orders_data, results, new_statuses)
+            OrderNoticeOutbox.enqueue(
+                [orders_data[i].order for i in applied if i in to_notify],
+                OrderNotice.Kind.DOCUMENTS_VERIFY_FAILED,
+            )
+
+        return results
 
     @classmethod
     def is_valid_status(cls, order_status: Order.Status) -> bool:
@@ -90,11 +158,27 @@ class VerifyDocumentsPipe(BaseOrderPipe):
         return cls._ALLOWED_STATUSES
 
     @staticmethod
-    def __handle_verify_failed(order_data: PipeOrderDTO) -> None:
-        """Обработка заказа в случае неудачной проверки документов"""
+    def __verify_client(client: ClientProfile) -> bool:
+        """
+        Проверка документов клиента.
+
+        Если какая-либо проверка не прошла, документы не прошли проверку,
+        даже если остальные проверки не запускались. Иначе ошибка любой проверки
+        делает результат неизвестным, и проверка будет повторена.
+
+        :param client: Профиль клиента.
+
+        :return: Документы клиента прошли проверку.
+        """
+
+        result = DocumentChecksRunner().run(client)
+        if result.failed:
+            return False
+
+        if result.errors:
+            raise result.errors[0].error
 
-        order_data.order.status = Order.Status.VERIFY_FAILED
-        order_data.order.save(update_fields=('status',))
+        if result.verified:
+            DocumentsVerificationCache.set_verified(client)
 
-        # Отправка уведомлений менеджерам и клиенту о неудачной проверке.
-        DocumentsVerifyFailedNoticeSender.send(order_data.order)
+        return result.verified
@@ -0,0 +1,283 @@
+import time
+import logging
+from dataclasses import (
+    field,
+    dataclass,
+)
+
+from django.db import transaction
+
+from utils.pipelines import PipelineExecutor
+from utils.pipelines.exceptions import PipeTimeoutException
+
+from .dto import PipeOrderDTO
+from .pipes import BaseOrderPipe
+from .stages import OrderProcessStage
+from .policy import PipePolicy
+from .checkpoints import OrderPipelineCheckpointService
+from .exceptions import OrderPipelineRequeueException
+from ...models import Order
+from ..order_status import (
+    OrderStatusService,
+    OrderStatusContext,
+)
+from ..order_lock import (
+    OrderLockService,
+    OrderLockLostException,
+)
+from ..order_notices import OrderNoticeOutbox
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OrderPipelineContext:
+    """
+    Контекст одного запуска пайплайна заказа.
+
+    Хранит все состояние запуска, поэтому один и тот же план
+    можно выполнять параллельно для разных заказов.
+
+    :param data: Текущие данные о заказе.
+    :param results: Результаты выполненных этапов.
+    """
+
+    data: PipeOrderDTO
+    results: dict[OrderProcessStage, PipeOrderDTO] = field(default_factory=dict)
+
+    def get_result(self, stage: OrderProcessStage) -> PipeOrderDTO | None:
+        """
+        Получение результата этапа.
+
+        :param stage: Этап обработки заказа.
+
+        :return: DTO с обработанными данными либо None, если этап не был выполнен.
+        """
+
+        return self.results.get(stage)
+
+
+@dataclass(frozen=True)
+class OrderPipelinePlan:
+    """
+    Скомпилированный неизменяемый план обработки заказа.
+
+    Содержит этапы и пайпы в порядке выполнения. Пайпы не хранят
+    состояние запуска (см. `BaseOrderPipe.process`), поэтому план
+    строится один раз и переиспользуется всеми потоками процесса.
+
+    Пайпы запускаются в цикле через исполнитель, который собирает
+    метрики времени и запросов к БД по каждому этапу.
+
+    Если передан ID запуска, по каждому этапу сохраняется контрольная
+    точка, а уже выполненные в этом запуске этапы пропускаются.
+
+    Каждый пайп выполняется по своей политике (см. `BaseOrderPipe.get_policy`):
+    с повторами при временных ошибках. Если попытки исчерпаны, заказ
+    переводится в статус политики и, если задано, выбрасывается
+    `OrderPipelineRequeueException` для повтора в фоне. Статус при неудаче
+    и повторная постановка применяются только после завершения попытки,
+    поэтому они не пересекаются с еще выполняющимся обращением к банку.
+
+    Перед каждым этапом продлевается блокировка заказа, захваченная
+    вызывающим кодом (см. `OrderLockService.renew_held`).
+
+    :param stages: Этапы обработки в порядке выполнения.
+    :param pipes: Пайпы этапов в порядке выполнения.
+    :param executor: Исполнитель пайпов.
+    """
+
+    stages: tuple[OrderProcessStage, ...]
+    pipes: tuple[BaseOrderPipe, ...]
+    executor: PipelineExecutor = field(default_factory=PipelineExecutor)
+
+    def invoke(
+        self,
+        order_data: PipeOrderDTO,
+        run_id: str | None = None,
+    ) -> OrderPipelineContext:
+        """
+        Запуск обработки заказа по плану.
+
+        :param order_data: Данные о заказе.
+        :param run_id: ID запуска для контрольных точек. Если None,
+            контрольные точки не сохраняются.
+
+        :return: Контекст запуска с результатами выполненных этапов.
+        """
+
+        context = OrderPipelineContext(data=order_data)
+        completed_stages = (
+            OrderPipelineCheckpointService.get_completed_stages(run_id)
+            if run_id is not None
+            else set()
+        )
+
+        for stage, pipe in zip(self.stages, self.pipes):
+            if stage in completed_stages:
+                continue
+
+            # Продлеваем блокировку заказа перед каждым этапом. Если ее
+            # перехватили, этап не выполняется.
+            OrderLockService.renew_held(order_data.order.pk)
+
+            if run_id is None:
+                context.data = self.__execute_with_policy(pipe, context.data)
+            else:
+                context.data = self.__execute_with_checkpoint(run_id, stage, pipe, context.data)
+
+            context.results[stage] = context.data
+
+        return context
+
+    def invoke_batch(
+        self,
+        orders_data: list[PipeOrderDTO],
+    ) -> list[OrderPipelineContext | Exception]:
+        """
+        Пакетный запуск обработки заказов по плану.
+
+        Каждый этап получает все заказы, успешно прошедшие предыдущие этапы,
+        через `BaseOrderPipe.process_batch`. Заказ, упавший на этапе,
+        дальше не обрабатывается. Контрольные точки не сохраняются,
+        политики пайпов не применяются.
+
+        :param orders_data: Данные о заказах.
+
+        :return: Контексты запусков либо исключения в порядке входных данных.
+        """
+
+        contexts = [OrderPipelineContext(data=order_data) for order_data in orders_data]
+        errors: dict[int, Exception] = {}
+
+        for stage, pipe in zip(self.stages, self.pipes):
+            alive = [i for i in range(len(contexts)) if i not in errors]
+            for i in alive:
+                try:
+                    OrderLockService.renew_held(contexts[i].data.order.pk)
+                except OrderLockLostException as e:
+                    errors[i] = e
+
+            alive = [i for i in alive if i not in errors]
+            if not alive:
+                break
+
+            with OrderStatusContext.bind(pipe=pipe.get_pipe_name()):
+                results = pipe.process_batch([contexts[i].data for i in alive])
+            for i, result in zip(alive, results):
+                if isinstance(result, Exception):
+                    errors[i] = result
+                else:
+                    contexts[i].data = result
+                    contexts[i].results[stage] = result
+
+        return [errors.get(i, context) for i, context in enumerate(contexts)]
+
+    def __execute_with_checkpoint(
+        self,
+        run_id: str,
+        stage: OrderProcessStage,
+        pipe: BaseOrderPipe,
+        order_data: PipeOrderDTO,
+    ) -> PipeOrderDTO:
+        """Выполнение этапа с сохранением контрольной точки"""
+
+        checkpoint = OrderPipelineCheckpointService.start(run_id, order_data.order.pk, stage)
+        started_at = time.perf_counter()
+        succeeded = False
+
+        try:
+            result = self.__execute_with_policy(pipe, order_data)
+            succeeded = True
+        finally:
+            OrderPipelineCheckpointService.finish(
+                checkpoint,
+                succeeded=succeeded,
+                duration=time.perf_counter() - started_at,
+            )
+
+        return result
+
+    def __execute_with_policy(self, pipe: BaseOrderPipe, order_data: PipeOrderDTO) -> PipeOrderDTO:
+        """Выполнение этапа по политике пайпа"""
+
+        policy = pipe.get_policy()
+        attempt = 0
+
+        while True:
+            try:
+                return self.__execute_attempt(pipe, order_data, policy)
+            except Exception as e:
+                # Попытку, не уложившуюся во время, сразу не повторяем.
+                timed_out = isinstance(e, PipeTimeoutException)
+
+                if not timed_out and policy.is_retryable(e) and attempt < policy.retries:
+                    time.sleep(policy.get_backoff_delay(attempt))
+                    attempt += 1
+                    continue
+
+                if timed_out or policy.is_retryable(e):
+                    if policy.fallback_status is not None:
+                        self.__apply_fallback(order_data.order, policy)
+
+                    if policy.requeue_delay is not None:
+                        raise OrderPipelineRequeueException(
+                            pipe=pipe,
+                            delay=policy.requeue_delay,
+                            max_requeues=policy.max_requeues,
+                        ) from e
+
+                raise
+
+    @staticmethod
+    def __apply_fallback(order: Order, policy: PipePolicy) -> None:
+        """Перевод заказа в статус при неудаче и постановка уведомления из политики"""
+
+        with transaction.atomic():
+            OrderStatusService.set_status(order, policy.fallback_status)
+
+            # Пайп мог сам перевести заказ в этот статус при временной ошибке,
+            # поэтому уведомляем, если заказ в нем находится, а не только при смене.
+            if policy.fallback_notice is not None and order.status == policy.fallback_status:
+                OrderNoticeOutbox.enqueue([order], policy.fallback_notice)
+
+    def __execute_attempt(
+        self,
+        pipe: BaseOrderPipe,
+        order_data: PipeOrderDTO,
+        policy: PipePolicy,
+    ) -> PipeOrderDTO:
+        """
+        Выполнение одной попытки этапа.
+
+        Попытка не прерывается по времени: брошенная в фоне попытка могла бы
+        обратиться к банку уже после смены статуса заказа при неудаче
+        или повторной постановки в очередь. Время внешних вызовов
+        ограничивают таймауты HTTP-клиентов.
+
+        :raises PipeTimeoutException: Если попытка упала с временной ошибкой,
+            выполняясь дольше времени из политики.
+        """
+
+        timeout = policy.timeout
+        started_at = time.monotonic()
+
+        try:
+            with OrderStatusContext.bind(pipe=pipe.get_pipe_name()):
+                result = self.executor.execute_pipe(pipe, order_data)
+        except Exception as e:
+            is_timed_out = timeout is not None and time.monotonic() - started_at > timeout
+            if is_timed_out and policy.is_retryable(e):
+                raise PipeTimeoutException(pipe, timeout) from e
+
+            raise
+
+        duration = time.monotonic() - started_at
+        if timeout is not None and duration > timeout:
+            logger.warning(
+                f'Этап {pipe.get_pipe_name()} заказа №{order_data.order.pk} '
+                f'выполнялся {duration:.1f} с при ожидаемых {timeout} с'
+            )
+
+        return result
@@ -0,0 +1,63 @@
+from dataclasses import dataclass
+
+from utils.pipelines.exceptions import PipeTransientException
+
+from ...models import (
+    Order,
+    OrderNotice,
+)
+
+
+@dataclass(frozen=True)
+class PipePolicy:
+    """
+    Политика выполнения пайпа заказа.
+
+    Объявляется на классе пайпа и применяется планом обработки заказа.
+
+    :param timeout: Ожидаемое время выполнения одной попытки в секундах.
+        Попытка не прерывается: пайпы меняют состояние заказа и платежа,
+        поэтому попытка всегда доводится до конца, а время внешних вызовов
+        ограничивают таймауты HTTP-клиентов. Упавшая попытка, превысившая
+        это время, не повторяется: заказ сразу переводится в статус
+        при неудаче и, если задано, повторно ставится в очередь.
+    :param retries: Кол-во повторных попыток сразу после ошибки.
+    :param backoff: Задержка перед первым повтором в секундах.
+        Удваивается с каждой следующей попыткой.
+    :param retry_on: Типы ошибок, после которых пайп можно повторить.
+    :param fallback_status: Статус, в который переводится заказ, если
+        все попытки завершились временной ошибкой или по времени.
+    :param fallback_notice: Уведомление, которое ставится в исходящую очередь
+        вместе со сменой статуса при неудаче. Если None, не отправляется.
+    :param requeue_delay: Через сколько секунд повторить обработку заказа
+        в фоне, если все попытки не удались. Если None, заказ не
+        ставится в очередь повторно.
+    :param max_requeues: Максимальное кол-во повторных постановок в очередь.
+    """
+
+    timeout: float | None = None
+    retries: int = 0
+    backoff: float = 0.0
+    retry_on: tuple[type[Exception], ...] = (PipeTransientException,)
+    fallback_status: Order.Status | None = None
+    fallback_notice: OrderNotice.Kind | None = None
+    requeue_delay: int | None = None
+    max_requeues: int = 0
+
+    def is_retryable(self, error: Exception) -> bool:
+        """
+        Проверка, что после ошибки пайп можно повторить.
+
+        :param error: Ошибка выполнения пайпа.
+        """
+
+        return isinstance(error, self.retry_on)
+
+    def get_backoff_delay(self, attempt: int) -> float:
+        """
+        Получение задержки перед повтором.
+
+        :param attempt: Номер неудачной попытки, начиная с нуля.
+        """
+
+        return self.backoff * 2 ** attempt
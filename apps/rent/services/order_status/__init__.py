@@ -0,0 +1,34 @@
+"""
+Пакет для работы со статусами заказов.
+
+Все смены статусов заказов (в пайпах, обработчиках уведомлений
+и периодических задачах) должны проходить через `OrderStatusService`.
+Сервис не только сохраняет новый статус, но и публикует событие
+о смене статуса в `OrderStatusEventBus`, на которое подписываются,
+например, клиенты в ожидании оплаты заказа, и сбрасывает кэш
+представлений заказа `OrderReadCache`.
+
+Допустимые переходы между статусами описаны в `ORDER_STATUS_TRANSITIONS`.
+Каждый переход записывается в журнал `OrderStatusTransition`, по которому
+`OrderStatusAnalyticsService` строит дневные сводки для дашборда.
+"""
+
+from .analytics import OrderStatusAnalyticsService
+from .cache import (
+    OrderReadKind,
+    OrderReadCache,
+)
+from .events import (
+    OrderStatusEvent,
+    OrderStatusEventBus,
+)
+from .context import OrderStatusContext
+from .service import OrderStatusService
+from .transitions import (
+    get_source_statuses,
+    ORDER_STATUS_TRANSITIONS,
+)
+from .versioning import (
+    OrderVersion,
+    OrderVersionService,
+)
@@ -0,0 +1,134 @@
+from collections import defaultdict
+from datetime import (
+    date,
+    time,
+    datetime,
+    timedelta,
+)
+
+from django.db import transaction
+from django.db.models import (
+    Max,
+    Sum,
+    Count,
+    OuterRef,
+    Subquery,
+)
+from django.utils import timezone
+
+from ...models import (
+    Order,
+    OrderStatusRollup,
+    OrderStatusTransition,
+)
+
+
+class OrderStatusAnalyticsService:
+    """
+    Сервис аналитики по статусам заказов.
+
+    Дневные сводки строятся только по журналу переходов, а дашборд
+    читает только сводки. Таблица заказов при этом не затрагивается.
+    """
+
+    @classmethod
+    def rollup_day(cls, day: date) -> None:
+        """
+        Построение сводок по статусам за день.
+
+        Повторный запуск за тот же день перестраивает сводки.
+
+        :param day: День в локальном часовом поясе.
+        """
+
+        starts_at = timezone.make_aware(datetime.combine(day, time.min))
+        ends_at = starts_at + timedelta(days=1)
+        day_transitions = OrderStatusTransition.objects.filter(
+            created_at__gte=starts_at,
+            created_at__lt=ends_at,
+        )
+
+        rollups: dict[str, dict[str, float]] = defaultdict(lambda: {
+            'entered_count': 0,
+            'exited_count': 0,
+            'dwell_seconds_total': 0.0,
+            'dwell_seconds_max': 0.0,
+        })
+
+        for row in day_transitions.values('to_status').annotate(count=Count('id')):
+            rollups[row['to_status']]['entered_count'] = row['count']
+
+        # Время входа в статус - время предыдущего перехода этого заказа.
+        entered_at = Subquery(
+            OrderStatusTransition.objects
+                .filter(order_id=OuterRef('order_id'), created_at__lt=OuterRef('created_at'))  # noqa: E131
+                .order_by('-created_at')  # noqa: E131
+                .values('created_at')[:1]  # noqa: E131
+        )
+        exits = (
+            day_transitions
+                .annotate(entered_at=entered_at)  # noqa: E131
+                .values_list('from_status', 'created_at', 'entered_at')  # noqa: E131
+        )
+        for from_status, exited_at, status_entered_at in exits.iterator():
+            rollup = rollups[from_status]
+            rollup['exited_count'] += 1
+
+            if status_entered_at is not None:
+                dwell_seconds = (exited_at - status_entered_at).total_seconds()
+                rollup['dwell_seconds_total'] += dwell_seconds
+                rollup['dwell_seconds_max'] = max(rollup['dwell_seconds_max'], dwell_seconds)
+
+        with transaction.atomic():
+            OrderStatusRollup.objects.filter(day=day).delete()
+            OrderStatusRollup.objects.bulk_create([
+                OrderStatusRollup(day=day, status=status, **values)
+                for status, values in rollups.items()
+            ])
+
+    @classmethod
+    def get_funnel(cls, date_from: date, date_to: date) -> list[dict]:
+        """
+        Получение воронки и задержек по статусам за период.
+
+        :param date_from: Первый день периода.
+        :param date_to: Последний день периода включительно.
+
+        :return: Для каждого статуса кол-во входов, выходов, среднее
+            и максимальное время нахождения в статусе в секундах.
+        """
+
+        rows = {
+            row['status']: row
+            for row in (
+                OrderStatusRollup.objects
+                    .filter(day__gte=date_from, day__lte=date_to)  # noqa: E131
+                    .values('status')  # noqa: E131
+                    .annotate(  # noqa: E131
+                        entered_count=Sum('entered_count'),
+                        exited_count=Sum('exited_count'),
+                        dwell_seconds_total=Sum('dwell_seconds_total'),
+                        dwell_seconds_max=Max('dwell_seconds_max'),
+                    )
+            )
+        }
+
+        funnel = []
+        for status in Order.Status:
+            row = rows.get(status.value)
+            if row is None:
+                continue
+
+            funnel.append({
+                'status': status.value,
+                'entered_count': row['entered_count'],
+                'exited_count': row['exited_count'],
+                'dwell_seconds_avg': (
+                    row['dwell_seconds_total'] / row['exited_count']
+                    if row['exited_count']
+                    else None
+                ),
+                'dwell_seconds_max': row['dwell_seconds_max'],
+            })
+
+        return funnel
@@ -0,0 +1,190 @@
+import threading
+from enum import Enum
+from typing import (
+    Any,
+    Final,
+    Callable,
+)
+
+from django.conf import settings
+from django.core.cache import caches
+
+from utils.caching import (
+    LRUCache,
+    CacheStats,
+)
+
+from .versioning import OrderVersion
+
+
+class OrderReadKind(str, Enum):
+    """Виды кэшируемых представлений заказа"""
+
+    STATUS = 'status'
+    PAYMENT_DATA = 'payment_data'
+
+
+class OrderReadCache:
+    """
+    Read-through кэш часто читаемых представлений заказа.
+
+    Кэширует сериализованные статус заказа и платежные данные.
+    Первый уровень - LRU-кэш в памяти процесса. Второй (опциональный) -
+    общий кэш Django с алиасом из настройки `RENT_ORDER_READ_CACHE`.
+
+    Каждое значение хранится вместе с ETag версии заказа, для которой
+    оно было построено. Значение другой версии считается промахом.
+    Кроме того, кэш явно сбрасывается при каждой смене статуса заказа
+    и замене его платежных данных.
+    """
+
+    _SHARED_KEY_TEMPLATE: Final[str] = 'rent:order_read:{kind}:{order_id}'
+    _SHARED_TTL: Final[int] = 10 * 60
+
+    __local: LRUCache[tuple[str, int], tuple[str, Any]] | None = None
+    __lock = threading.Lock()
+    __counters: dict[str, list[int]] = {'local': [0, 0], 'shared': [0, 0]}
+
+    @classmethod
+    def get(cls, kind: OrderReadKind, order_version: OrderVersion) -> Any | None:
+        """
+        Получение представления заказа из кэша.
+
+        :param kind: Вид представления.
+        :param order_version: Актуальная версия заказа.
+
+        :return: Сериализованные данные либо None при промахе.
+        """
+
+        token = order_version.get_etag(kind.value)
+        local_key = (kind.value, order_version.order_id)
+
+        item = cls.__get_local().get(local_key)
+        if item is not None and item[0] == token:
+            cls.__count('local', hit=True)
+            return item[1]
+        cls.__count('local', hit=False)
+
+        shared_cache = cls.__get_shared()
+        if shared_cache is None:
+            return None
+
+        item = shared_cache.get(cls.__get_shared_key(kind, order_version.order_id))
+        if item is not None and item[0] == token:
+            cls.__count('shared', hit=True)
+            cls.__get_local().set(local_key, item)
+            return item[1]
+        cls.__count('shared', hit=False)
+
+        return None
+
+    @classmethod
+    def set(cls, kind: OrderReadKind, order_version: OrderVersion, data: Any) -> None:
+        """
+        Сохранение представления заказа в кэш.
+
+        :param kind: Вид представления.
+        :param order_version: Версия заказа, для которой построено представление.
+        :param data: Сериализованные данные.
+        """
+
+        item = (order_version.get_etag(kind.value), data)
+        cls.__get_local().set((kind.value, order_version.order_id), item)
+
+        shared_cache = cls.__get_shared()
+        if shared_cache is not None:
+            shared_cache.set(
+                cls.__get_shared_key(kind, order_version.order_id),
+                item,
+                cls._SHARED_TTL,
+            )
+
+    @classmethod
+    def get_or_set(
+        cls,
+        kind: OrderReadKind,
+        order_version: OrderVersion,
+        factory: Callable[[], Any],
+    ) -> Any:
+        """
+        Получение представления заказа из кэша либо его построение.
+
+        :param kind: Вид представления.
+        :param order_version: Актуальная версия заказа.
+        :param factory: Функция построения представления при промахе.
+        """
+
+        data = cls.get(kind, order_version)
+        if data is None:
+            data = factory()
+            cls.set(kind, order_version, data)
+
+        return data
+
+    @classmethod
+    def invalidate(cls, order_ids: list[int]) -> None:
+        """
+        Сброс всех закэшированных представлений заказов.
+
+        :param order_ids: ID заказов.
+        """
+
+        local_cache = cls.__get_local()
+        shared_cache = cls.__get_shared()
+
+        for order_id in order_ids:
+            for kind in OrderReadKind:
+                local_cache.delete((kind.value, order_id))
+
+        if shared_cache is not None:
+            shared_cache.delete_many([
+                cls.__get_shared_key(kind, order_id)
+                for order_id in order_ids
+                for kind in OrderReadKind
+            ])
+
+    @classmethod
+    def get_stats(cls) -> dict[str, CacheStats]:
+        """Получение статистики попаданий по уровням кэша"""
+
+        local_size = cls.__get_local().get_stats().size
+
+        with cls.__lock:
+            return {
+                'local': CacheStats(*cls.__counters['local'], size=local_size),
+                'shared': CacheStats(*cls.__counters['shared'], size=0),
+            }
+
+    @classmethod
+    def __count(cls, level: str, hit: bool) -> None:
+        """Учет попадания или промаха"""
+
+        with cls.__lock:
+            cls.__counters[level][0 if hit else 1] += 1
+
+    @classmethod
+    def __get_local(cls) -> LRUCache[tuple[str, int], tuple[str, Any]]:
+        """Получение локального кэша процесса"""
+
+        if cls.__local is None:
+            with cls.__lock:
+                if cls.__local is None:
+                    cls.__local = LRUCache(
+                        maxsize=getattr(settings, 'RENT_ORDER_READ_CACHE_SIZE', 4096),
+                    )
+
+        return cls.__local
+
+    @staticmethod
+    def __get_shared():
+        """Получение общего кэша либо None, если он не настроен"""
+
+        alias = getattr(settings, 'RENT_ORDER_READ_CACHE', None)
+
+        return caches[alias] if alias is not None else None
+
+    @classmethod
+    def __get_shared_key(cls, kind: OrderReadKind, order_id: int) -> str:
+        """Получение ключа в общем кэше"""
+
+        return cls._SHARED_KEY_TEMPLATE.format(kind=kind.value, order_id=order_id)
@@ -0,0 +1,49 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+
+class OrderStatusContext:
+    """
+    Контекст смены статусов заказов.
+
+    Хранит, кто (`actor`) и в каком пайпе (`pipe`) меняет статусы.
+    Значения попадают в журнал переходов статусов. Контекст хранится
+    в `ContextVar`, поэтому не пересекается между потоками и задачами.
+    """
+
+    __actor: ContextVar[str] = ContextVar('order_status_actor', default='')
+    __pipe: ContextVar[str] = ContextVar('order_status_pipe', default='')
+
+    @classmethod
+    @contextmanager
+    def bind(cls, actor: str | None = None, pipe: str | None = None) -> Iterator[None]:
+        """
+        Установка контекста на время выполнения блока.
+
+        :param actor: Кто меняет статусы. Если None, остается текущий.
+        :param pipe: Название пайпа. Если None, остается текущий.
+        """
+
+        actor_token = cls.__actor.set(actor) if actor is not None else None
+        pipe_token = cls.__pipe.set(pipe) if pipe is not None else None
+
+        try:
+            yield
+        finally:
+            if pipe_token is not None:
+                cls.__pipe.reset(pipe_token)
+            if actor_token is not None:
+                cls.__actor.reset(actor_token)
+
+    @classmethod
+    def get_actor(cls) -> str:
+        """Получение текущего инициатора смены статусов"""
+
+        return cls.__actor.get()
+
+    @classmethod
+    def get_pipe(cls) -> str:
+        """Получение текущего пайпа"""
+
+        return cls.__pipe.get()
@@ -0,0 +1,172 @@
+import time
+import threading
+from typing import (
+    Final,
+    Iterator,
+)
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+@dataclass(frozen=True)
+class OrderStatusEvent:
+    """
+    Событие смены статуса заказа.
+
+    :param order_id: ID заказа.
+    :param status: Новый статус заказа.
+    :param published_at: Время публикации события (UNIX-время).
+    :param version: Версия заказа после смены статуса. 0 - версия неизвестна.
+    """
+
+    order_id: int
+    status: str
+    published_at: float
+    version: int = 0
+
+
+class OrderStatusEventBus:
+    """
+    Шина событий смены статусов заказов.
+
+    Последнее событие по каждому заказу хранится в кэше Django
+    (алиас задается настройкой `RENT_ORDER_STATUS_EVENTS_CACHE`),
+    поэтому события, опубликованные в воркерах Celery, видны
+    веб-процессам. Ожидающие события потоки текущего процесса
+    будятся сразу при публикации, а события из других процессов
+    подхватываются опросом кэша с небольшим интервалом.
+    БД при ожидании не используется.
+
+    События сравниваются по версии заказа, а не по статусу: событие
+    в кэше может оказаться старше данных, известных ожидающему
+    (например, статус успел смениться дважды), и такое событие
+    не должно прерывать ожидание.
+
+    Ожидающий занимает поток процесса на все время ожидания, поэтому
+    кол-во одновременно ожидающих в процессе ограничено настройкой
+    `RENT_ORDER_STATUS_MAX_WAITERS` (см. `reserve_waiter`).
+    """
+
+    _CACHE_KEY_TEMPLATE: Final[str] = 'rent:order_status_event:{order_id}'
+    _EVENT_TTL: Final[int] = 60 * 60
+    _POLL_INTERVAL: Final[float] = 0.5
+    _DEFAULT_MAX_WAITERS: Final[int] = 16
+
+    __condition = threading.Condition()
+    __waiters: threading.BoundedSemaphore | None = None
+    __waiters_lock = threading.Lock()
+
+    @classmethod
+    def publish(cls, order_id: int, status: str, version: int) -> OrderStatusEvent:
+        """
+        Публикация события смены статуса заказа.
+
+        :param order_id: ID заказа.
+        :param status: Новый статус заказа.
+        :param version: Версия заказа после смены статуса.
+
+        :return: Опубликованное событие.
+        """
+
+        event = OrderStatusEvent(
+            order_id=order_id,
+            status=str(status),
+            published_at=time.time(),
+            version=version,
+        )
+        cls.__get_cache().set(
+            cls._CACHE_KEY_TEMPLATE.format(order_id=order_id),
+            event,
+            cls._EVENT_TTL,
+        )
+
+        with cls.__condition:
+            cls.__condition.notify_all()
+
+        return event
+
+    @classmethod
+    def get_last_event(cls, order_id: int) -> OrderStatusEvent | None:
+        """
+        Получение последнего события смены статуса заказа.
+
+        :param order_id: ID заказа.
+        """
+
+        return cls.__get_cache().get(cls._CACHE_KEY_TEMPLATE.format(order_id=order_id))
+
+    @classmethod
+    def wait(
+        cls,
+        order_id: int,
+        known_version: int,
+        timeout: float,
+    ) -> OrderStatusEvent | None:
+        """
+        Ожидание смены статуса заказа.
+
+        :param order_id: ID заказа.
+        :param known_version: Версия заказа, известная ожидающему.
+        :param timeout: Максимальное время ожидания в секундах.
+
+        :return:
+            Событие смены статуса, опубликованное после `known_version`,
+            либо None, если за время ожидания статус не сменился.
+        """
+
+        deadline = time.monotonic() + timeout
+
+        while True:
+            event = cls.get_last_event(order_id)
+            # События не новее известной версии устарели и пропускаются.
+            if event is not None and event.version > known_version:
+                return event
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+
+            with cls.__condition:
+                cls.__condition.wait(min(cls._POLL_INTERVAL, remaining))
+
+    @classmethod
+    @contextmanager
+    def reserve_waiter(cls) -> Iterator[bool]:
+        """
+        Резервирование места ожидающего в текущем процессе.
+
+        Место не ждет освобождения: если все места заняты,
+        сразу возвращается False, и ждать смены статуса нельзя.
+
+        :return: True, если место зарезервировано.
+        """
+
+        waiters = cls.__get_waiters()
+        is_reserved = waiters.acquire(blocking=False)
+        try:
+            yield is_reserved
+        finally:
+            if is_reserved:
+                waiters.release()
+
+    @classmethod
+    def __get_waiters(cls) -> threading.BoundedSemaphore:
+        """Получение семафора ожидающих текущего процесса"""
+
+        if cls.__waiters is None:
+            with cls.__waiters_lock:
+                if cls.__waiters is None:
+                    cls.__waiters = threading.BoundedSemaphore(
+                        getattr(settings, 'RENT_ORDER_STATUS_MAX_WAITERS', cls._DEFAULT_MAX_WAITERS),
+                    )
+
+        return cls.__waiters
+
+    @staticmethod
+    def __get_cache():
+        """Получение кэша для хранения событий"""
+
+        return caches[getattr(settings, 'RENT_ORDER_STATUS_EVENTS_CACHE', 'default')]
@@ -0,0 +1,265 @@
+from typing import Iterable
+from collections import defaultdict
+
+from django.db import (
+    connection,
+    transaction,
+)
+from django.db.models import (
+    F,
+    QuerySet,
+)
+from django.utils import timezone
+
+from ...models import (
+    Order,
+    OrderStatusTransition,
+)
+from .cache import OrderReadCache
+from .context import OrderStatusContext
+from .events import OrderStatusEventBus
+from .transitions import get_source_statuses
+
+
+class OrderStatusService:
+    """
+    Сервис смены статусов заказов.
+
+    Единая точка смены статуса заказа. Статус меняется атомарно одним
+    запросом `UPDATE ... WHERE pk = ? AND status IN (...)`, где допустимые
+    исходные статусы берутся из таблицы переходов (см. `ORDER_STATUS_TRANSITIONS`).
+    Если заказ параллельно перевели в другой статус, смена не применяется,
+    и вызывающий код узнает об этом по возвращаемому значению.
+
+    Каждый переход тем же запросом записывается в журнал `OrderStatusTransition`
+    вместе с инициатором и пайпом из `OrderStatusContext`.
+
+    Помимо сохранения статуса увеличивает версию заказа, сбрасывает кэш
+    представлений заказа и публикует событие о смене статуса после
+    фиксации транзакции.
+    """
+
+    @classmethod
+    def set_status(
+        cls,
+        order: Order,
+        new_status: Order.Status,
+        from_statuses: Iterable[Order.Status] | None = None,
+    ) -> bool:
+        """
+        Смена статуса заказа.
+
+        :param order: Объект заказа. При успешной смене статус и версия обновляются и в нем.
+        :param new_status: Новый статус заказа.
+        :param from_statuses: Допустимые текущие статусы. По умолчанию из таблицы переходов.
+
+        :return: Статус был сменен.
+        """
+
+        applied_versions = cls.__compare_and_set([order.pk], new_status, from_statuses)
+        if order.pk not in applied_versions:
+            return False
+
+        order.status = new_status
+        order.version = applied_versions[order.pk]
+
+        return True
+
+    @classmethod
+    def set_status_by_pk(
+        cls,
+        order_id: int,
+        new_status: Order.Status,
+        from_statuses: Iterable[Order.Status] | None = None,
+    ) -> bool:
+        """
+        Смена статуса заказа по его ID без загрузки заказа.
+
+        :param order_id: ID заказа.
+        :param new_status: Новый статус заказа.
+        :param from_statuses: Допустимые текущие статусы. По умолчанию из таблицы переходов.
+
+        :return: Статус был сменен.
+        """
+
+        return bool(cls.__compare_and_set([order_id], new_status, from_statuses))
+
+    @classmethod
+    def set_statuses(cls, new_statuses: list[tuple[Order, Order.Status]]) -> list[bool]:
+        """
+        Смена статусов нескольких заказов.
+
+        Заказы группируются по новому статусу, и на каждый статус
+        выполняется один запрос к БД.
+
+        :param new_statuses:
+            Пары из объекта заказа и его нового статуса.
+            При успешной смене статус и версия обновляются и в объекте заказа.
+
+        :return: Признаки смены статуса в порядке входных данных.
+        """
+
+        if not new_statuses:
+            return []
+
+        order_ids_by_status: dict[Order.Status, list[int]] = defaultdict(list)
+        for order, new_status in new_statuses:
+            order_ids_by_status[new_status].append(order.pk)
+
+        applied_versions: dict[tuple[int, Order.Status], int] = {}
+        with transaction.atomic():
+            for new_status, order_ids in order_ids_by_status.items():
+                applied_versions.update(
+                    ((order_id, new_status), version)
+                    for order_id, version in cls.__compare_and_set(order_ids, new_status).items()
+                )
+
+        results: list[bool] = []
+        for order, new_status in new_statuses:
+            version = applied_versions.get((order.pk, new_status))
+            is_applied = version is not None
+            if is_applied:
+                order.status = new_status
+                order.version = version
+            results.append(is_applied)
+
+        return results
+
+    @classmethod
+    def bulk_set_status(
+        cls,
+        queryset: QuerySet[Order],
+        new_status: Order.Status,
+        from_statuses: Iterable[Order.Status] | None = None,
+    ) -> int:
+        """
+        Смена статуса у всех заказов из выборки.
+
+        Заказы, которые к моменту смены уже находятся в статусе,
+        из которого нельзя перейти в новый, пропускаются.
+
+        :param queryset: Выборка заказов.
+        :param new_status: Новый статус заказов.
+        :param from_statuses: Допустимые текущие статусы. По умолчанию из таблицы переходов.
+
+        :return: Кол-во заказов, у которых был сменен статус.
+        """
+
+        # Выборка может содержать аннотации и внешние соединения,
+        # поэтому сначала получаем ID, а статус меняем по ним.
+        order_ids = list(queryset.values_list('pk', flat=True))
+
+        return len(cls.__compare_and_set(order_ids, new_status, from_statuses))
+
+    @classmethod
+    def __compare_and_set(
+        cls,
+        order_ids: list[int],
+        new_status: Order.Status,
+        from_statuses: Iterable[Order.Status] | None = None,
+    ) -> dict[int, int]:
+        """
+        Атомарная смена статуса заказов, находящихся в допустимых статусах.
+
+        Смена статуса и запись в журнал переходов выполняются одним запросом.
+
+        :return: Новые версии заказов, у которых был сменен статус, по их ID.
+        """
+
+        if not order_ids:
+            return {}
+
+        from_statuses = (
+            frozenset(from_statuses)
+            if from_statuses is not None
+            else get_source_statuses(new_status)
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                cls.__get_compare_and_set_sql(),
+                {
+                    'order_ids': list(order_ids),
+                    'from_statuses': [str(status) for status in from_statuses],
+                    'new_status': str(new_status),
+                    'now': timezone.now(),
+                    'actor': OrderStatusContext.get_actor(),
+                    'pipe': OrderStatusContext.get_pipe(),
+                },
+            )
+            applied_versions = {order_id: version for order_id, version in cursor.fetchall()}
+
+        if applied_versions:
+            cls._on_status_changed(applied_versions, new_status)
+
+        return applied_versions
+
+    @staticmethod
+    def __get_compare_and_set_sql() -> str:
+        """
+        Получение запроса смены статуса с записью в журнал переходов.
+
+        Блокировка строк в `old` нужна, чтобы получить статус, из которого
+        был совершен переход. Строка, статус которой сменили параллельно,
+        после снятия блокировки перепроверяется и отбрасывается.
+        Увеличение версии повторяет `OrderVersionService.get_bump_fields`.
+        """
+
+        return f"""
+            WITH old AS (
+                SELECT id, status
+                FROM {Order._meta.db_table}
+                WHERE id = ANY(%(order_ids)s) AND status = ANY(%(from_statuses)s)
+                FOR UPDATE
+            ), changed AS (
+                UPDATE {Order._meta.db_table} AS o
+                SET status = %(new_status)s, version = o.version + 1, updated_at = %(now)s
+                FROM old
+                WHERE o.id = old.id
+                RETURNING o.id, o.version, old.status AS from_status
+            ), logged AS (
+                INSERT INTO {OrderStatusTransition._meta.db_table}
+                    (order_id, from_status, to_status, created_at, actor, pipe)
+                SELECT id, from_status, %(new_status)s, %(now)s, %(actor)s, %(pipe)s
+                FROM changed
+            )
+            SELECT id, version FROM changed
+        """
+
+    @classmethod
+    def notify_status_changed(cls, order: Order) -> None:
+        """
+        Учет смены статуса заказа, выполненной в обход сервиса
+        (например, `ExpiredOrdersChecker` при истечении платежной сессии).
+
+        Увеличивает версию заказа, сбрасывает кэш представлений заказа
+        и публикует событие о смене статуса, чтобы ожидающие клиенты
+        узнали о ней сразу.
+
+        :param order: Объект заказа с новым статусом. Версия обновляется и в нем.
+        """
+
+        with transaction.atomic():
+            Order.objects.filter(pk=order.pk).update(version=F('version') + 1, updated_at=timezone.now())
+            order.version = Order.objects.filter(pk=order.pk).values_list('version', flat=True).get()
+            cls._on_status_changed({order.pk: order.version}, Order.Status(order.status))
+
+    @classmethod
+    def _on_status_changed(cls, order_versions: dict[int, int], new_status: Order.Status) -> None:
+        """
+        Действия после смены статуса заказов.
+
+        Выполняются только после фиксации транзакции, чтобы подписчики
+        не увидели статус, который будет откачен.
+
+        :param order_versions: Новые версии заказов, у которых сменился статус, по их ID.
+        :param new_status: Новый статус заказов.
+        """
+
+        def publish() -> None:
+            OrderReadCache.invalidate(list(order_versions))
+
+            for order_id, version in order_versions.items():
+                OrderStatusEventBus.publish(order_id, new_status, version)
+
+        transaction.on_commit(publish)
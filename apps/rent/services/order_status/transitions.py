@@ -0,0 +1,100 @@
+from ...models import Order
+
+
+Status = Order.Status
+
+# Таблица переходов статусов заказа: новый статус -> статусы,
+# из которых в него можно перейти.
+ORDER_STATUS_TRANSITIONS: dict[Order.Status, frozenset[Order.Status]] = {
+    # Инициализация и реинициализация платежной сессии.
+    Status.AWAIT_PAYMENT: frozenset({Status.NEW, Status.ON_REINIT}),
+    Status.AWAIT_RESERVATION: frozenset({Status.NEW, Status.ON_REINIT}),
+    Status.ON_REINIT: frozenset({
+        Status.REJECTED,
+        Status.REINIT_FAILED,
+        Status.PAYMENT_SESSION_EXPIRED,
+    }),
+    Status.REINIT_FAILED: frozenset({Status.ON_REINIT}),
+
+    # Уведомления банка и истечение платежной сессии.
+    Status.REJECTED: frozenset({Status.AWAIT_PAYMENT, Status.AWAIT_RESERVATION}),
+    Status.PAYMENT_SESSION_EXPIRED: frozenset({Status.AWAIT_PAYMENT, Status.AWAIT_RESERVATION}),
+
+    # Проверка наличия документов.
+    Status.PAYMENT_SUCCESS: frozenset({Status.AWAIT_PAYMENT, Status.AWAIT_RESERVATION}),
+    Status.RESERVATION_SUCCESS: frozenset({Status.AWAIT_PAYMENT, Status.AWAIT_RESERVATION}),
+    Status.WITHOUT_DOCS: frozenset({Status.AWAIT_PAYMENT, Status.AWAIT_RESERVATION}),
+
+    # Проверка документов.
+    Status.ON_APPROVAL: frozenset({
+        Status.PAYMENT_SUCCESS,
+        Status.RESERVATION_SUCCESS,
+        Status.WITHOUT_DOCS,
+        Status.VERIFY_FAILED,
+    }),
+    Status.APPROVAL_SUCCESS: frozenset({Status.ON_APPROVAL}),
+    Status.VERIFY_FAILED: frozenset({Status.ON_APPROVAL}),
+
+    # Подтверждение заказа.
+    Status.AWAIT_CONFIRM_PAYMENT: frozenset({
+        Status.APPROVAL_SUCCESS,
+        Status.WITHOUT_DOCS,
+        Status.VERIFY_FAILED,
+        Status.CONFIRM_PAYMENT_FAILED,
+    }),
+    Status.CONFIRM_PAYMENT_FAILED: frozenset({Status.AWAIT_CONFIRM_PAYMENT}),
+    Status.BOOKED: frozenset({
+        Status.AWAIT_CONFIRM_PAYMENT,
+        Status.APPROVAL_SUCCESS,
+        Status.WITHOUT_DOCS,
+        Status.VERIFY_FAILED,
+        Status.CONFIRM_PAYMENT_FAILED,
+    }),
+
+    # Прокат.
+    Status.ACTIVE: frozenset({Status.BOOKED}),
+    Status.COMPLETED: frozenset({Status.ACTIVE}),
+    # Отмена занимает заказ статусом `CANCELING` до обращения к банку.
+    # Из `CANCELING` в него же - повторная отмена после падения обработчика.
+    Status.CANCELING: frozenset({
+        Status.NEW,
+        Status.AWAIT_PAYMENT,
+        Status.AWAIT_RESERVATION,
+        Status.RESERVATION_SUCCESS,
+        Status.PAYMENT_SUCCESS,
+        Status.WITHOUT_DOCS,
+        Status.VERIFY_FAILED,
+        Status.APPROVAL_SUCCESS,
+        Status.CONFIRM_PAYMENT_FAILED,
+        Status.BOOKED,
+        Status.CANCELING,
+    }),
+    Status.CANCELED: frozenset({
+        Status.CANCELING,
+        Status.NEW,
+        Status.AWAIT_PAYMENT,
+        Status.AWAIT_RESERVATION,
+        Status.RESERVATION_SUCCESS,
+        Status.PAYMENT_SUCCESS,
+        Status.WITHOUT_DOCS,
+        Status.VERIFY_FAILED,
+        Status.APPROVAL_SUCCESS,
+        Status.CONFIRM_PAYMENT_FAILED,
+        Status.BOOKED,
+    }),
+}
+
+
+def get_source_statuses(new_status: Order.Status) -> frozenset[Order.Status]:
+    """
+    Получение статусов, из которых можно перейти в новый статус.
+
+    :param new_status: Новый статус заказа.
+
+    :raises ValueError: Если в статус нельзя перейти ни из одного статуса.
+    """
+
+    try:
+        return ORDER_STATUS_TRANSITIONS[new_status]
+    except KeyError:
+        raise ValueError(f'Переход в статус {new_status} не предусмотрен') from None
@@ -0,0 +1,143 @@
+from typing import (
+    Any,
+    Final,
+)
+from datetime import datetime
+from dataclasses import dataclass
+
+from django.utils import timezone
+from django.utils.http import parse_etags
+from django.db.models import (
+    F,
+    QuerySet,
+    DateTimeField,
+    ExpressionWrapper,
+)
+
+from ...models import Order
+
+
+# Статусы, в которых заказ может перейти в `PAYMENT_SESSION_EXPIRED`
+# при истечении платежной сессии без увеличения версии.
+_EXPIRABLE_STATUSES: Final[tuple[Order.Status, ...]] = (
+    Order.Status.AWAIT_PAYMENT,
+    Order.Status.AWAIT_RESERVATION,
+)
+
+
+@dataclass(frozen=True)
+class OrderVersion:
+    """
+    Версия данных заказа.
+
+    :param order_id: ID заказа.
+    :param version: Номер версии заказа.
+    :param status: Текущий статус заказа.
+    :param updated_at: Дата последнего изменения заказа.
+    :param payment_session_expired_at: Дата истечения платежной сессии.
+    """
+
+    order_id: int
+    version: int
+    status: str
+    updated_at: datetime | None
+    payment_session_expired_at: datetime | None
+
+    def get_etag(self, resource: str) -> str:
+        """
+        Получение ETag для представления заказа.
+
+        :param resource: Название представления заказа (статус, детали и т.д.).
+        """
+
+        return f'"{resource}-{self.order_id}-{self.version}-{self.status}"'
+
+    @property
+    def is_actual(self) -> bool:
+        """
+        Проверка, что версия учитывает истечение платежной сессии.
+
+        Если платежная сессия истекла, а заказ еще не переведен в статус
+        `PAYMENT_SESSION_EXPIRED`, версия устарела и ответ нужно строить заново.
+        """
+
+        if self.status not in _EXPIRABLE_STATUSES:
+            return True
+
+        return (
+            self.payment_session_expired_at is None
+            or self.payment_session_expired_at > timezone.localtime()
+        )
+
+
+class OrderVersionService:
+    """Сервис для работы с версиями заказов"""
+
+    @classmethod
+    def get(cls, queryset: QuerySet[Order], order_id: int) -> OrderVersion | None:
+        """
+        Получение версии заказа одним запросом по первичному ключу.
+
+        :param queryset: Выборка доступных заказов.
+        :param order_id: ID заказа.
+
+        :return: Версия заказа либо None, если заказ не найден.
+        """
+
+        values = (
+            queryset
+            .filter(pk=order_id)
+            .annotate(
+                payment_session_expired_at=ExpressionWrapper(
+                    expression=F('payment_data__created_at')
+                    + F('payment_data__payment_session_lifetime'),
+                    output_field=DateTimeField(),
+                )
+            )
+            .values('version', 'status', 'updated_at', 'payment_session_expired_at')
+            .first()
+        )
+        if values is None:
+            return None
+
+        return OrderVersion(order_id=order_id, **values)
+
+    @classmethod
+    def get_bump_fields(cls) -> dict[str, Any]:
+        """Получение полей для увеличения версии заказа в запросе UPDATE"""
+
+        return {
+            'version': F('version') + 1,
+            'updated_at': timezone.now(),
+        }
+
+    @classmethod
+    def bump(cls, order_ids: list[int]) -> None:
+        """
+        Увеличение версии заказов.
+
+        :param order_ids: ID заказов.
+        """
+
+        Order.objects.filter(pk__in=order_ids).update(**cls.get_bump_fields())
+
+    @staticmethod
+    def is_not_modified(if_none_match: str | None, etag: str) -> bool:
+        """
+        Проверка значения заголовка `If-None-Match`.
+
+        :param if_none_match: Значение заголовка `If-None-Match` из запроса.
+        :param etag: Актуальный ETag представления.
+
+        :return: True, если у клиента актуальная версия представления.
+        """
+
+        if not if_none_match:
+            return False
+
+        client_etags = parse_etags(if_none_match)
+        if '*' in client_etags:
+            return True
+
+        # Используется слабое сравнение ETag.
+        return etag in (client_etag.removeprefix('W/') for client_etag in client_etags)
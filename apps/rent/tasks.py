@@ -1,38 +1,126 @@
+import uuid
 import logging
 import traceback
+from typing import Final
+from datetime import timedelta
+from contextlib import ExitStack
 
 from celery import shared_task
+from django.conf import settings
 from django.utils import timezone
 
+from apps.tinkoff_payments.services.payment_initialization.enums import PaymentStrategyType
+
 from .models.order import Order
 from .services.order_pipeline.dto import PipeOrderDTO
 from .services.order_pipeline.stages import OrderProcessStage
 from .services.order_pipeline.builder import OrderPipelineBuilder
+from .services.order_pipeline.async_runner import OrderPipelineAsyncRunner
+from .services.order_pipeline.checkpoints import OrderPipelineCheckpointService
+from .services.order_pipeline.pipes import InitPaymentSessionPipe
+from .services.order_pipeline.exceptions import OrderPipelineRequeueException
+from .services.order_status import (
+    OrderStatusService,
+    OrderStatusContext,
+    OrderStatusAnalyticsService,
+)
+from .services.order_notices import OrderNoticeOutbox
+from .services.order_lock import (
+    OrderLockService,
+    OrderLockedException,
+)
 
 
 logger = logging.getLogger(__name__)
 
+# Статусы, которыми этапы занимают заказ на время внешнего вызова,
+# и статусы, в которые зависший заказ возвращается. Это статусы неудачи
+# из политик этапов: из них этап можно повторить, продолжить запуск
+# с контрольной точки либо отменить заказ.
+_CLAIM_FALLBACK_STATUSES: Final[dict[Order.Status, Order.Status]] = {
+    Order.Status.ON_APPROVAL: Order.Status.VERIFY_FAILED,
+    Order.Status.AWAIT_CONFIRM_PAYMENT: Order.Status.CONFIRM_PAYMENT_FAILED,
+}
 
-@shared_task
-def order_pipeline_task(order_id: int, start_pipeline_step: OrderProcessStage) -> None:
+
+def _get_lock_owner(task_id: str) -> str:
+    """
+    Получение владельца блокировки заказа для выполнения задачи.
+
+    Повторно доставленное сообщение приходит с тем же ID задачи, поэтому
+    к нему добавляется случайная часть: иначе копия задачи продлила бы
+    живую аренду первой копии вместо того, чтобы дождаться ее истечения.
+
+    :param task_id: ID задачи Celery.
+    """
+
+    return f'{task_id}:{uuid.uuid4().hex}'
+
+
+@shared_task(bind=True)
+def order_pipeline_task(
+    self,
+    order_id: int,
+    start_pipeline_step: OrderProcessStage,
+    run_id: str | None = None,
+) -> None:
     """
     Задача на обработку заказа по пайплайну после инициализации платежа.
 
+    Запуск пайплайна определяется заказом, платежом и начальным этапом
+    (см. `OrderPipelineCheckpointService.get_run_id`). Уже выполненные
+    в запуске этапы пропускаются, даже если запуск продолжает другая задача
+    (например, поставленная повторным уведомлением банка).
+
+    Если политика пайпа требует повторить обработку позже,
+    задача перезапускается с задержкой из политики.
+
+    Заказ обрабатывается под блокировкой `OrderLockService`. Если заказ
+    уже обрабатывается, задача откладывается.
+
     :param order_id: ID заказа с инициализированной платежной сессией в системе.
     :param start_pipeline_step: Шаг, с которого нужно сбилдить пайплайн.
+    :param run_id: ID запуска пайплайна. По умолчанию определяется по заказу.
     """
 
-    order = (
-        Order.objects
-            .select_related('payment_data', 'user__client_profile')  # noqa: E131
-            .filter(pk=order_id)  # noqa: E131
-            .first()  # noqa: E131
-    )
-    payment_data = order.payment_data
-
-    order_pipeline = OrderPipelineBuilder(start_pipeline_step).build()
+    # План компилируется один раз на процесс и безопасен при
+    # параллельной обработке заказов в потоках воркера.
+    order_pipeline_plan = OrderPipelineBuilder(start_pipeline_step).build()
     try:
-        order_pipeline.invoke(PipeOrderDTO(order, payment_data))
+        # Заказ загружаем уже под блокировкой, чтобы видеть его актуальный статус.
+        with (
+            OrderStatusContext.bind(actor='task:order_pipeline_task'),
+            OrderLockService.lock(order_id, owner=_get_lock_owner(self.request.id)),
+        ):
+            order = (
+                Order.objects
+                    .select_related('payment_data', 'user__client_profile')  # noqa: E131
+                    .filter(pk=order_id)  # noqa: E131
+                    .first()  # noqa: E131
+            )
+            run_id = run_id or OrderPipelineCheckpointService.get_run_id(
+                order.pk,
+                order.payment_data.payment_id,
+                OrderProcessStage(start_pipeline_step),
+            )
+            order_pipeline_plan.invoke(PipeOrderDTO(order, order.payment_data), run_id=run_id)
+    except OrderLockedException as e:
+        # Заказ обрабатывается другой задачей или менеджером. Откладываем
+        # обработку: после освобождения блокировки этапы, уже выполненные
+        # другим обработчиком, не пройдут проверку статуса.
+        raise self.retry(
+            exc=e,
+            countdown=getattr(settings, 'RENT_ORDER_LOCK_RETRY_DELAY', 10),
+            max_retries=getattr(settings, 'RENT_ORDER_LOCK_MAX_DEFERRALS', 30),
+        )
+    except OrderPipelineRequeueException as e:
+        if self.request.retries < e.max_requeues:
+            raise self.retry(exc=e, countdown=e.delay, max_retries=e.max_requeues)
+
+        logger.error(
+            f'Ошибка обработки заказа №{order_id}, повторы исчерпаны\n'
+            f'Причина: {traceback.format_exc()}'
+        )
     except Exception:
         logger.error(
             f'Ошибка обработки заказа №{order_id}\n'
@@ -40,6 +128,236 @@ def order_pipeline_task(order_id: int, start_pipeline_step: OrderProcessStage) -
         )
 
 
+@shared_task(bind=True)
+def order_init_payment_task(self, order_id: int, payment_strategy: PaymentStrategyType) -> None:
+    """
+    Задача на инициализацию платежной сессии асинхронно созданного заказа.
+
+    Запускается в отдельной очереди `RENT_ORDER_INIT_PAYMENT_QUEUE`, чтобы
+    задержки банка не занимали веб-воркеры. Клиент узнает о результате
+    по смене статуса заказа (`get-status`, `wait-status`) и получает
+    платежную ссылку или QR-код через `payment-data`.
+
+    Если инициализировать платеж не удалось, заказ отменяется,
+    тем самым освобождая даты аренды, а уже созданный в банке платеж
+    отменяется пайпом. Заказы, для которых задача потерялась или исчерпала
+    отсрочки, отменяет задача `order_new_stale_cancel_task`.
+
+    :param order_id: ID заказа в статусе `NEW`.
+    :param payment_strategy: Стратегия оплаты (карты или СБП).
+    """
+
+    order = (
+        Order.objects
+            .select_related('user__client_profile', 'vehicle')  # noqa: E131
+            .filter(pk=order_id, status=Order.Status.NEW)  # noqa: E131
+            .first()  # noqa: E131
+    )
+    if order is None:
+        return
+
+    with OrderStatusContext.bind(actor='task:order_init_payment_task'):
+        try:
+            with OrderLockService.lock(order_id, owner=_get_lock_owner(self.request.id)):
+                InitPaymentSessionPipe(PaymentStrategyType(payment_strategy)).invoke(PipeOrderDTO(order=order))
+        except OrderLockedException as e:
+            raise self.retry(
+                exc=e,
+                countdown=getattr(settings, 'RENT_ORDER_LOCK_RETRY_DELAY', 10),
+                max_retries=getattr(settings, 'RENT_ORDER_LOCK_MAX_DEFERRALS', 30),
+            )
+        except Exception:
+            logger.error(
+                f'Ошибка инициализации платежной сессии заказа №{order_id}\n'
+                f'Причина: {traceback.format_exc()}'
+            )
+            OrderStatusService.set_status(order, Order.Status.CANCELED, from_statuses=[Order.Status.NEW])
+
+
+@shared_task
+def order_new_stale_cancel_task() -> None:
+    """
+    Задача на отмену зависших заказов в статусе `NEW`.
+
+    Запускается периодически. Отменяет заказы, которые дольше
+    `RENT_ORDER_NEW_STALE_TIMEOUT` секунд ждут инициализации платежа
+    (например, задача `order_init_payment_task` потерялась или исчерпала
+    отсрочки), тем самым освобождая даты аренды.
+
+    Если платеж такого заказа все же инициализируется, пайп инициализации
+    не сможет перевести заказ к оплате и отменит платеж в банке.
+    """
+
+    stale_timeout = getattr(settings, 'RENT_ORDER_NEW_STALE_TIMEOUT', 15 * 60)
+
+    with OrderStatusContext.bind(actor='task:order_new_stale_cancel_task'):
+        canceled_count = OrderStatusService.bulk_set_status(
+            queryset=Order.objects.filter(
+                status=Order.Status.NEW,
+                created_at__lte=timezone.now() - timedelta(seconds=stale_timeout),
+            ),
+            new_status=Order.Status.CANCELED,
+            # Заказ мог перейти к оплате после выборки.
+            from_statuses=[Order.Status.NEW],
+        )
+
+    if canceled_count:
+        logger.warning(f'Отменено зависших заказов в статусе NEW: {canceled_count}')
+
+
+@shared_task
+def order_stale_claims_release_task() -> None:
+    """
+    Задача на возврат заказов, зависших в промежуточных статусах этапов.
+
+    Запускается периодически. Этапы проверки документов и подтверждения
+    занимают заказ статусом (`ON_APPROVAL`, `AWAIT_CONFIRM_PAYMENT`) до внешнего
+    вызова. Если обработчик упал после этого, заказ нельзя ни повторить,
+    ни отменить. Такие заказы, не менявшиеся дольше
+    `RENT_ORDER_CLAIM_STALE_TIMEOUT` секунд, переводятся в статус неудачи
+    этапа (`_CLAIM_FALLBACK_STATUSES`).
+
+    Заказы, которые еще обрабатываются (блокировка `OrderLockService`
+    продлевается между этапами), пропускаются.
+    """
+
+    stale_timeout = getattr(settings, 'RENT_ORDER_CLAIM_STALE_TIMEOUT', 30 * 60)
+
+    stale_orders = list(
+        Order.objects
+            .filter(  # noqa: E131
+                status__in=list(_CLAIM_FALLBACK_STATUSES),
+                updated_at__lte=timezone.now() - timedelta(seconds=stale_timeout),
+            )
+            .only('pk', 'status')  # noqa: E131
+    )
+
+    with OrderStatusContext.bind(actor='task:order_stale_claims_release_task'):
+        for order in stale_orders:
+            claim_status = Order.Status(order.status)
+            try:
+                with OrderLockService.lock(order.pk):
+                    is_released = OrderStatusService.set_status(
+                        order,
+                        _CLAIM_FALLBACK_STATUSES[claim_status],
+                        from_statuses=[claim_status],
+                    )
+            except OrderLockedException:
+                continue
+
+            if is_released:
+                logger.warning(
+                    f'Заказ №{order.pk} завис в статусе {claim_status} '
+                    f'и переведен в {order.status}'
+                )
+
+
+@shared_task(bind=True)
+def order_pipeline_batch_task(
+    self,
+    order_ids: list[int],
+    start_pipeline_step: OrderProcessStage,
+) -> None:
+    """
+    Задача на параллельную обработку нескольких заказов по пайплайну.
+
+    Все заказы обрабатываются в одном цикле событий внутри одной задачи.
+    Кол-во одновременно обрабатываемых заказов задается настройкой
+    `RENT_ORDER_PIPELINE_CONCURRENCY`. Обработка заказа, превысившая
+    `RENT_ORDER_PIPELINE_TIMEOUT` секунд, не прерывается, а только логируется.
+
+    :param order_ids: ID заказов с инициализированной платежной сессией в системе.
+    :param start_pipeline_step: Шаг, с которого нужно сбилдить пайплайн.
+    """
+
+    orders = list(
+        Order.objects
+            .select_related('payment_data', 'user__client_profile')  # noqa: E131
+            .filter(pk__in=order_ids)  # noqa: E131
+    )
+
+    runner = OrderPipelineAsyncRunner(
+        plan=OrderPipelineBuilder(start_pipeline_step).build(),
+        concurrency=getattr(settings, 'RENT_ORDER_PIPELINE_CONCURRENCY', 8),
+        timeout=getattr(settings, 'RENT_ORDER_PIPELINE_TIMEOUT', None),
+    )
+    with OrderStatusContext.bind(actor='task:order_pipeline_batch_task'):
+        results = runner.run(
+            [PipeOrderDTO(order, order.payment_data) for order in orders],
+            checkpoints=True,
+        )
+
+    for order, result in zip(orders, results):
+        if isinstance(result, BaseException):
+            logger.error(
+                f'Ошибка обработки заказа №{order.pk}\n'
+                f'Причина: {"".join(traceback.format_exception(result))}'
+            )
+
+
+@shared_task(bind=True)
+def order_pipeline_backlog_task(
+    self,
+    order_ids: list[int],
+    start_pipeline_step: OrderProcessStage,
+) -> None:
+    """
+    Задача на пакетную обработку накопившихся заказов по пайплайну.
+
+    Заказы загружаются одним запросом, каждый этап обрабатывает их пачкой:
+    статусы меняются групповыми запросами, а внешние вызовы выполняются
+    параллельно. Подходит для разбора очереди заказов после сбоя.
+
+    Заказы, которые уже обрабатываются другой задачей или менеджером,
+    пропускаются.
+
+    :param order_ids: ID заказов с инициализированной платежной сессией в системе.
+    :param start_pipeline_step: Шаг, с которого нужно сбилдить пайплайн.
+    """
+
+    with ExitStack() as locks:
+        # Блокировки захватываем через `lock`, чтобы план продлевал их между этапами.
+        locked_ids: list[int] = []
+        for order_id in order_ids:
+            try:
+                locks.enter_context(OrderLockService.lock(order_id, owner=_get_lock_owner(self.request.id)))
+            except OrderLockedException:
+                continue
+
+            locked_ids.append(order_id)
+
+        if len(locked_ids) < len(order_ids):
+            logger.info(
+                f'Пропущены обрабатываемые заказы: '
+                f'{sorted(set(order_ids) - set(locked_ids))}'
+            )
+
+        with OrderStatusContext.bind(actor='task:order_pipeline_backlog_task'):
+            _process_orders_backlog(locked_ids, start_pipeline_step)
+
+
+def _process_orders_backlog(order_ids: list[int], start_pipeline_step: OrderProcessStage) -> None:
+    """Пакетная обработка заблокированных заказов"""
+
+    orders = list(
+        Order.objects
+            .select_related('payment_data', 'user__client_profile')  # noqa: E131
+            .filter(pk__in=order_ids)  # noqa: E131
+    )
+
+    order_pipeline_plan = OrderPipelineBuilder(start_pipeline_step).build()
+    results = order_pipeline_plan.invoke_batch(
+        [PipeOrderDTO(order, order.payment_data) for order in orders],
+    )
+
+    for order, result in zip(orders, results):
+        if isinstance(result, Exception):
+            logger.error(
+                f'Ошибка обработки заказа №{order.pk}\n'
+                f'Причина: {"".join(traceback.format_exception(result))}'
+            )
+
+
 @shared_task
 def order_booked_to_active_task() -> None:
     """
@@ -48,7 +366,39 @@ def order_booked_to_active_task() -> None:
     Переводит заказ в статус `ACTIVE`, когда наступает время проката.
     """
 
-    Order.objects.filter(
-        status=Order.Status.BOOKED,
-        starts_at__lte=timezone.localtime(),
-    ).update(status=Order.Status.ACTIVE)
+    with OrderStatusContext.bind(actor='task:order_booked_to_active_task'):
+        OrderStatusService.bulk_set_status(
+            queryset=Order.objects.filter(
+                status=Order.Status.BOOKED,
+                starts_at__lte=timezone.localtime(),
+            ),
+            new_status=Order.Status.ACTIVE,
+        )
+
+
+@shared_task
+def order_notices_delivery_task() -> None:
+    """
+    Задача на отправку уведомлений о заказах из исходящей очереди.
+
+    Запускается периодически. Отправляет уведомления пачками, пока
+    в очереди есть готовые к отправке.
+    """
+
+    # Неполная пачка означает, что готовых к отправке уведомлений не осталось.
+    while OrderNoticeOutbox.deliver_batch() == OrderNoticeOutbox.get_batch_size():
+        continue
+
+
+@shared_task
+def order_status_rollup_task() -> None:
+    """
+    Задача на обновление дневных сводок по статусам заказов.
+
+    Перестраивает сводки за вчера и сегодня, чтобы учесть переходы,
+    записанные после предыдущего запуска в конце вчерашнего дня.
+    """
+
+    today = timezone.localdate()
+    for day in (today - timedelta(days=1), today):
+        OrderStatusAnalyticsService.rollup_day(day)
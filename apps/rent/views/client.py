@@ -3,19 +3,29 @@ import traceback
 from typing import Type
 
 from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.http import http_date
 from django.db.models import QuerySet
 from django.forms.models import model_to_dict
+from django.http import (
+    Http404,
+    HttpResponse,
+)
 from django.shortcuts import get_object_or_404
+from django.utils.translation import gettext_lazy as _
 
 from rest_framework import mixins
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from rest_framework.exceptions import APIException
+from rest_framework.exceptions import (
+    APIException,
+    ValidationError,
+)
 from rest_framework.viewsets import GenericViewSet
 from rest_framework.serializers import BaseSerializer
-from rest_framework.pagination import LimitOffsetPagination
 
 from drf_spectacular.utils import extend_schema_view
 
@@ -26,8 +36,18 @@ from apps.users.permissions import IsClientUser
 from apps.tinkoff_payments.models import TinkoffPaymentData
 from apps.tinkoff_payments.serializers import PaymentDataSerializer
 from apps.tinkoff_payments.services.core.exceptions import TinkoffResponseException
+from apps.tinkoff_payments.services.payment_initialization.enums import ResponsePaymentInitPayloadType
+from apps.tinkoff_payments.services.payment_initialization.qr_resolver import SBPQrResolver
+from apps.tinkoff_payments.services.qr_rendering import (
+    QrImageFormat,
+    QrCodeRenderer,
+    QrRenderingUnavailableException,
+)
 
 from . import openapi_schema
+from .mixins import OrderStatusActorMixin
+from .exceptions import OrderLockedAPIException
+from .pagination import OrderListPagination
 from ...models import Order
 from ...serializers.order import (
     ClientOrderListSerializer,
@@ -42,6 +62,7 @@ from ..exceptions import (
     OrderPipeGettingResultAPIException,
 )
 
+from ...tasks.order import order_init_payment_task
 from ...services.rent.rental import RentalDto
 from ...services.rent.rental_validation import RentalValidationService
 from ...services.rent.expired_orders_checker import ExpiredOrdersChecker
@@ -55,6 +76,18 @@ from ...services.rent.order_pipeline.exceptions import (
     InvalidOrderStatusPipeException,
 )
 from ...services.rent.order_pipeline.dto import PipeOrderDTO
+from ...services.rent.order_lock import (
+    OrderLockService,
+    OrderLockedException,
+)
+from ...services.rent.order_status import (
+    OrderVersion,
+    OrderReadKind,
+    OrderReadCache,
+    OrderStatusService,
+    OrderStatusEventBus,
+    OrderVersionService,
+)
 from ...services.rent.create_order_service_for_api import CreateOrderServiceForAPI
 
 
@@ -63,6 +96,7 @@ logger = logging.getLogger(__name__)
 
 @extend_schema_view(**openapi_schema.client_order_viewset)
 class ClientOrderViewSet(
+    OrderStatusActorMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
@@ -80,9 +114,12 @@ class ClientOrderViewSet(
         'create': ClientTinkoffInitPaymentSerializer,
         'retrieve': ClientOrderRetrieveSerializer,
         'get_status': ClientOrderStatusSerializer,
+        'wait_status': ClientOrderStatusSerializer,
+        'get_payment_data': PaymentDataSerializer,
     }
     permission_classes = (IsClientUser,)
-    pagination_class = LimitOffsetPagination
+    pagination_class = OrderListPagination
+    order_status_actor_role = 'client'
 
     def get_queryset(self) -> QuerySet[Order]:
         """Получение заказов текущего пользователя"""
@@ -90,7 +127,7 @@ class ClientOrderViewSet(
         return (
             Order.objects.select_related('user', 'vehicle')
             .filter(user=self.request.user)
-            .order_by('-created_at')
+            .order_by('-created_at', '-pk')
         )
 
     def get_serializer_class(self) -> Type[BaseSerializer]:
@@ -110,10 +147,17 @@ class ClientOrderViewSet(
         В редком случае, если не удалось инициализировать платежную
         сессию с банком, заказ удаляется, тем самым освобождая даты
         для брони автомобиля.
+
+        Если клиент передал заголовок `Prefer: respond-async`, платежная
+        сессия инициализируется в фоне, а ответ 202 с ID заказа возвращается
+        сразу после его создания (см. `__create_async`).
         """
 
         serializer = self.get_serializer(data=request.data)
 
+        if 'respond-async' in request.headers.get('Prefer', ''):
+            return self.__create_async(serializer)
+
         with CreateOrderServiceForAPI(serializer) as service:
             try:
                 pipe_order_dto = service.create_order_and_init_payment()
@@ -142,6 +186,23 @@ class ClientOrderViewSet(
             status=status.HTTP_201_CREATED,
         )
 
+    def retrieve(self, request: Request, *args, **kwargs) -> Response:
+        """
+        Получение детальной информации о заказе.
+
+        Поддерживает условные запросы: если у клиента актуальная
+        версия заказа (`If-None-Match`), возвращается 304 без сериализации.
+        """
+
+        order_version = self.__get_order_version()
+        etag = order_version.get_etag('retrieve')
+        if OrderVersionService.is_not_modified(request.headers.get('If-None-Match'), etag):
+            return self.__not_modified_response(order_version, etag)
+
+        response = super().retrieve(request, *args, **kwargs)
+
+        return self.__set_conditional_headers(response, order_version, etag)
+
     @action(methods=['post'], detail=True, url_path='cancel')
     def cancel(self, request: Request, *args, **kwargs) -> Response:
         """API для отмены заказа клиентом"""
@@ -152,7 +213,12 @@ class ClientOrderViewSet(
         )
 
         try:
-            CancelOrderPipe().invoke(PipeOrderDTO(order, order.payment_data))
+            # У заказа `NEW` платеж еще не инициализирован, и данных платежа нет.
+            payment_data = getattr(order, 'payment_data', None)
+            with OrderLockService.lock(order.pk):
+                CancelOrderPipe().invoke(PipeOrderDTO(order, payment_data))
+        except OrderLockedException as e:
+            raise OrderLockedAPIException(detail=e.message)
         except Exception:
             logger.error(
                 f'Ошибка при отмене заказа\nПричина: {traceback.format_exc()}'
@@ -188,7 +254,7 @@ class ClientOrderViewSet(
         payment_data: TinkoffPaymentData = order.payment_data
 
         # Проверка заказа на истекшесть и перевод его в соответствующий статус.
-        expired = ExpiredOrdersChecker.is_expired(order)
+        expired = self.__check_expired(order)
 
         if not ReinitPaymentSessionPipe.is_valid_status(order.status):
             raise InvalidOrderStatusAPIException(
@@ -235,7 +301,27 @@ class ClientOrderViewSet(
 
     @action(methods=['get'], detail=True, url_path='get-status')
     def get_status(self, request: Request, *args, **kwargs) -> Response:
-        """Получение статуса заказа"""
+        """
+        Получение статуса заказа.
+
+        Поддерживает условные запросы: если у клиента актуальная
+        версия статуса (`If-None-Match`), возвращается 304 после одного
+        запроса к БД, без сериализации и проверки истечения платежной сессии.
+        """
+
+        order_version = self.__get_order_version()
+        etag = order_version.get_etag(OrderReadKind.STATUS.value)
+        if order_version.is_actual:
+            if OrderVersionService.is_not_modified(request.headers.get('If-None-Match'), etag):
+                return self.__not_modified_response(order_version, etag)
+
+            cached_data = OrderReadCache.get(OrderReadKind.STATUS, order_version)
+            if cached_data is not None:
+                return self.__set_conditional_headers(
+                    Response(data=cached_data, status=status.HTTP_200_OK),
+                    order_version,
+                    etag,
+                )
 
         order: Order = get_object_or_404(
             klass=Order.objects.select_related('payment_data').filter(user=request.user),
@@ -244,11 +330,286 @@ class ClientOrderViewSet(
 
         # Чтобы клиент получал всегда актуальный статус заказа,
         # сразу проверим, не истекла ли платежная сессия.
-        ExpiredOrdersChecker.is_expired(order)
+        self.__check_expired(order)
+
+        # Статус мог смениться при проверке, поэтому ETag строим по актуальному статусу.
+        if order.status != order_version.status:
+            order_version = OrderVersionService.get(self.__get_client_orders(), order.pk)
+            etag = order_version.get_etag(OrderReadKind.STATUS.value)
+
+        data = self.get_serializer(instance=order).data
+        OrderReadCache.set(OrderReadKind.STATUS, order_version, data)
+
+        return self.__set_conditional_headers(
+            Response(data=data, status=status.HTTP_200_OK),
+            order_version,
+            etag,
+        )
+
+    @action(methods=['get'], detail=True, url_path='payment-data')
+    def get_payment_data(self, request: Request, *args, **kwargs) -> Response:
+        """Получение платежных данных заказа (ссылки на оплату или QR-кода)"""
+
+        order_version = self.__get_order_version()
+
+        # Платежная сессия асинхронно созданного заказа еще инициализируется.
+        if order_version.status == Order.Status.NEW:
+            return Response(
+                data={'status': order_version.status},
+                status=status.HTTP_202_ACCEPTED,
+                headers={'Retry-After': '1'},
+            )
+
+        etag = order_version.get_etag(OrderReadKind.PAYMENT_DATA.value)
+        if OrderVersionService.is_not_modified(request.headers.get('If-None-Match'), etag):
+            return self.__not_modified_response(order_version, etag)
+
+        cached_data = OrderReadCache.get(OrderReadKind.PAYMENT_DATA, order_version)
+        if cached_data is not None:
+            return self.__set_conditional_headers(
+                Response(data=cached_data, status=status.HTTP_200_OK),
+                order_version,
+                etag,
+            )
+
+        payment_data = get_object_or_404(TinkoffPaymentData, order_id=order_version.order_id)
+
+        # QR-код платежа через СБП мог еще не прийти от банка (`TINKOFF_SBP_LAZY_QR`).
+        # Если получить его не удалось, отдаем данные без него (тип нагрузки
+        # `qr_pending`), а клиент повторит запрос позже.
+        if SBPQrResolver.is_pending(payment_data):
+            try:
+                SBPQrResolver.resolve(payment_data)
+            except Exception as e:
+                logger.warning(f'Ошибка получения QR-кода для платежа {payment_data.payment_id}', exc_info=e)
+
+            # Сохранение QR-кода увеличивает версию заказа.
+            order_version = self.__get_order_version()
+            etag = order_version.get_etag(OrderReadKind.PAYMENT_DATA.value)
+
+        data = PaymentDataSerializer(instance=payment_data).data
+        # Данные без QR-кода не кэшируем, чтобы не отдавать их после его получения.
+        if not SBPQrResolver.is_pending(payment_data):
+            OrderReadCache.set(OrderReadKind.PAYMENT_DATA, order_version, data)
+
+        return self.__set_conditional_headers(
+            Response(data=data, status=status.HTTP_200_OK),
+            order_version,
+            etag,
+        )
+
+    @action(methods=['get'], detail=True, url_path='payment-qr')
+    def get_payment_qr(self, request: Request, *args, **kwargs) -> HttpResponse:
+        """
+        Получение изображения QR-кода для оплаты через СБП.
+
+        Изображение рисуется локально по ссылке из платежных данных
+        и кэшируется по содержимому, поэтому ETag зависит только от
+        ссылки, а изображение кэшируется клиентом до истечения платежной сессии.
+        """
+
+        payment_data = get_object_or_404(
+            klass=TinkoffPaymentData.objects.filter(order__user=request.user),
+            order_id=self.__get_order_id_from_url(),
+        )
+        try:
+            image_format = QrImageFormat(request.query_params.get('image_format', QrImageFormat.SVG.value))
+        except ValueError:
+            raise ValidationError({'image_format': _('Неизвестный формат изображения')})
+
+        # QR-код платежа через СБП мог еще не прийти от банка (`TINKOFF_SBP_LAZY_QR`).
+        try:
+            SBPQrResolver.resolve(payment_data)
+        except TinkoffResponseException as e:
+            raise BadGatewayAPIException(detail=e.message)
+
+        # QR-код уже запрашивает другой обработчик.
+        if SBPQrResolver.is_pending(payment_data):
+            response = HttpResponse(status=status.HTTP_202_ACCEPTED)
+            response['Retry-After'] = '1'
+            return response
+
+        is_rendered_locally = payment_data.payload_type == ResponsePaymentInitPayloadType.QR_URL
+        # SVG-изображение, полученное от банка при `TINKOFF_SBP_QR_DATA_TYPE = 'IMAGE'`.
+        is_bank_svg = (
+            payment_data.payload_type == ResponsePaymentInitPayloadType.QR_IMAGE
+            and image_format == QrImageFormat.SVG
+        )
+        if not is_rendered_locally and not is_bank_svg:
+            raise Http404()
+
+        # ETag вычисляется по содержимому без отрисовки,
+        # поэтому на повторный запрос ответ 304 отдается сразу.
+        etag = f'"qr-{QrCodeRenderer.get_key(payment_data.payload, image_format)}"'
+        if OrderVersionService.is_not_modified(request.headers.get('If-None-Match'), etag):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        elif is_rendered_locally:
+            try:
+                rendered_qr = QrCodeRenderer.render(payment_data.payload, image_format)
+            except QrRenderingUnavailableException as e:
+                logger.error(e.message)
+                raise APIException()
+            response = HttpResponse(content=rendered_qr.content, content_type=rendered_qr.content_type)
+        else:
+            response = HttpResponse(content=payment_data.payload.encode(), content_type=image_format.content_type)
+
+        max_age = max(int((payment_data.payment_session_expired_at - timezone.now()).total_seconds()), 0)
+        response['ETag'] = etag
+        response['Cache-Control'] = f'private, max-age={max_age}, immutable'
+
+        return response
+
+    @action(methods=['get'], detail=True, url_path='wait-status')
+    def wait_status(self, request: Request, *args, **kwargs) -> Response:
+        """
+        Ожидание смены статуса заказа (long polling).
+
+        Клиент передает известный ему статус в параметре `status`.
+        Если текущий статус заказа отличается от известного, ответ
+        возвращается сразу. Иначе запрос удерживается до смены статуса
+        либо до истечения таймаута (параметр `timeout`, в секундах).
+        Если статус за время ожидания не сменился, возвращается 204.
+
+        Ожидание не длится дольше платежной сессии: при ее истечении
+        заказ проверяется так же, как в `get-status`, и клиент сразу
+        получает новый статус. Если в процессе уже ждут
+        `RENT_ORDER_STATUS_MAX_WAITERS` клиентов, сразу возвращается 204
+        с заголовком `Retry-After`.
+        """
+
+        order_version = self.__get_order_version()
+        known_status = request.query_params.get('status')
+
+        if known_status == order_version.status:
+            timeout = self.__get_long_poll_timeout()
+            if order_version.payment_session_expired_at is not None:
+                until_expired = (order_version.payment_session_expired_at - timezone.now()).total_seconds()
+                timeout = min(timeout, max(until_expired, 0))
+
+            with OrderStatusEventBus.reserve_waiter() as is_reserved:
+                if not is_reserved:
+                    response = Response(status=status.HTTP_204_NO_CONTENT)
+                    response['Retry-After'] = '1'
+                    return response
+
+                # Ждем только события новее текущей версии заказа:
+                # последнее событие в кэше может быть устаревшим.
+                event = OrderStatusEventBus.wait(
+                    order_id=order_version.order_id,
+                    known_version=order_version.version,
+                    timeout=timeout,
+                )
+
+            # Истечение платежной сессии проверяется в `get-status`.
+            if event is None and order_version.is_actual:
+                return Response(status=status.HTTP_204_NO_CONTENT)
+
+        # Статус сменился - отдаем актуальные данные так же, как и при обычном запросе.
+        return self.get_status(request, *args, **kwargs)
+
+    def __create_async(self, serializer: BaseSerializer) -> Response:
+        """
+        Создание заказа с инициализацией платежной сессии в фоне.
+
+        Данные валидируются, период бронируется и заказ создается в запросе,
+        а обращение к банку выполняет задача `order_init_payment_task`.
+        Клиент отслеживает статус заказа через `get-status` или `wait-status`
+        и получает платежные данные через `payment-data`. Если платеж
+        инициализировать не удалось, заказ переводится в статус `CANCELED`.
+        """
+
+        with CreateOrderServiceForAPI(serializer) as service:
+            order = service.create_order()
+            payment_strategy = service.get_payment_strategy()
+
+        transaction.on_commit(
+            lambda: order_init_payment_task.apply_async(
+                args=(order.pk, payment_strategy),
+                queue=getattr(settings, 'RENT_ORDER_INIT_PAYMENT_QUEUE', None),
+            ),
+        )
 
         return Response(
-            data=self.get_serializer(instance=order).data,
-            status=status.HTTP_200_OK,
+            data={'order_id': order.pk, 'status': order.status},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    def __check_expired(self, order: Order) -> bool:
+        """
+        Проверка заказа на истечение платежной сессии.
+
+        `ExpiredOrdersChecker` меняет статус в обход `OrderStatusService`,
+        поэтому о смене статуса сообщаем ожидающим клиентам сами.
+
+        :param order: Заказ с платежными данными.
+
+        :return: True, если платежная сессия истекла.
+        """
+
+        previous_status = order.status
+        expired = ExpiredOrdersChecker.is_expired(order)
+        if order.status != previous_status:
+            OrderStatusService.notify_status_changed(order)
+
+        return expired
+
+    def __get_long_poll_timeout(self) -> float:
+        """
+        Получение времени ожидания смены статуса из запроса.
+
+        Ожидание занимает поток веб-воркера до `RENT_ORDER_STATUS_LONG_POLL_TIMEOUT`
+        секунд. С синхронными воркерами (например, gunicorn `sync`) каждый
+        ожидающий клиент блокирует весь воркер, поэтому `wait-status` требует
+        потоковых (`gthread`) или кооперативных (`gevent`) воркеров,
+        а `RENT_ORDER_STATUS_MAX_WAITERS` должен быть меньше числа потоков процесса.
+        """
+
+        max_timeout = getattr(settings, 'RENT_ORDER_STATUS_LONG_POLL_TIMEOUT', 25)
+        try:
+            timeout = float(self.request.query_params.get('timeout', max_timeout))
+        except ValueError:
+            timeout = max_timeout
+
+        return min(max(timeout, 0), max_timeout)
+
+    def __get_client_orders(self) -> QuerySet[Order]:
+        """Получение выборки заказов текущего клиента"""
+
+        return Order.objects.filter(user=self.request.user)
+
+    def __get_order_version(self) -> OrderVersion:
+        """Получение версии заказа из URL-параметров"""
+
+        order_version = OrderVersionService.get(
+            self.__get_client_orders(),
+            self.__get_order_id_from_url(),
+        )
+        if order_version is None:
+            raise Http404()
+
+        return order_version
+
+    @staticmethod
+    def __set_conditional_headers(
+        response: Response,
+        order_version: OrderVersion,
+        etag: str,
+    ) -> Response:
+        """Установка заголовков для условных запросов"""
+
+        response['ETag'] = etag
+        if order_version.updated_at is not None:
+            response['Last-Modified'] = http_date(order_version.updated_at.timestamp())
+
+        return response
+
+    def __not_modified_response(self, order_version: OrderVersion, etag: str) -> Response:
+        """Ответ о том, что данные у клиента актуальны"""
+
+        return self.__set_conditional_headers(
+            Response(status=status.HTTP_304_NOT_MODIFIED),
+            order_version,
+            etag,
         )
 
     def __get_order_id_from_url(self) -> int:
@@ -0,0 +1,12 @@
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class OrderLockedAPIException(APIException):
+    """Исключение, когда заказ уже обрабатывается другим запросом или задачей"""
+
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = _('Заказ уже обрабатывается, повторите попытку позже')
+    default_code = 'order_locked'
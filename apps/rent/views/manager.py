@@ -1,5 +1,10 @@
+import uuid
 import logging
 import traceback
+from datetime import (
+    date,
+    timedelta,
+)
 
 from django.db.models import (
     QuerySet,
@@ -9,6 +14,8 @@ from django.http import FileResponse
 from django.forms import model_to_dict
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.utils.translation import gettext_lazy as _
 from django_filters import rest_framework as drf_filters
 
@@ -18,16 +25,17 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.viewsets import GenericViewSet
-from rest_framework.exceptions import APIException
+from rest_framework.exceptions import (
+    APIException,
+    ValidationError,
+)
 from rest_framework.serializers import BaseSerializer
-from rest_framework.pagination import LimitOffsetPagination
 
 from drf_spectacular.utils import extend_schema_view
 
 from apps.users.permissions import IsManagerUser
 from apps.common.utils import prepare_for_dataclass
 from apps.common.serializers.during import DuringSerializer
-from apps.notifications.services.senders import OrderAwaitPaymentNoticeSender
 
 from apps.tinkoff_payments.models import TinkoffPaymentData
 from apps.tinkoff_payments.serializers import PaymentDataSerializer
@@ -40,9 +48,13 @@ from ..exceptions import (
 )
 from ...models import (
     Order,
+    OrderNotice,
     RentalRate,
 )
 from . import openapi_schema
+from .mixins import OrderStatusActorMixin
+from .exceptions import OrderLockedAPIException
+from .pagination import OrderListPagination
 from ...filters import ManagerOrderFilter
 from ...serializers import (
     IncomeStatisticSerializer,
@@ -69,7 +81,18 @@ from ...services.rent.order_pipeline.exceptions import (
 from ...services.rent.order_pipeline.dto import PipeOrderDTO
 from ...services.docx_template import AgreementDocxTemplateService
 from ...services.rent.order_pipeline.stages import OrderProcessStage
+from ...services.rent.order_pipeline.checkpoints import OrderPipelineCheckpointService
+from ...services.rent.order_lock import (
+    OrderLockService,
+    OrderLockedException,
+)
+from ...services.rent.order_status import (
+    OrderVersionService,
+    OrderStatusAnalyticsService,
+)
+from ...services.rent.order_notices import OrderNoticeOutbox
 from ...services.rent.rental_validation import RentalValidationService
+from ...services.rent.documents_verification import DocumentsVerificationCache
 from ...services.rent.expired_orders_checker import ExpiredOrdersChecker
 from ...services.rent.create_order_service_for_api import CreateOrderServiceForAPI
 
@@ -81,6 +104,7 @@ logger = logging.getLogger(__name__)
 
 @extend_schema_view(**openapi_schema.manager_order_viewset)
 class ManagerOrderViewSet(
+    OrderStatusActorMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
@@ -97,9 +121,10 @@ class ManagerOrderViewSet(
         'get_income_statistic': IncomeStatisticSerializer,
     }
     permission_classes = (IsManagerUser,)
-    pagination_class = LimitOffsetPagination
+    pagination_class = OrderListPagination
     filterset_class = ManagerOrderFilter
     filter_backends = [drf_filters.DjangoFilterBackend]
+    order_status_actor_role = 'manager'
 
     def get_queryset(self) -> QuerySet[Order]:
         return (
@@ -117,12 +142,18 @@ class ManagerOrderViewSet(
                     queryset=RentalRate.objects.order_by('to_days'),
                 ),
             )
-            .order_by('-created_at')
+            .order_by('-created_at', '-pk')
         )
 
     def get_serializer_class(self) -> type[BaseSerializer]:
         return self.serializer_class_map[self.action]
 
+    def perform_update(self, serializer: BaseSerializer) -> None:
+        """Сохранение изменений заказа с увеличением его версии"""
+
+        order = serializer.save()
+        OrderVersionService.bump([order.pk])
+
     @action(['get'], detail=False, url_path='income-statistic')
     def get_income_statistic(self, request: Request, *args, **kwargs) -> Response:
         serializer = DuringSerializer(data=request.query_params)
@@ -133,6 +164,27 @@ class ManagerOrderViewSet(
 
         return Response(serializer.data)
 
+    @action(['get'], detail=False, url_path='status-funnel')
+    def get_status_funnel(self, request: Request, *args, **kwargs) -> Response:
+        """Воронка и задержки по статусам заказов за период"""
+
+        date_to = self.__get_date_query_param('date_to') or timezone.localdate()
+        date_from = self.__get_date_query_param('date_from') or date_to - timedelta(days=30)
+
+        return Response(OrderStatusAnalyticsService.get_funnel(date_from, date_to))
+
+    @action(['get'], detail=False, url_path='documents-verification-cache-stats')
+    def get_documents_verification_cache_stats(self, request: Request, *args, **kwargs) -> Response:
+        """Статистика кэша результатов проверки документов"""
+
+        stats = DocumentsVerificationCache.get_stats()
+
+        return Response({
+            'hits': stats.hits,
+            'misses': stats.misses,
+            'hit_rate': stats.hit_rate,
+        })
+
     @action(['get'], detail=True, url_path='agreement')
     def get_agreement(self, request: Request, *args, **kwargs) -> FileResponse:
         order = self.get_object()
@@ -175,7 +227,11 @@ class ManagerOrderViewSet(
                     raise APIException()
 
         # Отправим пользователю СМС и уведомление с платежной ссылкой.
-        OrderAwaitPaymentNoticeSender.send(pipe_order_dto.order)
+        OrderNoticeOutbox.enqueue(
+            [pipe_order_dto.order],
+            OrderNotice.Kind.ORDER_AWAIT_PAYMENT,
+            dedup_key=pipe_order_dto.payment_data.payment_id,
+        )
 
         return Response(
             data=PaymentDataSerializer(instance=pipe_order_dto.payment_data).data,
@@ -192,7 +248,12 @@ class ManagerOrderViewSet(
         )
 
         try:
-            CancelOrderPipe().invoke(PipeOrderDTO(order, order.payment_data))
+            # У заказа `NEW` платеж еще не инициализирован, и данных платежа нет.
+            payment_data = getattr(order, 'payment_data', None)
+            with OrderLockService.lock(order.pk):
+                CancelOrderPipe().invoke(PipeOrderDTO(order, payment_data))
+        except OrderLockedException as e:
+            raise OrderLockedAPIException(detail=e.message)
         except Exception:
             logger.error(
                 f'Ошибка при отмене заказа\nПричина: {traceback.format_exc()}'
@@ -225,7 +286,13 @@ class ManagerOrderViewSet(
                 ),
             )
 
-        order_pipeline_task.delay(order.pk, OrderProcessStage.VERIFY_DOCUMENTS)
+        # Повторная отправка менеджером - новый запуск: этапы,
+        # выполненные в прошлых запусках, выполняются заново.
+        order_pipeline_task.delay(
+            order.pk,
+            OrderProcessStage.VERIFY_DOCUMENTS,
+            run_id=OrderPipelineCheckpointService.new_run_id(order.pk),
+        )
 
         return Response(status=status.HTTP_200_OK)
 
@@ -239,7 +306,10 @@ class ManagerOrderViewSet(
         )
 
         try:
-            ConfirmOrderPipe().invoke(PipeOrderDTO(order, order.payment_data))
+            with OrderLockService.lock(order.pk):
+                ConfirmOrderPipe().invoke(PipeOrderDTO(order, order.payment_data))
+        except OrderLockedException as e:
+            raise OrderLockedAPIException(detail=e.message)
         except Exception:
             logger.error(
                 f'Ошибка при подтверждении заказа\nПричина: {traceback.format_exc()}'
@@ -262,7 +332,10 @@ class ManagerOrderViewSet(
         order: Order = self.get_object()
 
         try:
-            CompleteOrderPipe().invoke(PipeOrderDTO(order=order))
+            with OrderLockService.lock(order.pk):
+                CompleteOrderPipe().invoke(PipeOrderDTO(order=order))
+        except OrderLockedException as e:
+            raise OrderLockedAPIException(detail=e.message)
         except Exception:
             logger.error(
                 f'Ошибка при завершении заказа\nПричина: {traceback.format_exc()}'
@@ -351,12 +424,32 @@ class ManagerOrderViewSet(
         if response.status_code != status.HTTP_200_OK:
             raise APIException(detail=_('Ошибка при реинициализации платежной сессии'))
 
-        # Отправка клиенту СМС и уведомления с платежной ссылкой.
-        order = self.get_object()
-        OrderAwaitPaymentNoticeSender.send(order)
+        # Отправка клиенту СМС и уведомления с платежной ссылкой. Менеджер
+        # явно просит отправить повторно, поэтому уведомление не считается дублем.
+        OrderNoticeOutbox.enqueue(
+            [self.get_object()],
+            OrderNotice.Kind.ORDER_AWAIT_PAYMENT,
+            dedup_key=uuid.uuid4().hex,
+        )
 
         return Response(data=response.data, status=response.status_code)
 
+    def __get_date_query_param(self, name: str) -> date | None:
+        """Получение даты из параметра запроса"""
+
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({name: _('Ожидается дата в формате ГГГГ-ММ-ДД')})
+
+        return parsed
+
     def __get_order_id_from_url(self) -> int:
         """Получение ID заказа из URL-параметров"""
 
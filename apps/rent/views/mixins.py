@@ -0,0 +1,36 @@
+from contextlib import ExitStack
+
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from ...services.rent.order_status import OrderStatusContext
+
+
+class OrderStatusActorMixin:
+    """
+    Миксин, записывающий в журнал переходов статусов пользователя запроса.
+
+    На время обработки запроса инициатором смены статусов заказов
+    (см. `OrderStatusContext`) становится `<роль>:<ID пользователя>`.
+    """
+
+    # Роль пользователя в журнале переходов статусов.
+    order_status_actor_role: str = ''
+
+    def initial(self, request: Request, *args, **kwargs) -> None:
+        """Установка инициатора после аутентификации пользователя"""
+
+        self._order_status_context = ExitStack()
+        super().initial(request, *args, **kwargs)
+        self._order_status_context.enter_context(
+            OrderStatusContext.bind(actor=f'{self.order_status_actor_role}:{request.user.pk}'),
+        )
+
+    def finalize_response(self, request: Request, response: Response, *args, **kwargs) -> Response:
+        """Сброс инициатора по завершении обработки запроса"""
+
+        order_status_context = getattr(self, '_order_status_context', None)
+        if order_status_context is not None:
+            order_status_context.close()
+
+        return super().finalize_response(request, response, *args, **kwargs)
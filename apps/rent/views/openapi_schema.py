@@ -1,6 +1,8 @@
 from rest_framework import status
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import (
     extend_schema,
+    OpenApiParameter,
     inline_serializer,
 )
 from rest_framework import serializers
@@ -205,6 +207,63 @@ manager_order_viewset = {
             status.HTTP_502_BAD_GATEWAY: ErrorWithCodeSerializer,
         },
     ),
+    'get_status_funnel': extend_schema(
+        operation_id='manager_order_status_funnel',
+        summary=_('Воронка статусов заказов (менеджер)'),
+        description=_(
+            'Кол-во входов и выходов заказов по каждому статусу, а также среднее '
+            'и максимальное время нахождения в статусе в секундах за период.<br><br>'
+            'Строится по дневным сводкам журнала переходов статусов, '
+            'которые обновляются периодической задачей.'
+        ),
+        parameters=[
+            OpenApiParameter(
+                name='date_from',
+                type=OpenApiTypes.DATE,
+                description=_('Первый день периода. По умолчанию 30 дней назад'),
+            ),
+            OpenApiParameter(
+                name='date_to',
+                type=OpenApiTypes.DATE,
+                description=_('Последний день периода включительно. По умолчанию сегодня'),
+            ),
+        ],
+        responses={
+            status.HTTP_200_OK: inline_serializer(
+                name='OrderStatusFunnelSerializer',
+                many=True,
+                fields={
+                    'status': serializers.CharField(),
+                    'entered_count': serializers.IntegerField(),
+                    'exited_count': serializers.IntegerField(),
+                    'dwell_seconds_avg': serializers.FloatField(allow_null=True),
+                    'dwell_seconds_max': serializers.FloatField(),
+                },
+            ),
+            status.HTTP_400_BAD_REQUEST: ErrorWithCodeSerializer,
+            status.HTTP_403_FORBIDDEN: ErrorWithCodeSerializer,
+        },
+    ),
+    'get_documents_verification_cache_stats': extend_schema(
+        operation_id='manager_documents_verification_cache_stats',
+        summary=_('Статистика кэша проверки документов (менеджер)'),
+        description=_(
+            'Кол-во попаданий и промахов кэша результатов проверки документов '
+            'клиентов и доля попаданий. Попадание означает, что документы '
+            'повторно не проверялись во внешних сервисах.'
+        ),
+        responses={
+            status.HTTP_200_OK: inline_serializer(
+                name='DocumentsVerificationCacheStatsSerializer',
+                fields={
+                    'hits': serializers.IntegerField(),
+                    'misses': serializers.IntegerField(),
+                    'hit_rate': serializers.FloatField(),
+                },
+            ),
+            status.HTTP_403_FORBIDDEN: ErrorWithCodeSerializer,
+        },
+    ),
 }
 
 
@@ -212,10 +271,32 @@ client_order_viewset = {
     'create': extend_schema(
         operation_id='client_create_order',
         summary=_('Создание нового заказа (клиент)'),
-        description=_('Создание нового заказа от лица клиента.'),
+        description=_(
+            'Создание нового заказа от лица клиента.<br><br>'
+            'Если передан заголовок `Prefer: respond-async`, платежная сессия '
+            'инициализируется в фоне, и сразу возвращается `202` с ID заказа. '
+            'Смену статуса заказа можно ожидать через `wait-status`, а платежные '
+            'данные получить через `payment-data`. Если платеж инициализировать '
+            'не удалось, заказ переходит в статус `CANCELED`.'
+        ),
         request=ClientTinkoffInitPaymentSerializer,
+        parameters=[
+            OpenApiParameter(
+                name='Prefer',
+                type=str,
+                location=OpenApiParameter.HEADER,
+                description=_('`respond-async` для асинхронного создания заказа'),
+            ),
+        ],
         responses={
             status.HTTP_201_CREATED: PaymentDataSerializer,
+            status.HTTP_202_ACCEPTED: inline_serializer(
+                name='AsyncCreatedClientOrderSerializer',
+                fields={
+                    'order_id': serializers.IntegerField(),
+                    'status': serializers.CharField(),
+                },
+            ),
             status.HTTP_400_BAD_REQUEST: inline_serializer(
                 name='CreateErrorClientOrderSerializer',
                 fields={
@@ -263,6 +344,87 @@ client_order_viewset = {
             status.HTTP_200_OK: ClientOrderStatusSerializer,
         },
     ),
+    'get_payment_data': extend_schema(
+        operation_id='client_get_order_payment_data',
+        summary=_('Получение платежных данных заказа клиентом'),
+        description=_(
+            'Получение текущих платежных данных заказа: ссылки на платежную форму '
+            'или QR-кода для оплаты через СБП.<br><br>'
+            'Поддерживает условные запросы через заголовок `If-None-Match`.<br><br>'
+            'Пока платежная сессия асинхронно созданного заказа инициализируется, '
+            'возвращается `202` с заголовком `Retry-After`.<br><br>'
+            'Если QR-код для оплаты через СБП еще не получен от банка, он запрашивается '
+            'при чтении. Если банк не ответил, возвращаются данные с типом нагрузки '
+            '`qr_pending` и пустой нагрузкой - запрос нужно повторить позже.'
+        ),
+        responses={
+            status.HTTP_200_OK: PaymentDataSerializer,
+            status.HTTP_202_ACCEPTED: inline_serializer(
+                name='PendingPaymentDataSerializer',
+                fields={'status': serializers.CharField()},
+            ),
+            status.HTTP_304_NOT_MODIFIED: None,
+        },
+    ),
+    'get_payment_qr': extend_schema(
+        operation_id='client_get_order_payment_qr',
+        summary=_('Получение изображения QR-кода для оплаты через СБП'),
+        description=_(
+            'Изображение QR-кода рисуется по ссылке на оплату из платежных данных. '
+            'Ответ кэшируется клиентом до истечения платежной сессии '
+            '(`Cache-Control`) и поддерживает условные запросы через `If-None-Match`.<br><br>'
+            'Для заказов с оплатой картой возвращается `404`. Если QR-код еще не получен '
+            'от банка, он запрашивается при чтении, а при ошибке банка возвращается `502`. '
+            'Если QR-код уже запрашивается другим обращением, возвращается `202` '
+            'с заголовком `Retry-After`.'
+        ),
+        parameters=[
+            OpenApiParameter(
+                name='image_format',
+                type=str,
+                enum=['svg', 'png'],
+                description=_('Формат изображения. По умолчанию `svg`'),
+            ),
+        ],
+        responses={
+            (status.HTTP_200_OK, 'image/svg+xml'): OpenApiTypes.BINARY,
+            (status.HTTP_200_OK, 'image/png'): OpenApiTypes.BINARY,
+            status.HTTP_202_ACCEPTED: None,
+            status.HTTP_304_NOT_MODIFIED: None,
+            status.HTTP_404_NOT_FOUND: ErrorWithCodeSerializer,
+        },
+    ),
+    'wait_status': extend_schema(
+        operation_id='client_wait_order_status',
+        summary=_('Ожидание смены статуса заказа клиентом'),
+        description=_(
+            'Ожидание смены статуса заказа (long polling) вместо частого '
+            'опроса `get-status`.<br><br>'
+            'В параметре `status` передается известный клиенту статус заказа. '
+            'Если актуальный статус отличается, ответ возвращается сразу. '
+            'Иначе запрос удерживается до смены статуса, но не дольше `timeout` секунд. '
+            'Если статус за это время не сменился, возвращается `204`, и клиент '
+            'повторяет запрос. Ожидание завершается и при истечении платежной сессии.<br><br>'
+            'Если сервер уже удерживает максимальное кол-во ожидающих запросов, `204` '
+            'возвращается сразу с заголовком `Retry-After`.'
+        ),
+        parameters=[
+            OpenApiParameter(
+                name='status',
+                type=str,
+                description=_('Известный клиенту статус заказа'),
+            ),
+            OpenApiParameter(
+                name='timeout',
+                type=float,
+                description=_('Максимальное время ожидания в секундах'),
+            ),
+        ],
+        responses={
+            status.HTTP_200_OK: ClientOrderStatusSerializer,
+            status.HTTP_204_NO_CONTENT: None,
+        },
+    ),
     'reinit_payment': extend_schema(
         operation_id='client_reinit_payment_session',
         summary=_('Реинициализация платежной сессии для существующего заказа'),
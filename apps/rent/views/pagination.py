@@ -0,0 +1,315 @@
+import base64
+import binascii
+from typing import (
+    Any,
+    Final,
+)
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import (
+    Q,
+    QuerySet,
+)
+from django.utils.dateparse import parse_datetime
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.exceptions import NotFound
+from rest_framework.utils.urls import (
+    remove_query_param,
+    replace_query_param,
+)
+from rest_framework.pagination import (
+    BasePagination,
+    LimitOffsetPagination,
+)
+
+
+class OrderKeysetPagination(BasePagination):
+    """
+    Keyset-пагинация (пагинация по курсору) для списков заказов.
+
+    Страница выбирается по паре (`created_at`, `id`) последнего заказа
+    предыдущей страницы, а не по смещению. Поэтому выборка любой страницы
+    стоит одинаково и не зависит от глубины. Подсчет общего кол-ва заказов
+    (`COUNT(*)`) по умолчанию не выполняется и включается параметром `with_count`.
+
+    Заказы всегда отдаются в порядке убывания (`-created_at`, `-id`),
+    что дает стабильный порядок даже для заказов с одинаковой датой создания.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limit'
+    with_count_query_param = 'with_count'
+    default_page_size: int = 20
+    max_page_size: int = 100
+    invalid_cursor_message = _('Некорректный курсор')
+
+    _ORDERING: Final[tuple[str, str]] = ('-created_at', '-pk')
+    _CURSOR_SEPARATOR: Final[str] = '|'
+
+    def __init__(self) -> None:
+        """Инициализатор класса"""
+
+        self.request: Request | None = None
+        self.page_size: int = self.default_page_size
+        self.count: int | None = None
+        self.next_position: tuple[str, int] | None = None
+
+    def paginate_queryset(
+        self,
+        queryset: QuerySet,
+        request: Request,
+        view: Any = None,
+    ) -> list[Any]:
+        """
+        Получение страницы заказов.
+
+        :param queryset: Выборка заказов.
+        :param request: Объект запроса.
+        :param view: Обрабатывающее запрос представление.
+
+        :return: Заказы текущей страницы.
+        """
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self._ORDERING)
+
+        if self.__with_count(request):
+            self.count = queryset.count()
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            created_at, pk = position
+            # Условие `created_at <= ...` задает границу поиска по индексу
+            # (`-created_at`, `-id`). Без него условие из одного OR
+            # приводит к полному проходу индекса (см. `benchmarks.order_pagination`).
+            queryset = queryset.filter(
+                Q(created_at__lte=created_at),
+                Q(created_at__lt=created_at) | Q(pk__lt=pk),
+            )
+
+        # Берем на один элемент больше, чтобы без подсчета понять,
+        # есть ли следующая страница.
+        results = list(queryset[:self.page_size + 1])
+        has_next = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        self.next_position = None
+        if has_next:
+            last = results[-1]
+            self.next_position = (last.created_at.isoformat(), last.pk)
+
+        return results
+
+    def get_paginated_response(self, data: list[Any]) -> Response:
+        """
+        Формирование ответа со страницей данных.
+
+        :param data: Сериализованные данные страницы.
+        """
+
+        response_data = OrderedDict()
+        if self.count is not None:
+            response_data['count'] = self.count
+        response_data['next'] = self.get_next_link()
+        response_data['results'] = data
+
+        return Response(response_data)
+
+    def get_paginated_response_schema(self, schema: dict[str, Any]) -> dict[str, Any]:
+        """Получение схемы ответа для OpenAPI"""
+
+        return {
+            'type': 'object',
+            'properties': {
+                'count': {
+                    'type': 'integer',
+                    'example': 123,
+                    'description': 'Присутствует только при `with_count=true`',
+                },
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view: Any) -> list[dict[str, Any]]:
+        """Получение параметров запроса для OpenAPI"""
+
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Курсор страницы из поля `next` предыдущего ответа.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Кол-во заказов на странице.',
+                'schema': {'type': 'integer'},
+            },
+            {
+                'name': self.with_count_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Подсчитать общее кол-во заказов (дорогая операция).',
+                'schema': {'type': 'boolean'},
+            },
+        ]
+
+    def get_page_size(self, request: Request) -> int:
+        """Получение размера страницы из запроса"""
+
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.default_page_size
+
+        if page_size <= 0:
+            return self.default_page_size
+
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self) -> str | None:
+        """Получение ссылки на следующую страницу"""
+
+        if self.next_position is None:
+            return None
+
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, 'offset')
+
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.next_position),
+        )
+
+    def encode_cursor(self, position: tuple[str, int]) -> str:
+        """
+        Кодирование позиции в курсор.
+
+        :param position: Пара (`created_at` в ISO-формате, `id`).
+        """
+
+        raw = f'{position[0]}{self._CURSOR_SEPARATOR}{position[1]}'
+
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, request: Request) -> tuple[Any, int] | None:
+        """
+        Декодирование курсора из запроса.
+
+        :return: Пара (`created_at`, `id`) либо None, если курсора нет.
+        """
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode()).decode()
+            created_at_iso, pk = raw.rsplit(self._CURSOR_SEPARATOR, 1)
+            created_at = parse_datetime(created_at_iso)
+            pk = int(pk)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+
+        return created_at, pk
+
+    def __with_count(self, request: Request) -> bool:
+        """Проверка, запрошен ли подсчет общего кол-ва заказов"""
+
+        value = request.query_params.get(self.with_count_query_param, '')
+
+        return value.lower() in ('1', 'true', 'yes')
+
+
+class OrderListPagination(BasePagination):
+    """
+    Пагинация списков заказов с обратной совместимостью.
+
+    Keyset-пагинация `OrderKeysetPagination` используется, если в запросе
+    передан параметр `cursor` (для первой страницы - пустой) либо в настройках
+    выключен флаг `RENT_ORDERS_LEGACY_PAGINATION`.
+    Иначе используется старая пагинация по смещению (`LimitOffsetPagination`),
+    чтобы существующие клиенты продолжали работать без изменений.
+    Запросы с параметром `offset` всегда обрабатываются старой пагинацией.
+    """
+
+    keyset_pagination_class = OrderKeysetPagination
+    legacy_pagination_class = LimitOffsetPagination
+
+    def __init__(self) -> None:
+        """Инициализатор класса"""
+
+        self.__paginator: BasePagination | None = None
+
+    def paginate_queryset(
+        self,
+        queryset: QuerySet,
+        request: Request,
+        view: Any = None,
+    ) -> list[Any] | None:
+        """
+        Получение страницы заказов подходящей пагинацией.
+
+        :param queryset: Выборка заказов.
+        :param request: Объект запроса.
+        :param view: Обрабатывающее запрос представление.
+        """
+
+        self.__paginator = self.__choose_paginator(request)
+
+        return self.__paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data: list[Any]) -> Response:
+        """Формирование ответа со страницей данных"""
+
+        return self.__paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema: dict[str, Any]) -> dict[str, Any]:
+        """Получение схемы ответа для OpenAPI"""
+
+        return self.keyset_pagination_class().get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view: Any) -> list[dict[str, Any]]:
+        """Получение параметров запроса для OpenAPI"""
+
+        keyset_params = self.keyset_pagination_class().get_schema_operation_parameters(view)
+        legacy_params = [
+            param
+            for param in self.legacy_pagination_class().get_schema_operation_parameters(view)
+            if param['name'] not in {p['name'] for p in keyset_params}
+        ]
+
+        return keyset_params + legacy_params
+
+    def __choose_paginator(self, request: Request) -> BasePagination:
+        """Выбор пагинации на основе запроса и настроек"""
+
+        keyset_paginator = self.keyset_pagination_class()
+        legacy_paginator = self.legacy_pagination_class()
+
+        if keyset_paginator.cursor_query_param in request.query_params:
+            return keyset_paginator
+
+        if legacy_paginator.offset_query_param in request.query_params:
+            return legacy_paginator
+
+        if getattr(settings, 'RENT_ORDERS_LEGACY_PAGINATION', True):
+            return legacy_paginator
+
+        return keyset_paginator
@@ -8,3 +8,8 @@ class TinkoffConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.tinkoff_payments'
     verbose_name = _('Интеграция с Tinkoff Payments API')
+
+    def ready(self) -> None:
+        """Подключение обработчиков сигналов"""
+
+        from . import signals  # noqa: F401
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.2 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tinkoff_payments', '0004_alter_tinkoffpaymentdata_payment_session_lifetime'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tinkoffpaymentdata',
+            name='payload_type',
+            field=models.CharField(choices=[('payment_url', 'PAYMENT_URL'), ('qr_url', 'QR_URL'), ('qr_image', 'QR_IMAGE'), ('qr_pending', 'QR_PENDING')], max_length=11, verbose_name='Payment payload type'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.2 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tinkoff_payments', '0005_alter_tinkoffpaymentdata_payload_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tinkoffpaymentdata',
+            name='terminal_key',
+            field=models.CharField(blank=True, default='', max_length=20, verbose_name='Terminal key'),
+        ),
+    ]
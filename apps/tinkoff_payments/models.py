@@ -29,6 +29,12 @@ class TinkoffPaymentData(models.Model):
         max_length=23,
         verbose_name=_('Payment ID'),
     )
+    terminal_key = models.CharField(
+        max_length=20,
+        blank=True,
+        default='',
+        verbose_name=_('Terminal key'),
+    )
     payment_strategy = models.CharField(
         max_length=4,
         choices=PaymentStrategyType.choices(),
@@ -20,7 +20,8 @@ class PaymentDataSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = TinkoffPaymentData
-        fields = '__all__'
+        # Терминал, выдавший платеж, - внутренняя информация.
+        exclude = ('terminal_key',)
 
     def get_payment_session_lifetime(self, obj: TinkoffPaymentData) -> int:
         """Перевод объекта `timedelta` в секунды"""
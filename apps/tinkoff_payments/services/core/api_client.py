@@ -1,11 +1,21 @@
 import requests
+import threading
 from typing import (
     Any,
     Type,
+    Final,
 )
 
+from django.conf import settings
+
 from apps.common.utils.api_tools.base_api_client import BaseAPIClient
+from apps.common.utils.api_tools.hedging import (
+    HedgingStats,
+    HedgingPolicy,
+    RequestHedger,
+)
 
+from .endpoints import TinkoffRoutes
 from .request_signer import TinkoffPaymentsRequestSigner
 
 
@@ -15,9 +25,25 @@ class TinkoffPaymentsClient(BaseAPIClient):
 
     Каждый запрос необходимо подписывать по алгоритму, заложенному
     в `TinkoffPaymentsRequestSigner`.
+
+    Запросы GetQr идемпотентны для одного `PaymentId` и могут дублироваться
+    для снижения хвостовых задержек. Дублирование включается настройкой
+    `TINKOFF_REQUEST_HEDGING` - словарем параметров `HedgingPolicy`
+    (пустой словарь - параметры по умолчанию).
+
+    Время ожидания ответа банка ограничено настройкой `TINKOFF_REQUEST_TIMEOUT`
+    (секунды либо пара из времени подключения и чтения). Так запрос к банку
+    не может выполняться дольше, чем ожидает вызывающий код.
     """
 
     _default_signer_class: Type[TinkoffPaymentsRequestSigner] = TinkoffPaymentsRequestSigner
+    _IDEMPOTENT_ROUTES: frozenset[str] = frozenset({
+        TinkoffRoutes.GET_QR,
+    })
+    _DEFAULT_TIMEOUT: Final[tuple[float, float]] = (5, 30)
+
+    __default_hedger: RequestHedger | None = None
+    __hedger_lock = threading.Lock()
 
     def __init__(
         self,
@@ -25,6 +51,8 @@ class TinkoffPaymentsClient(BaseAPIClient):
         terminal_key: str,
         password: str,
         signer: TinkoffPaymentsRequestSigner | None = None,
+        hedger: RequestHedger | None = None,
+        reuse_sessions: bool = False,
     ) -> None:
         """
         Инициализатор класса.
@@ -35,14 +63,31 @@ class TinkoffPaymentsClient(BaseAPIClient):
         :param signer:
             Объект для подписи запросов в целях безопасности.
             Если None, используется подписчик запросов по умолчанию.
+        :param hedger:
+            Объект для дублирования идемпотентных запросов.
+            Если None, используется общий объект из настройки `TINKOFF_REQUEST_HEDGING`.
+        :param reuse_sessions:
+            Переиспользовать соединения между запросами. Используется
+            долгоживущими клиентами из `TinkoffClientRegistry`.
         """
 
-        super().__init__(base_url)
+        super().__init__(
+            base_url,
+            hedger or self.get_default_hedger(),
+            reuse_sessions,
+            timeout=getattr(settings, 'TINKOFF_REQUEST_TIMEOUT', self._DEFAULT_TIMEOUT),
+        )
 
         self.__terminal_key = terminal_key
         self.__password = password
         self.__signer = signer or self._default_signer_class(self.__password)
 
+    @property
+    def terminal_key(self) -> str:
+        """Ключ терминала"""
+
+        return self.__terminal_key
+
     def _get_default_request_data(self, request: requests.Request) -> dict[str, Any]:
         """
         Получение дополнительных данных для тела запроса.
@@ -68,3 +113,33 @@ class TinkoffPaymentsClient(BaseAPIClient):
         """
 
         return False
+
+    @classmethod
+    def get_default_hedger(cls) -> RequestHedger | None:
+        """
+        Получение общего объекта для дублирования запросов.
+
+        Объект один на процесс, поэтому замеры времени ответа и статистика
+        накапливаются между запросами.
+
+        :return: Объект для дублирования либо None, если дублирование выключено.
+        """
+
+        policy_kwargs: dict[str, Any] | None = getattr(settings, 'TINKOFF_REQUEST_HEDGING', None)
+        if policy_kwargs is None:
+            return None
+
+        if cls.__default_hedger is None:
+            with cls.__hedger_lock:
+                if cls.__default_hedger is None:
+                    cls.__default_hedger = RequestHedger(HedgingPolicy(**policy_kwargs))
+
+        return cls.__default_hedger
+
+    @classmethod
+    def get_hedging_stats(cls) -> dict[str, HedgingStats]:
+        """Получение статистики дублирования запросов текущего процесса по маршрутам"""
+
+        hedger = cls.get_default_hedger()
+
+        return hedger.get_stats() if hedger is not None else {}
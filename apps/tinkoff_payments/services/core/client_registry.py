@@ -0,0 +1,83 @@
+import threading
+
+from .api_client import TinkoffPaymentsClient
+from .settings_snapshot import TinkoffSettings
+
+
+class TinkoffClientRegistry:
+    """
+    Реестр долгоживущих клиентов API Тинькофф.
+
+    Клиенты хранятся по паре (базовый URL, ключ терминала) и живут все время
+    жизни процесса (например, воркера Celery), поэтому соединения с банком
+    переиспользуются между запросами. Клиенты потокобезопасны: у каждого
+    потока своя сессия (см. `BaseAPIClient`).
+
+    При смене пароля терминала клиент пересоздается. Старый клиент
+    не закрывается, т.к. им могут пользоваться запросы в других потоках:
+    он просто выводится из реестра, а его сессии освобождаются вместе
+    с последней ссылкой на него.
+
+    Клиенты из реестра нельзя использовать как контекстный менеджер.
+    """
+
+    __clients: dict[tuple[str, str], tuple[str, TinkoffPaymentsClient]] = {}
+    __lock = threading.Lock()
+
+    @classmethod
+    def get(cls, base_url: str, terminal_key: str, password: str) -> TinkoffPaymentsClient:
+        """
+        Получение клиента для терминала.
+
+        :param base_url: Базовый URL для запросов к API.
+        :param terminal_key: Ключ терминала.
+        :param password: Пароль от терминала.
+        """
+
+        key = (base_url, terminal_key)
+
+        entry = cls.__clients.get(key)
+        if entry is not None and entry[0] == password:
+            return entry[1]
+
+        with cls.__lock:
+            entry = cls.__clients.get(key)
+            if entry is not None and entry[0] == password:
+                return entry[1]
+
+            client = TinkoffPaymentsClient(
+                base_url=base_url,
+                terminal_key=terminal_key,
+                password=password,
+                reuse_sessions=True,
+            )
+            cls.__clients[key] = (password, client)
+
+        return client
+
+    @classmethod
+    def get_default(cls) -> TinkoffPaymentsClient:
+        """Получение клиента для терминала из настроек `TinkoffSettings`"""
+
+        settings_snapshot = TinkoffSettings.get()
+
+        return cls.get(
+            base_url=settings_snapshot.api_url,
+            terminal_key=settings_snapshot.terminal_key,
+            password=settings_snapshot.password,
+        )
+
+    @classmethod
+    def clear(cls) -> None:
+        """
+        Закрытие и удаление всех клиентов.
+
+        Вызывается, например, в дочернем процессе воркера после форка,
+        чтобы не использовать соединения родительского процесса.
+        """
+
+        with cls.__lock:
+            clients, cls.__clients = list(cls.__clients.values()), {}
+
+        for _, client in clients:
+            client.close()
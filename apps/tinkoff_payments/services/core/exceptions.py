@@ -7,3 +7,20 @@ class TinkoffResponseException(APIResponseException):
 
     def __init__(self, response: Response, message: str | None = None) -> None:
         super().__init__(response, message)
+
+
+class UnknownTerminalException(Exception):
+    """Исключение, если терминала нет в настройках"""
+
+    def __init__(self, terminal_key: str | None = None) -> None:
+        """
+        Инициализатор класса.
+
+        :param terminal_key: Ключ терминала. Если None - нет ни одного терминала для новых платежей.
+        """
+
+        self.message = (
+            f'Терминал {terminal_key} не найден в настройках' if terminal_key is not None
+            else 'В настройках нет терминалов с ненулевым весом для новых платежей'
+        )
+        super().__init__(self.message)
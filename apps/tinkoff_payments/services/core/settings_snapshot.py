@@ -0,0 +1,165 @@
+import time
+import threading
+from typing import (
+    Any,
+    Final,
+)
+from dataclasses import dataclass
+
+from constance import config
+from django.conf import settings
+from django.core.cache import cache
+
+
+@dataclass(frozen=True)
+class TinkoffTerminal:
+    """
+    Терминал Тинькофф.
+
+    :param terminal_key: Ключ терминала.
+    :param password: Пароль от терминала.
+    :param weight:
+        Вес терминала при распределении новых платежей.
+        Терминал с весом 0 новые платежи не получает, но обслуживает уже созданные.
+    """
+
+    terminal_key: str
+    password: str
+    weight: int = 1
+
+
+@dataclass(frozen=True)
+class TinkoffSettingsSnapshot:
+    """
+    Снимок настроек Тинькофф из constance.
+
+    :param api_url: Базовый URL API Тинькофф.
+    :param terminal_key: Ключ терминала по умолчанию.
+    :param password: Пароль от терминала по умолчанию.
+    :param advance_amount: Сумма аванса в копейках.
+    :param terminals: Все терминалы, включая терминал по умолчанию.
+    :param version: Версия настроек, с которой снят снимок.
+    :param loaded_at: Время снятия снимка по `time.monotonic()`.
+    """
+
+    api_url: str
+    terminal_key: str
+    password: str
+    advance_amount: int
+    terminals: tuple[TinkoffTerminal, ...]
+    version: int
+    loaded_at: float
+
+
+class TinkoffSettings:
+    """
+    Кэш настроек Тинькофф из constance в памяти процесса.
+
+    Каждое чтение `config.X` - запрос к хранилищу constance, а настройки
+    платежей читаются при каждом запросе к банку. Поэтому настройки
+    читаются разом в снимок `TinkoffSettingsSnapshot`, который переиспользуется.
+
+    Актуальность снимка проверяется не чаще раза в
+    `TINKOFF_SETTINGS_CHECK_INTERVAL` секунд: сверяется версия настроек
+    в общем кэше Django. Версия увеличивается при изменении настроек
+    constance (сигнал `config_updated`, см. `invalidate`), поэтому все
+    процессы подхватывают новые настройки в пределах интервала проверки.
+    Настройки, измененные в обход сигнала, подхватываются по истечении
+    `TINKOFF_SETTINGS_TTL` секунд.
+
+    Помимо терминала по умолчанию из constance, снимок содержит все терминалы
+    из настройки `TINKOFF_TERMINALS` (см. `TinkoffTerminalPool`).
+    """
+
+    _VERSION_CACHE_KEY: Final[str] = 'tinkoff_payments:settings_version'
+    _DEFAULT_CHECK_INTERVAL: Final[float] = 5
+    _DEFAULT_TTL: Final[float] = 5 * 60
+
+    __snapshot: TinkoffSettingsSnapshot | None = None
+    __checked_at: float = 0.0
+    __lock = threading.Lock()
+
+    @classmethod
+    def get(cls) -> TinkoffSettingsSnapshot:
+        """Получение актуального снимка настроек"""
+
+        snapshot = cls.__snapshot
+        now = time.monotonic()
+        check_interval = getattr(settings, 'TINKOFF_SETTINGS_CHECK_INTERVAL', cls._DEFAULT_CHECK_INTERVAL)
+
+        # Быстрый путь без обращения к кэшу и constance.
+        if snapshot is not None and now < cls.__checked_at + check_interval:
+            return snapshot
+
+        with cls.__lock:
+            snapshot = cls.__snapshot
+            if snapshot is not None and now < cls.__checked_at + check_interval:
+                return snapshot
+
+            version = cache.get(cls._VERSION_CACHE_KEY, 0)
+            ttl = getattr(settings, 'TINKOFF_SETTINGS_TTL', cls._DEFAULT_TTL)
+            if snapshot is None or snapshot.version != version or now >= snapshot.loaded_at + ttl:
+                snapshot = cls.__load(version)
+
+            cls.__snapshot = snapshot
+            cls.__checked_at = now
+
+        return snapshot
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """
+        Сброс снимков настроек во всех процессах.
+
+        Текущий процесс перечитает настройки при следующем обращении,
+        остальные - после очередной проверки версии.
+        """
+
+        try:
+            cache.incr(cls._VERSION_CACHE_KEY)
+        except ValueError:
+            # Версии в кэше еще нет (либо она вытеснена).
+            cache.set(cls._VERSION_CACHE_KEY, 1, timeout=None)
+
+        with cls.__lock:
+            cls.__snapshot = None
+
+    @classmethod
+    def __load(cls, version: int) -> TinkoffSettingsSnapshot:
+        """Чтение настроек из constance"""
+
+        terminal_key = config.TINKOFF_TERMINAL_KEY
+        password = config.TINKOFF_PASSWORD
+
+        return TinkoffSettingsSnapshot(
+            api_url=config.TINKOFF_API_URL,
+            terminal_key=terminal_key,
+            password=password,
+            advance_amount=config.TINKOFF_ADVANCE_AMOUNT,
+            terminals=cls.__get_terminals(terminal_key, password),
+            version=version,
+            loaded_at=time.monotonic(),
+        )
+
+    @staticmethod
+    def __get_terminals(default_terminal_key: str, default_password: str) -> tuple[TinkoffTerminal, ...]:
+        """
+        Получение терминалов.
+
+        Терминалы задаются настройкой `TINKOFF_TERMINALS` - списком словарей
+        с полями `TinkoffTerminal`. Терминал по умолчанию из constance
+        добавляется всегда: если его нет в списке, он получает вес 0
+        и только обслуживает ранее созданные платежи. Так же выводятся
+        из распределения и остальные терминалы: их оставляют в списке
+        с весом 0, пока у них есть незавершенные платежи.
+        """
+
+        terminals_settings: list[dict[str, Any]] | None = getattr(settings, 'TINKOFF_TERMINALS', None)
+        if not terminals_settings:
+            return (TinkoffTerminal(terminal_key=default_terminal_key, password=default_password),)
+
+        terminals = tuple(TinkoffTerminal(**terminal_settings) for terminal_settings in terminals_settings)
+        if all(terminal.terminal_key != default_terminal_key for terminal in terminals):
+            terminals += (TinkoffTerminal(terminal_key=default_terminal_key, password=default_password, weight=0),)
+
+        return terminals
@@ -0,0 +1,173 @@
+import time
+import random
+import logging
+import threading
+from typing import (
+    Final,
+    Iterator,
+)
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import requests
+from django.conf import settings
+
+from .api_client import TinkoffPaymentsClient
+from .client_registry import TinkoffClientRegistry
+from .exceptions import (
+    TinkoffResponseException,
+    UnknownTerminalException,
+)
+from .settings_snapshot import (
+    TinkoffTerminal,
+    TinkoffSettings,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _TerminalHealth:
+    """
+    Состояние терминала в текущем процессе.
+
+    :param failures: Кол-во ошибок подряд.
+    :param unhealthy_until: Время по `time.monotonic()`, до которого терминал исключен из распределения.
+    """
+
+    failures: int = 0
+    unhealthy_until: float = 0.0
+
+
+class TinkoffTerminalPool:
+    """
+    Пул терминалов Тинькофф.
+
+    Новые платежи распределяются между терминалами случайно пропорционально
+    весам (`TINKOFF_TERMINALS`). Терминал, ответивший ошибкой
+    `TINKOFF_TERMINAL_MAX_FAILURES` раз подряд (например, при превышении лимитов),
+    исключается из распределения на `TINKOFF_TERMINAL_COOLDOWN` секунд.
+    Если исключены все терминалы, платежи распределяются между всеми.
+
+    Ключ терминала сохраняется в платежных данных, поэтому операции
+    с платежом (отмена, подтверждение, проверка уведомлений) выполняются
+    через выдавший его терминал. Платежи без ключа терминала созданы
+    до появления пула и обслуживаются терминалом по умолчанию.
+
+    Поэтому терминал нельзя просто удалить из `TINKOFF_TERMINALS`, пока
+    у него есть незавершенные платежи: операции с ними завершатся
+    ошибкой `UnknownTerminalException`. Выводимый терминал оставляют
+    в настройке с весом 0 (и прежним паролем) - он не получает новые
+    платежи, но обслуживает уже созданные.
+
+    Состояние терминалов хранится в памяти процесса.
+    """
+
+    _DEFAULT_MAX_FAILURES: Final[int] = 3
+    _DEFAULT_COOLDOWN: Final[float] = 60
+
+    __health: dict[str, _TerminalHealth] = {}
+    __lock = threading.Lock()
+
+    @classmethod
+    def choose(cls) -> TinkoffTerminal:
+        """
+        Выбор терминала для нового платежа.
+
+        :raises UnknownTerminalException: Если нет терминалов с ненулевым весом.
+        """
+
+        terminals = [terminal for terminal in TinkoffSettings.get().terminals if terminal.weight > 0]
+        if not terminals:
+            raise UnknownTerminalException()
+
+        now = time.monotonic()
+        with cls.__lock:
+            healthy_terminals = [
+                terminal
+                for terminal in terminals
+                if cls.__health.get(terminal.terminal_key, _TerminalHealth()).unhealthy_until <= now
+            ]
+
+        candidates = healthy_terminals or terminals
+
+        return random.choices(candidates, weights=[terminal.weight for terminal in candidates])[0]
+
+    @classmethod
+    def get(cls, terminal_key: str) -> TinkoffTerminal:
+        """
+        Получение терминала по ключу.
+
+        :param terminal_key: Ключ терминала. Пустой ключ - терминал по умолчанию.
+
+        :raises UnknownTerminalException: Если терминала нет в настройках.
+        """
+
+        settings_snapshot = TinkoffSettings.get()
+        terminal_key = terminal_key or settings_snapshot.terminal_key
+
+        for terminal in settings_snapshot.terminals:
+            if terminal.terminal_key == terminal_key:
+                return terminal
+
+        raise UnknownTerminalException(terminal_key)
+
+    @classmethod
+    def get_client(cls, terminal_key: str) -> TinkoffPaymentsClient:
+        """
+        Получение клиента API для терминала.
+
+        :param terminal_key: Ключ терминала. Пустой ключ - терминал по умолчанию.
+
+        :raises UnknownTerminalException: Если терминала нет в настройках.
+        """
+
+        terminal = cls.get(terminal_key)
+
+        return TinkoffClientRegistry.get(
+            base_url=TinkoffSettings.get().api_url,
+            terminal_key=terminal.terminal_key,
+            password=terminal.password,
+        )
+
+    @classmethod
+    @contextmanager
+    def track(cls, terminal_key: str) -> Iterator[None]:
+        """
+        Учет результата запросов к терминалу.
+
+        Ошибкой терминала считаются только ошибки банка
+        (`TinkoffResponseException`) и сетевые ошибки (`requests.RequestException`).
+        Остальные исключения (например, ошибки нашего кода) не исключают
+        терминал из распределения.
+
+        :param terminal_key: Ключ терминала.
+        """
+
+        try:
+            yield
+        except (TinkoffResponseException, requests.RequestException):
+            cls.__report_failure(terminal_key)
+            raise
+
+        with cls.__lock:
+            cls.__health.pop(terminal_key, None)
+
+    @classmethod
+    def __report_failure(cls, terminal_key: str) -> None:
+        """Учет ошибки терминала"""
+
+        max_failures = getattr(settings, 'TINKOFF_TERMINAL_MAX_FAILURES', cls._DEFAULT_MAX_FAILURES)
+        cooldown = getattr(settings, 'TINKOFF_TERMINAL_COOLDOWN', cls._DEFAULT_COOLDOWN)
+
+        with cls.__lock:
+            health = cls.__health.setdefault(terminal_key, _TerminalHealth())
+            health.failures += 1
+            if health.failures < max_failures:
+                return
+
+            health.failures = 0
+            health.unhealthy_until = time.monotonic() + cooldown
+
+        logger.warning(f'Терминал {terminal_key} исключен из распределения платежей на {cooldown} с')
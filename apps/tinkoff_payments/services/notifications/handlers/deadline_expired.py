@@ -1,4 +1,5 @@
 from apps.rent.models import Order
+from apps.rent.services.order_status import OrderStatusService
 
 from ..dto import TinkoffNotificationDTO
 from .notification_handable import NotificationHandable
@@ -10,9 +11,7 @@ class TinkoffNotificationDeadlineExpiredHandler(NotificationHandable):
     def handle(self, notification: TinkoffNotificationDTO) -> None:
         """Обработка уведомления"""
 
-        (
-            Order.objects
-                .select_related('payment_data')  # noqa: E131
-                .filter(payment_data__pk=notification.payment_id)
-                .update(status=Order.Status.PAYMENT_SESSION_EXPIRED)
+        OrderStatusService.bulk_set_status(
+            queryset=Order.objects.filter(payment_data__pk=notification.payment_id),
+            new_status=Order.Status.PAYMENT_SESSION_EXPIRED,
         )
@@ -1,4 +1,5 @@
 from apps.rent.models import Order
+from apps.rent.services.order_status import OrderStatusService
 
 from ..dto import TinkoffNotificationDTO
 from .notification_handable import NotificationHandable
@@ -14,9 +15,6 @@ class TinkoffNotificationRejectedHandler(NotificationHandable):
         :param notification: DTO нотификации.
         """
 
-        order = Order.objects.filter(pk=notification.order_id).first()
-        if order is None:
-            return
-
-        order.status = Order.Status.REJECTED
-        order.save(update_fields=('status',))
+        # Статус меняется только у заказа, ожидающего оплаты. Несуществующий
+        # заказ или заказ в другом статусе просто не будет обновлен.
+        OrderStatusService.set_status_by_pk(notification.order_id, Order.Status.REJECTED)
@@ -0,0 +1,74 @@
+import hmac
+from typing import (
+    Any,
+    Mapping,
+)
+
+from django.conf import settings
+
+from ...models import TinkoffPaymentData
+from ..core.exceptions import UnknownTerminalException
+from ..core.terminal_pool import TinkoffTerminalPool
+from ..core.request_signer import TinkoffPaymentsRequestSigner
+from ..core.settings_snapshot import TinkoffSettings
+
+
+class TinkoffNotificationVerifier:
+    """
+    Проверка подлинности уведомлений от Тинькофф.
+
+    Уведомление подписано паролем терминала из поля `TerminalKey` так же,
+    как и запросы к API. Кроме подписи проверяется, что уведомление пришло
+    от терминала, выдавшего платеж.
+
+    Проверка включается настройкой `TINKOFF_VERIFY_NOTIFICATIONS = True`.
+    По умолчанию она выключена, пока не подтверждено, что подписи
+    уведомлений всех терминалов сходятся, иначе отклоненные уведомления
+    оставили бы заказы в ожидании оплаты.
+    """
+
+    @classmethod
+    def verify(cls, data: Mapping[str, Any]) -> bool:
+        """
+        Проверка уведомления.
+
+        :param data: Данные уведомления в исходном виде (ключи в CamelCase).
+
+        :return: True, если уведомление подлинное.
+        """
+
+        if not getattr(settings, 'TINKOFF_VERIFY_NOTIFICATIONS', False):
+            return True
+
+        terminal_key = str(data.get('TerminalKey') or '')
+        token = str(data.get('Token') or '')
+        if not terminal_key or not token:
+            return False
+
+        try:
+            terminal = TinkoffTerminalPool.get(terminal_key)
+        except UnknownTerminalException:
+            return False
+
+        # Подписываются только параметры верхнего уровня.
+        sign_data = {
+            key: value
+            for key, value in data.items()
+            if key != 'Token' and not isinstance(value, (dict, list))
+        }
+        expected_token = TinkoffPaymentsRequestSigner(terminal.password).generate_sign(sign_data)
+        if not hmac.compare_digest(expected_token, token):
+            return False
+
+        payment_terminal_key = (
+            TinkoffPaymentData.objects
+                .filter(pk=str(data.get('PaymentId')))  # noqa: E131
+                .values_list('terminal_key', flat=True)  # noqa: E131
+                .first()  # noqa: E131
+        )
+        # Неизвестный платеж отбрасывает обработчик уведомления.
+        if payment_terminal_key is None:
+            return True
+
+        # Платежи без ключа терминала выданы терминалом по умолчанию.
+        return (payment_terminal_key or TinkoffSettings.get().terminal_key) == terminal.terminal_key
@@ -1,24 +1,27 @@
 from requests import Response
 
-from constance import config
 from rest_framework import status
 
 from .core.endpoints import TinkoffRoutes
 from .core.api_client import TinkoffPaymentsClient
+from .core.client_registry import TinkoffClientRegistry
 from .core.exceptions import TinkoffResponseException
 
 
 class TinkoffPaymentCancellationService:
     """Сервис для полной отмены платежной сессии у заказа"""
 
-    def __init__(self, payment_id: str) -> None:
-        """Инициализатор класса"""
+    def __init__(self, payment_id: str, api_client: TinkoffPaymentsClient | None = None) -> None:
+        """
+        Инициализатор класса.
 
-        self.__api_client = TinkoffPaymentsClient(
-            base_url=config.TINKOFF_API_URL,
-            terminal_key=config.TINKOFF_TERMINAL_KEY,
-            password=config.TINKOFF_PASSWORD,
-        )
+        :param payment_id: ID платежа в системе банка.
+        :param api_client:
+            Клиент для работы с API Тинькофф.
+            По умолчанию - клиент терминала из настроек (`TinkoffClientRegistry`).
+        """
+
+        self.__api_client = api_client or TinkoffClientRegistry.get_default()
         self.__payment_id = payment_id
 
     def cancel(self) -> Response:
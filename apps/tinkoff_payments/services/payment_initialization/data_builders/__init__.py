@@ -8,7 +8,11 @@
 Каждый такой класс может предоставлять свою схему для подготовки 
 данных для тела запроса. По умолчанию используется класс для сборки 
 данных для уплаты аванса.
+
+Постоянные части тела запроса можно собирать в шаблон один раз,
+унаследовавшись от `TemplatedInitDataBuilder`.
 """
 
 from .init_data_buildable import InitDataBuildable
+from .templated_init_data_builder import TemplatedInitDataBuilder
 from .advance_payment_data_builder import AdvancePaymentDataBuilder
@@ -1,9 +1,10 @@
 from typing import (
     Any,
     Final,
+    Hashable,
 )
+from dataclasses import dataclass
 
-from constance import config
 from django.conf import settings
 from django.utils import timezone
 
@@ -17,74 +18,140 @@ from ..enums import (
     PaymentObject,
     PaymentStrategyType,
 )
-from .init_data_buildable import InitDataBuildable
+from .templated_init_data_builder import TemplatedInitDataBuilder
+from ...core.settings_snapshot import TinkoffSettings
 
 
-class AdvancePaymentDataBuilder(InitDataBuildable):
-    """Класс для построения данных аванса для запроса Init"""
+@dataclass(frozen=True)
+class _AdvancePaymentTemplate:
+    """
+    Шаблон тела запроса Init для уплаты аванса.
+
+    :param body: Поля тела запроса, не зависящие от заказа.
+    :param order_url_prefix: Часть ссылки возврата на фронтенд до ID заказа.
+    :param order_url_suffix: Часть ссылки возврата на фронтенд после ID заказа.
+    :param receipt: Поля чека, не зависящие от заказа.
+    :param receipt_item: Поля позиции чека, не зависящие от заказа.
+    """
+
+    body: dict[str, Any]
+    order_url_prefix: str
+    order_url_suffix: str
+    receipt: dict[str, Any]
+    receipt_item: dict[str, Any]
+
+
+class AdvancePaymentDataBuilder(TemplatedInitDataBuilder):
+    """
+    Класс для построения данных аванса для запроса Init.
+
+    Шаблон пересобирается при изменении суммы аванса `TINKOFF_ADVANCE_AMOUNT`.
+    """
 
     _PAYMENT_TYPE_MAP: Final[dict[PaymentStrategyType, PayType]] = {
         PaymentStrategyType.CARD: PayType.TWO_STAGE,
         PaymentStrategyType.SBP: PayType.SINGLE_STAGE,
     }
 
-    def build(self, order: Order, payment_strategy: PaymentStrategyType) -> dict[str, Any]:
+    # Параметры, которые Тинькофф подставляет в ссылки возврата после оплаты.
+    _ORDER_URL_QUERY: Final[str] = (
+        '?Success=${Success}&ErrorCode=${ErrorCode}&Message=${Message}'
+        '&Details=${Details}&Amount=${Amount}&MerchantEmail=${MerchantEmail}'
+        '&MerchantName=${MerchantName}&OrderId=${OrderId}&PaymentId=${PaymentId}'
+        '&TranDate=${TranDate}&BackUrl=${BackUrl}&CompanyName=${CompanyName}'
+        '&EmailReq=${EmailReq}&PhonesReq=${PhonesReq}'
+    )
+
+    def _get_template_key(self, payment_strategy: PaymentStrategyType) -> Hashable:
         """
-        Построение тела для запроса Init.
+        Получение ключа шаблона.
+
+        Сумма аванса берется из снимка настроек `TinkoffSettings`.
+
+        :param payment_strategy: Способ оплаты.
+        """
+
+        return TinkoffSettings.get().advance_amount, payment_strategy
+
+    def _compile_template(
+        self,
+        key: Hashable,
+        payment_strategy: PaymentStrategyType,
+    ) -> _AdvancePaymentTemplate:
+        """
+        Сборка шаблона тела запроса.
+
+        :param key: Ключ шаблона: сумма аванса и способ оплаты.
+        :param payment_strategy: Способ оплаты.
+        """
+
+        amount, _ = key
 
+        return _AdvancePaymentTemplate(
+            body={
+                'Amount': amount,
+                'NotificationURL': settings.TINKOFF_NOTIFICATIONS_URL,
+                'PayType': self._PAYMENT_TYPE_MAP[payment_strategy].value,
+            },
+            order_url_prefix=f'{settings.FRONTEND_HOST}/orders/',
+            order_url_suffix=self._ORDER_URL_QUERY,
+            receipt={
+                'Taxation': Taxation.USN_INCOME_OUTCOME.value,
+            },
+            receipt_item={
+                'Quantity': 1,
+                'Amount': amount,
+                'Price': amount,
+                'PaymentMethod': PaymentMethod.PREPAYMENT.value,
+                'PaymentObject': PaymentObject.SERVICE.value,
+                'Tax': Tax.NONE.value,
+            },
+        )
+
+    def _fill_template(
+        self,
+        template: _AdvancePaymentTemplate,
+        order: Order,
+        payment_strategy: PaymentStrategyType,
+    ) -> dict[str, Any]:
+        """
+        Подстановка данных заказа в шаблон.
+
+        :param template: Шаблон тела запроса.
         :param order: Объект заказа.
         :param payment_strategy: Способ оплаты.
 
         :return: Тело для запроса Init.
         """
 
-        # Получим дату истечения платежной ссылки без микросекунд в ISO-формате.
-        # Тинькофф не принимает даты с микросекундами.
-        now = timezone.localtime()
-        now_without_microseconds = timezone.datetime(
-            year=now.year, month=now.month,
-            day=now.day, hour=now.hour, minute=now.minute,
-            second=now.second, tzinfo=now.tzinfo,
-        )
-        datetime_expired_iso = (
-            now_without_microseconds + settings.TINKOFF_PAYMENT_SESSION_LIFETIME
-        ).isoformat()
+        order_url = f'{template.order_url_prefix}{order.pk}{template.order_url_suffix}'
 
         return {
-            'Amount': config.TINKOFF_ADVANCE_AMOUNT,
+            **template.body,
             'OrderId': str(order.pk),
-            'NotificationURL': settings.TINKOFF_NOTIFICATIONS_URL,
-            'PayType': self._PAYMENT_TYPE_MAP[payment_strategy].value,
-            'RedirectDueDate': datetime_expired_iso,
-            'SuccessURL': (
-                f'{settings.FRONTEND_HOST}/orders/{order.pk}'
-                '?Success=${Success}&ErrorCode=${ErrorCode}&Message=${Message}'
-                '&Details=${Details}&Amount=${Amount}&MerchantEmail=${MerchantEmail}'
-                '&MerchantName=${MerchantName}&OrderId=${OrderId}&PaymentId=${PaymentId}'
-                '&TranDate=${TranDate}&BackUrl=${BackUrl}&CompanyName=${CompanyName}'
-                '&EmailReq=${EmailReq}&PhonesReq=${PhonesReq}'
-            ),
-            'FailURL': (
-                f'{settings.FRONTEND_HOST}/orders/{order.pk}'
-                '?Success=${Success}&ErrorCode=${ErrorCode}&Message=${Message}'
-                '&Details=${Details}&Amount=${Amount}&MerchantEmail=${MerchantEmail}'
-                '&MerchantName=${MerchantName}&OrderId=${OrderId}&PaymentId=${PaymentId}'
-                '&TranDate=${TranDate}&BackUrl=${BackUrl}&CompanyName=${CompanyName}'
-                '&EmailReq=${EmailReq}&PhonesReq=${PhonesReq}'
-            ),
+            'RedirectDueDate': self.__get_redirect_due_date(),
+            'SuccessURL': order_url,
+            'FailURL': order_url,
             'Receipt': {
+                **template.receipt,
                 'Phone': str(order.user.phone),
-                'Taxation': Taxation.USN_INCOME_OUTCOME.value,
                 'Items': [
                     {
+                        **template.receipt_item,
                         'Name': str(order),
-                        'Quantity': 1,
-                        'Amount': config.TINKOFF_ADVANCE_AMOUNT,
-                        'Price': config.TINKOFF_ADVANCE_AMOUNT,
-                        'PaymentMethod': PaymentMethod.PREPAYMENT.value,
-                        'PaymentObject': PaymentObject.SERVICE.value,
-                        'Tax': Tax.NONE.value,
                     }
                 ],
             },
         }
+
+    @staticmethod
+    def __get_redirect_due_date() -> str:
+        """
+        Получение даты истечения платежной ссылки в ISO-формате.
+
+        Тинькофф не принимает даты с микросекундами, поэтому отбрасываем их.
+        """
+
+        expired_at = timezone.localtime().replace(microsecond=0) + settings.TINKOFF_PAYMENT_SESSION_LIFETIME
+
+        return expired_at.isoformat()
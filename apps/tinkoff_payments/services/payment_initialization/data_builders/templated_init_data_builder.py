@@ -0,0 +1,97 @@
+from abc import abstractmethod
+from typing import (
+    Any,
+    Final,
+    Hashable,
+)
+
+from utils.caching import LRUCache
+
+from apps.rent.models import Order
+
+from ..enums import PaymentStrategyType
+from .init_data_buildable import InitDataBuildable
+
+
+class TemplatedInitDataBuilder(InitDataBuildable):
+    """
+    Базовый класс для построения данных для запроса Init по шаблону.
+
+    Части тела запроса, не зависящие от заказа (суммы, ссылки, чек),
+    собираются в шаблон один раз для каждого ключа шаблона и кэшируются.
+    При построении данных для заказа в шаблон подставляются только
+    данные заказа (см. `_fill_template`).
+
+    Ключ шаблона должен включать все значения настроек, из которых
+    собирается шаблон, - тогда при их изменении шаблон пересобирается.
+
+    Шаблоны общие для всех потоков, поэтому `_fill_template` не должен
+    изменять шаблон, а только собирать из него новые объекты.
+    """
+
+    _TEMPLATES_CACHE_SIZE: Final[int] = 64
+
+    __templates: LRUCache[tuple[type, Hashable], Any] = LRUCache(maxsize=_TEMPLATES_CACHE_SIZE)
+
+    def build(self, order: Order, payment_strategy: PaymentStrategyType) -> dict[str, Any]:
+        """
+        Построение тела для запроса Init.
+
+        :param order: Объект заказа.
+        :param payment_strategy: Способ оплаты.
+
+        :return: Тело для запроса Init.
+        """
+
+        key = (type(self), self._get_template_key(payment_strategy))
+
+        template = self.__templates.get(key)
+        if template is None:
+            template = self._compile_template(key[1], payment_strategy)
+            self.__templates.set(key, template)
+
+        return self._fill_template(template, order, payment_strategy)
+
+    @abstractmethod
+    def _get_template_key(self, payment_strategy: PaymentStrategyType) -> Hashable:
+        """
+        Получение ключа шаблона.
+
+        :param payment_strategy: Способ оплаты.
+
+        :return: Ключ, однозначно определяющий содержимое шаблона.
+        """
+
+        raise NotImplementedError()
+
+    @abstractmethod
+    def _compile_template(self, key: Hashable, payment_strategy: PaymentStrategyType) -> Any:
+        """
+        Сборка шаблона тела запроса.
+
+        :param key: Ключ шаблона, полученный из `_get_template_key`.
+        :param payment_strategy: Способ оплаты.
+
+        :return: Шаблон тела запроса.
+        """
+
+        raise NotImplementedError()
+
+    @abstractmethod
+    def _fill_template(
+        self,
+        template: Any,
+        order: Order,
+        payment_strategy: PaymentStrategyType,
+    ) -> dict[str, Any]:
+        """
+        Подстановка данных заказа в шаблон.
+
+        :param template: Шаблон тела запроса.
+        :param order: Объект заказа.
+        :param payment_strategy: Способ оплаты.
+
+        :return: Тело для запроса Init.
+        """
+
+        raise NotImplementedError()
@@ -21,6 +21,8 @@ class ResponsePaymentInitDTO:
         Сама полезная нагрузка для оплаты.
         Это может быть либо URL на платежную форму,
         либо URL QR-кода, либо SVG QR-кода.
+    :param payment_session_lifetime: Время жизни платежной сессии.
+    :param terminal_key: Ключ терминала, через который создан платеж.
     """
 
     order_id: int
@@ -29,3 +31,4 @@ class ResponsePaymentInitDTO:
     payload_type: ResponsePaymentInitPayloadType
     payload: str
     payment_session_lifetime: timedelta
+    terminal_key: str = ''
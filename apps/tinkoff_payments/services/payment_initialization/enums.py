@@ -45,6 +45,8 @@ class ResponsePaymentInitPayloadType(str, Enum):
     PAYMENT_URL = auto()
     QR_URL = auto()
     QR_IMAGE = auto()
+    # QR-код для оплаты через СБП еще не получен от банка (см. `SBPQrResolver`).
+    QR_PENDING = auto()
 
     @classmethod
     def choices(cls) -> Iterable[tuple[str, Any]]:
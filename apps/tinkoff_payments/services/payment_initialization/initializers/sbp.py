@@ -28,7 +28,12 @@ class TinkoffSBPInitializer(PaymentInitializable):
         QrDataType.PAYLOAD: ResponsePaymentInitPayloadType.QR_URL,
     }
 
-    def __init__(self, api_client: TinkoffPaymentsClient, qr_data_type: QrDataType) -> None:
+    def __init__(
+        self,
+        api_client: TinkoffPaymentsClient,
+        qr_data_type: QrDataType,
+        lazy_qr: bool = False,
+    ) -> None:
         """
         Инициализатор класса.
 
@@ -36,10 +41,15 @@ class TinkoffSBPInitializer(PaymentInitializable):
         :param qr_data_type:
             Тип возвращаемого значения: либо ссылка на QR-код,
             либо SVG-изображение.
+        :param lazy_qr:
+            Не запрашивать QR-код при инициализации. Платеж возвращается
+            сразу после запроса Init с типом нагрузки `QR_PENDING`,
+            а QR-код запрашивается позже через `get_qr`.
         """
 
         self.__api_client = api_client
         self.__qr_data_type = qr_data_type
+        self.__lazy_qr = lazy_qr
 
     @property
     def qr_data_type(self) -> QrDataType:
@@ -67,6 +77,7 @@ class TinkoffSBPInitializer(PaymentInitializable):
         :return:
             Объект ответа от Тинькофф, содержащий либо URL-адрес
             QR-кода, либо SVG-изображение с QR-кодом..
+            При отложенном получении QR-кода - ответ на запрос Init.
         """
 
         response = self.__api_client.request(
@@ -76,7 +87,21 @@ class TinkoffSBPInitializer(PaymentInitializable):
         )
         self._check_response(response)
 
-        payment_id: str = response.json()['PaymentId']
+        if self.__lazy_qr:
+            return response
+
+        return self.get_qr(response.json()['PaymentId'])
+
+    def get_qr(self, payment_id: str) -> Response:
+        """
+        Получение QR-кода для инициализированного платежа (запрос GetQr).
+
+        :param payment_id: ID платежа в системе банка.
+
+        :return:
+            Объект ответа от Тинькофф, содержащий либо URL-адрес
+            QR-кода, либо SVG-изображение с QR-кодом.
+        """
 
         response = self.__api_client.request(
             method='post',
@@ -90,6 +115,11 @@ class TinkoffSBPInitializer(PaymentInitializable):
 
         return response
 
+    def get_qr_payload_type(self) -> ResponsePaymentInitPayloadType:
+        """Получение типа полезной нагрузки, который вернет запрос GetQr"""
+
+        return self._QR_RETURNING_PARAM_MAP[self.__qr_data_type]
+
     @staticmethod
     def _check_response(response: Response) -> None:
         """Проверка корректности ответа"""
@@ -108,11 +138,16 @@ class TinkoffSBPInitializer(PaymentInitializable):
 
         response_json: dict[str, Any] = response.json()
 
+        if self.__lazy_qr:
+            payload_type, payload = ResponsePaymentInitPayloadType.QR_PENDING, ''
+        else:
+            payload_type, payload = self.get_qr_payload_type(), response_json['Data']
+
         return ResponsePaymentInitDTO(
             order_id=int(response_json['OrderId']),
             payment_id=response_json['PaymentId'],
             payment_strategy=PaymentStrategyType.SBP,
-            payload_type=self._QR_RETURNING_PARAM_MAP[self.__qr_data_type],
-            payload=response_json['Data'],
+            payload_type=payload_type,
+            payload=payload,
             payment_session_lifetime=settings.TINKOFF_PAYMENT_SESSION_LIFETIME,
         )
@@ -1,3 +1,5 @@
+from django.conf import settings
+
 from apps.rent.models import Order
 
 from .enums import (
@@ -39,7 +41,11 @@ class TinkoffPaymentInitializerService:
         self.__init_data_builder = init_data_builder
         self.__allowed_initializers = {
             PaymentStrategyType.CARD: TinkoffPaymentInitializer(self.__api_client),
-            PaymentStrategyType.SBP: TinkoffSBPInitializer(self.__api_client, QrDataType.PAYLOAD),
+            PaymentStrategyType.SBP: TinkoffSBPInitializer(
+                api_client=self.__api_client,
+                qr_data_type=self.get_qr_data_type(),
+                lazy_qr=self.__is_lazy_qr(),
+            ),
         }
 
     def init(
@@ -65,9 +71,35 @@ class TinkoffPaymentInitializerService:
         # Делаем запрос на инициализацию и получаем данные платежа в DTO.
         response = initializer.init(init_data)
         payment_init_dto = initializer.get_data_from_response(response)
+        payment_init_dto.terminal_key = self.__api_client.terminal_key
 
         return payment_init_dto
 
+    @staticmethod
+    def get_qr_data_type() -> QrDataType:
+        """
+        Получение типа QR-кода, запрашиваемого у банка.
+
+        По умолчанию запрашивается короткая ссылка (`PAYLOAD`), а изображение
+        рисуется локально (см. `QrCodeRenderer`). Запросить у банка SVG-изображение
+        можно настройкой `TINKOFF_SBP_QR_DATA_TYPE = 'IMAGE'`.
+        """
+
+        return QrDataType(getattr(settings, 'TINKOFF_SBP_QR_DATA_TYPE', QrDataType.PAYLOAD))
+
+    @staticmethod
+    def __is_lazy_qr() -> bool:
+        """
+        Проверка, что QR-код для оплаты через СБП запрашивается отложенно.
+
+        При `TINKOFF_SBP_LAZY_QR = True` платеж сохраняется сразу после запроса
+        Init, а запрос GetQr выполняется в фоне или при первом чтении
+        платежных данных (см. `SBPQrResolver`). Это убирает один запрос
+        к банку из создания заказа.
+        """
+
+        return getattr(settings, 'TINKOFF_SBP_LAZY_QR', False)
+
     def __get_initializer(
         self,
         payment_strategy: PaymentStrategyType,
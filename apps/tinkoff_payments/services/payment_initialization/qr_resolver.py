@@ -0,0 +1,100 @@
+from typing import Final
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.rent.services.order_status import OrderVersionService
+
+from .enums import ResponsePaymentInitPayloadType
+from .initializers import TinkoffSBPInitializer
+from .payment_initializer_service import TinkoffPaymentInitializerService
+from ..core.terminal_pool import TinkoffTerminalPool
+from ...models import TinkoffPaymentData
+
+
+class SBPQrResolver:
+    """
+    Получение QR-кода для платежей через СБП, инициализированных
+    без него (`TINKOFF_SBP_LAZY_QR = True`).
+
+    QR-код запрашивается фоновой задачей сразу после создания платежа
+    либо при первом чтении платежных данных, если задача еще не успела.
+    Запросы объединяются: перед запросом GetQr обработчик захватывает
+    платеж в общем кэше Django на `TINKOFF_SBP_QR_CLAIM_TTL` секунд.
+    Конкурирующие обработчики не ждут и не держат соединение с БД,
+    а получают платежные данные без QR-кода и повторяют чтение позже.
+    Банку уходит один запрос GetQr на платеж.
+    """
+
+    _CLAIM_KEY_TEMPLATE: Final[str] = 'tinkoff_payments:sbp_qr_claim:{payment_id}'
+    _DEFAULT_CLAIM_TTL: Final[int] = 30
+
+    @classmethod
+    def resolve(cls, payment_data: TinkoffPaymentData) -> TinkoffPaymentData:
+        """
+        Получение QR-кода платежа, если он еще не получен.
+
+        Полученный QR-код сохраняется в платежных данных, а версия заказа
+        увеличивается, чтобы сбросить закэшированные представления без QR-кода.
+        Если QR-код уже запрашивает другой обработчик, платежные данные
+        возвращаются без изменений (см. `is_pending`).
+
+        :param payment_data: Платежные данные. Обновляются на месте.
+
+        :raises TinkoffResponseException: Если банк вернул ошибку.
+
+        :return: Платежные данные.
+        """
+
+        if not cls.is_pending(payment_data):
+            return payment_data
+
+        claim_key = cls._CLAIM_KEY_TEMPLATE.format(payment_id=payment_data.payment_id)
+        claim_ttl = getattr(settings, 'TINKOFF_SBP_QR_CLAIM_TTL', cls._DEFAULT_CLAIM_TTL)
+        if not cache.add(claim_key, 1, timeout=claim_ttl):
+            return payment_data
+
+        try:
+            initializer = cls.__get_initializer(payment_data.terminal_key)
+            response = initializer.get_qr(payment_data.payment_id)
+            payload_type = initializer.get_qr_payload_type()
+            payload = response.json()['Data']
+
+            # QR-код мог сохранить обработчик, чей захват истек, поэтому
+            # сохраняем только поверх платежных данных без QR-кода.
+            is_saved = (
+                TinkoffPaymentData.objects
+                    .filter(pk=payment_data.pk, payload_type=ResponsePaymentInitPayloadType.QR_PENDING)  # noqa: E131
+                    .update(payload_type=payload_type, payload=payload)  # noqa: E131
+            )
+            if is_saved:
+                OrderVersionService.bump([payment_data.order_id])
+        finally:
+            cache.delete(claim_key)
+
+        payment_data.refresh_from_db(fields=['payload_type', 'payload'])
+
+        return payment_data
+
+    @staticmethod
+    def is_pending(payment_data: TinkoffPaymentData) -> bool:
+        """
+        Проверка, что QR-код платежа еще не получен.
+
+        :param payment_data: Платежные данные.
+        """
+
+        return payment_data.payload_type == ResponsePaymentInitPayloadType.QR_PENDING
+
+    @staticmethod
+    def __get_initializer(terminal_key: str) -> TinkoffSBPInitializer:
+        """
+        Получение инициализатора платежей через СБП для запроса GetQr.
+
+        :param terminal_key: Ключ терминала, выдавшего платеж.
+        """
+
+        return TinkoffSBPInitializer(
+            api_client=TinkoffTerminalPool.get_client(terminal_key),
+            qr_data_type=TinkoffPaymentInitializerService.get_qr_data_type(),
+        )
@@ -0,0 +1,16 @@
+"""
+Пакет для локальной отрисовки QR-кодов оплаты через СБП.
+
+Банк по запросу GetQr возвращает короткую ссылку (`QrDataType.PAYLOAD`),
+а изображение QR-кода в SVG или PNG рисуется на нашей стороне
+и кэшируется по содержимому (см. `QrCodeRenderer`).
+
+Для отрисовки нужна библиотека `qrcode` (для PNG - `qrcode[pil]`).
+"""
+
+from .enums import QrImageFormat
+from .renderer import (
+    RenderedQr,
+    QrCodeRenderer,
+)
+from .exceptions import QrRenderingUnavailableException
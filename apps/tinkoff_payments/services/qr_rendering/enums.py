@@ -0,0 +1,17 @@
+from enum import Enum
+
+
+class QrImageFormat(str, Enum):
+    """Форматы изображения QR-кода"""
+
+    SVG = 'svg'
+    PNG = 'png'
+
+    @property
+    def content_type(self) -> str:
+        """MIME-тип изображения"""
+
+        return {
+            QrImageFormat.SVG: 'image/svg+xml',
+            QrImageFormat.PNG: 'image/png',
+        }[self]
@@ -0,0 +1,8 @@
+class QrRenderingUnavailableException(Exception):
+    """Исключение, когда библиотека для отрисовки QR-кодов не установлена"""
+
+    def __init__(self, *args, **kwargs) -> None:
+        """Инициализатор класса"""
+
+        self.message = 'Для отрисовки QR-кодов установите библиотеку qrcode'
+        super().__init__(self.message, *args, **kwargs)
@@ -0,0 +1,246 @@
+import io
+import os
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Final
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from utils.caching import LRUCache
+
+from .enums import QrImageFormat
+from .exceptions import QrRenderingUnavailableException
+
+try:
+    import qrcode
+    from qrcode.image.svg import SvgPathImage
+except ImportError:
+    qrcode = None
+    SvgPathImage = None
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RenderedQr:
+    """
+    Изображение QR-кода.
+
+    :param content: Содержимое изображения.
+    :param image_format: Формат изображения.
+    :param key: Ключ по содержимому QR-кода. Подходит в качестве ETag.
+    """
+
+    content: bytes
+    image_format: QrImageFormat
+    key: str
+
+    @property
+    def content_type(self) -> str:
+        """MIME-тип изображения"""
+
+        return self.image_format.content_type
+
+
+class QrCodeRenderer:
+    """
+    Отрисовка изображений QR-кодов с кэшированием по содержимому.
+
+    Ключ кэша - хэш данных QR-кода и формата изображения, поэтому одинаковые
+    данные всегда дают один и тот же ключ, а устаревание кэша не требуется.
+    Первый уровень - LRU-кэш в памяти процесса размером
+    `TINKOFF_QR_CACHE_SIZE`. Второй (опциональный) - файлы в директории
+    `TINKOFF_QR_CACHE_DIR`, общие для всех процессов. Файловый кэш
+    вспомогательный: ошибки записи только логируются, а файлы старше
+    `TINKOFF_QR_CACHE_MAX_AGE` секунд удаляются (см. `evict_files`).
+    """
+
+    _DEFAULT_CACHE_SIZE: Final[int] = 512
+    _DEFAULT_CACHE_MAX_AGE: Final[int] = 24 * 60 * 60
+    _BOX_SIZE: Final[int] = 10
+    _BORDER: Final[int] = 4
+
+    __local: LRUCache[str, bytes] | None = None
+    __lock = threading.Lock()
+
+    @classmethod
+    def render(cls, data: str, image_format: QrImageFormat) -> RenderedQr:
+        """
+        Получение изображения QR-кода.
+
+        :param data: Данные QR-кода (ссылка на оплату через СБП).
+        :param image_format: Формат изображения.
+
+        :raises QrRenderingUnavailableException: Если библиотека `qrcode` не установлена.
+        """
+
+        key = cls.get_key(data, image_format)
+        local_cache = cls.__get_local()
+
+        content = local_cache.get(key)
+        if content is None:
+            content = cls.__read_file(key, image_format)
+            if content is None:
+                content = cls.__draw(data, image_format)
+                cls.__write_file(key, image_format, content)
+            local_cache.set(key, content)
+
+        return RenderedQr(content=content, image_format=image_format, key=key)
+
+    @staticmethod
+    def get_key(data: str, image_format: QrImageFormat) -> str:
+        """
+        Получение ключа изображения по его содержимому.
+
+        :param data: Данные QR-кода.
+        :param image_format: Формат изображения.
+        """
+
+        return hashlib.sha256(f'{image_format.value}:{data}'.encode()).hexdigest()
+
+    @classmethod
+    def evict_files(cls) -> int:
+        """
+        Удаление устаревших файлов из файлового кэша.
+
+        QR-код нужен только на время платежной сессии, поэтому удаляются
+        файлы старше `TINKOFF_QR_CACHE_MAX_AGE` секунд, а также недописанные
+        временные файлы. Удаленное изображение при необходимости будет
+        отрисовано заново.
+
+        :return: Кол-во удаленных файлов.
+        """
+
+        cache_dir = getattr(settings, 'TINKOFF_QR_CACHE_DIR', None)
+        if cache_dir is None:
+            return 0
+
+        max_age = getattr(settings, 'TINKOFF_QR_CACHE_MAX_AGE', cls._DEFAULT_CACHE_MAX_AGE)
+        expired_at = time.time() - max_age
+
+        evicted_count = 0
+        for path in Path(cache_dir).glob('*/*'):
+            try:
+                if path.stat().st_mtime <= expired_at:
+                    path.unlink()
+                    evicted_count += 1
+            except FileNotFoundError:
+                # Файл удален параллельно другим процессом.
+                continue
+            except OSError as e:
+                logger.warning(f'Не удалось удалить файл кэша QR-кодов {path}: {e}')
+
+        return evicted_count
+
+    @classmethod
+    def __draw(cls, data: str, image_format: QrImageFormat) -> bytes:
+        """Отрисовка изображения QR-кода"""
+
+        if qrcode is None:
+            raise QrRenderingUnavailableException()
+
+        qr = qrcode.QRCode(
+            error_correction=qrcode.constants.ERROR_CORRECT_M,
+            box_size=cls._BOX_SIZE,
+            border=cls._BORDER,
+        )
+        qr.add_data(data)
+        qr.make(fit=True)
+
+        if image_format == QrImageFormat.SVG:
+            image = qr.make_image(image_factory=SvgPathImage)
+        else:
+            image = qr.make_image()
+
+        buffer = io.BytesIO()
+        image.save(buffer)
+
+        return buffer.getvalue()
+
+    @classmethod
+    def __read_file(cls, key: str, image_format: QrImageFormat) -> bytes | None:
+        """Чтение изображения из файлового кэша"""
+
+        path = cls.__get_file_path(key, image_format)
+        if path is None:
+            return None
+
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f'Не удалось прочитать QR-код из файлового кэша: {e}')
+            return None
+
+    @classmethod
+    def __write_file(cls, key: str, image_format: QrImageFormat, content: bytes) -> None:
+        """
+        Запись изображения в файловый кэш.
+
+        Файл пишется во временный и атомарно переименовывается,
+        поэтому параллельные процессы не прочитают недописанный файл.
+        Ошибка записи (например, закончилось место) не мешает отдать
+        уже отрисованное изображение и только логируется.
+        """
+
+        path = cls.__get_file_path(key, image_format)
+        if path is None:
+            return
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        except OSError as e:
+            logger.warning(f'Не удалось записать QR-код в файловый кэш: {e}')
+            return
+
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                tmp_file.write(content)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f'Не удалось записать QR-код в файловый кэш: {e}')
+            cls.__remove_tmp_file(tmp_path)
+        except BaseException:
+            cls.__remove_tmp_file(tmp_path)
+            raise
+
+    @staticmethod
+    def __remove_tmp_file(tmp_path: str) -> None:
+        """Удаление временного файла, если он остался"""
+
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def __get_file_path(key: str, image_format: QrImageFormat) -> Path | None:
+        """Получение пути к файлу изображения либо None, если файловый кэш не настроен"""
+
+        cache_dir = getattr(settings, 'TINKOFF_QR_CACHE_DIR', None)
+        if cache_dir is None:
+            return None
+
+        # Раскладываем файлы по поддиректориям, чтобы не держать их все в одной.
+        return Path(cache_dir) / key[:2] / f'{key}.{image_format.value}'
+
+    @classmethod
+    def __get_local(cls) -> LRUCache[str, bytes]:
+        """Получение локального кэша процесса"""
+
+        if cls.__local is None:
+            with cls.__lock:
+                if cls.__local is None:
+                    cls.__local = LRUCache(
+                        maxsize=getattr(settings, 'TINKOFF_QR_CACHE_SIZE', cls._DEFAULT_CACHE_SIZE),
+                    )
+
+        return cls.__local
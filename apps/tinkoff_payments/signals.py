@@ -0,0 +1,27 @@
+from typing import Any
+
+from django.dispatch import receiver
+from celery.signals import worker_process_init
+from constance.signals import config_updated
+
+from .services.core.settings_snapshot import TinkoffSettings
+from .services.core.client_registry import TinkoffClientRegistry
+
+
+@receiver(config_updated)
+def invalidate_tinkoff_settings(sender: Any, key: str, **kwargs) -> None:
+    """Сброс снимков настроек Тинькофф при изменении настроек в constance"""
+
+    if key.startswith('TINKOFF_'):
+        TinkoffSettings.invalidate()
+
+
+@worker_process_init.connect
+def clear_tinkoff_clients(**kwargs) -> None:
+    """
+    Сброс клиентов API Тинькофф в дочернем процессе воркера Celery.
+
+    Клиенты, созданные до форка, разделяли бы соединения с родительским процессом.
+    """
+
+    TinkoffClientRegistry.clear()
@@ -1,6 +1,7 @@
 import logging
 
 from celery import shared_task
+from django.conf import settings
 from django.db.models import (
     F,
     DateTimeField,
@@ -9,6 +10,11 @@ from django.db.models import (
 from django.utils import timezone
 
 from apps.rent.models.order import Order
+from apps.rent.services.order_status import OrderStatusService
+
+from .models import TinkoffPaymentData
+from .services.payment_initialization.qr_resolver import SBPQrResolver
+from .services.qr_rendering import QrCodeRenderer
 
 
 logger = logging.getLogger(__name__)
@@ -28,10 +34,9 @@ def handle_expired_payment_sessions_task() -> None:
 
     logger.info('Старт проверки истекших заказов')
 
-    expired_orders_count = (
+    expired_orders = (
         Order.objects
-            .select_related('payment_data')  # noqa: E131
-            .filter(
+            .filter(  # noqa: E131
                 status__in=(
                     Order.Status.AWAIT_PAYMENT,
                     Order.Status.AWAIT_RESERVATION,
@@ -45,7 +50,52 @@ def handle_expired_payment_sessions_task() -> None:
                 )
             )
             .filter(expired_at__lte=timezone.localtime())  # noqa: E131
-            .update(status=Order.Status.PAYMENT_SESSION_EXPIRED)  # noqa: E131
+    )
+    expired_orders_count = OrderStatusService.bulk_set_status(
+        queryset=expired_orders,
+        new_status=Order.Status.PAYMENT_SESSION_EXPIRED,
     )
 
     logger.info(f'Кол-во обнаруженных истекших заказов: {expired_orders_count}')
+
+
+@shared_task(bind=True)
+def resolve_sbp_qr_task(self, payment_id: str) -> None:
+    """
+    Задача на получение QR-кода для платежа через СБП, инициализированного
+    без него (`TINKOFF_SBP_LAZY_QR = True`).
+
+    Ставится в очередь после сохранения платежа. Если клиент запросит
+    платежные данные раньше, QR-код будет получен при чтении, а задача
+    завершится без запроса к банку. При ошибке банка задача повторяется.
+
+    :param payment_id: ID платежа в системе банка.
+    """
+
+    payment_data = TinkoffPaymentData.objects.filter(pk=payment_id).first()
+    if payment_data is None or payment_data.payment_session_is_expired():
+        return
+
+    try:
+        SBPQrResolver.resolve(payment_data)
+    except Exception as e:
+        logger.warning(f'Ошибка получения QR-кода для платежа {payment_id}', exc_info=e)
+        raise self.retry(
+            exc=e,
+            countdown=getattr(settings, 'TINKOFF_SBP_QR_RETRY_DELAY', 2),
+            max_retries=getattr(settings, 'TINKOFF_SBP_QR_MAX_RETRIES', 5),
+        )
+
+
+@shared_task
+def evict_qr_cache_files_task() -> None:
+    """
+    Задача на очистку файлового кэша изображений QR-кодов.
+
+    Запускается периодически, если задана настройка `TINKOFF_QR_CACHE_DIR`.
+    Удаляет файлы старше `TINKOFF_QR_CACHE_MAX_AGE` секунд.
+    """
+
+    evicted_count = QrCodeRenderer.evict_files()
+
+    logger.info(f'Кол-во удаленных файлов кэша QR-кодов: {evicted_count}')
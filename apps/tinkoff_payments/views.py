@@ -1,7 +1,6 @@
 import logging
 import traceback
 
-from constance import config
 from django.http import HttpResponse
 
 from rest_framework import status
@@ -11,6 +10,8 @@ from rest_framework.generics import GenericAPIView
 
 from drf_spectacular.utils import extend_schema_view
 
+from apps.rent.services.order_status import OrderStatusContext
+
 from .serializers import (
     SBPPayTestSerializer,
     NotificationRequestSerializer,
@@ -18,7 +19,8 @@ from .serializers import (
 from . import openapi_schema
 from .models import TinkoffPaymentData
 from .services.core.endpoints import TinkoffRoutes
-from .services.core.api_client import TinkoffPaymentsClient
+from .services.core.terminal_pool import TinkoffTerminalPool
+from .services.notifications.verifier import TinkoffNotificationVerifier
 from .services.notifications.handlers.factory import TinkoffNotificationHandlerFactory
 
 
@@ -37,10 +39,18 @@ class NotificationReceiverAPIView(GenericAPIView):
         serializer.is_valid(raise_exception=True)
         notification = serializer.to_dto()
 
+        if not TinkoffNotificationVerifier.verify(request.data):
+            logger.warning(
+                f'Отклонено уведомление с неверной подписью или от чужого терминала\n'
+                f'Данные нотификации: {notification}'
+            )
+            return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+
         try:
             handler = TinkoffNotificationHandlerFactory.create(notification.status)
             if handler is not None:
-                handler.handle(notification)
+                with OrderStatusContext.bind(actor=f'bank:{notification.status}'):
+                    handler.handle(notification)
         except Exception:
             logger.error(
                 f'Ошибка отправки нотификации на обработку\n'
@@ -67,11 +77,14 @@ class SBPPayTestAPIView(GenericAPIView):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        response = TinkoffPaymentsClient(
-            base_url=config.TINKOFF_API_URL,
-            terminal_key=config.TINKOFF_TERMINAL_KEY,
-            password=config.TINKOFF_PASSWORD,
-        ).request(
+        # Тестовый платеж проводится через терминал, выдавший платеж.
+        terminal_key = (
+            TinkoffPaymentData.objects
+                .filter(pk=serializer.data['PaymentId'])  # noqa: E131
+                .values_list('terminal_key', flat=True)  # noqa: E131
+                .first()  # noqa: E131
+        )
+        response = TinkoffTerminalPool.get_client(terminal_key or '').request(
             method='post',
             url_postfix=TinkoffRoutes.SBP_PAY_TEST,
             data=serializer.data,
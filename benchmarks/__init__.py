@@ -0,0 +1,6 @@
+"""
+Замеры производительности.
+
+Каждый модуль запускается отдельно, например:
+`python -m benchmarks.order_pagination`.
+"""
@@ -0,0 +1,230 @@
+"""
+Замер построения тела запроса Init по шаблону против построения целиком.
+
+Сборщики тела запроса зависят от Django (настройки, модель заказа),
+поэтому их сборка словаря повторена здесь без Django:
+- построение целиком, как в `AdvancePaymentDataBuilder` до шаблонов;
+- построение по шаблону из `LRUCache`, как в `TemplatedInitDataBuilder`.
+
+Снимок настроек `TinkoffSettings` читается одинаково в обоих случаях
+и в замер не входит. Результаты обоих построений сверяются.
+
+Запуск: `python -m benchmarks.init_data_builder`.
+"""
+
+import time
+import statistics
+from typing import (
+    Any,
+    Callable,
+)
+from datetime import (
+    datetime,
+    timedelta,
+    timezone,
+)
+from dataclasses import dataclass
+
+from utils.caching import LRUCache
+
+from apps.tinkoff_payments.services.payment_initialization.enums import (
+    Tax,
+    PayType,
+    Taxation,
+    PaymentMethod,
+    PaymentObject,
+    PaymentStrategyType,
+)
+
+
+_BUILDS_COUNT = 10_000
+_ADVANCE_AMOUNT = 500_000
+_FRONTEND_HOST = 'https://example.com'
+_NOTIFICATIONS_URL = 'https://api.example.com/tinkoff/notifications/'
+_PAYMENT_SESSION_LIFETIME = timedelta(minutes=20)
+
+_PAYMENT_TYPE_MAP: dict[PaymentStrategyType, PayType] = {
+    PaymentStrategyType.CARD: PayType.TWO_STAGE,
+    PaymentStrategyType.SBP: PayType.SINGLE_STAGE,
+}
+
+_ORDER_URL_QUERY = (
+    '?Success=${Success}&ErrorCode=${ErrorCode}&Message=${Message}'
+    '&Details=${Details}&Amount=${Amount}&MerchantEmail=${MerchantEmail}'
+    '&MerchantName=${MerchantName}&OrderId=${OrderId}&PaymentId=${PaymentId}'
+    '&TranDate=${TranDate}&BackUrl=${BackUrl}&CompanyName=${CompanyName}'
+    '&EmailReq=${EmailReq}&PhonesReq=${PhonesReq}'
+)
+
+
+@dataclass(frozen=True)
+class _Order:
+    """Данные заказа, которые подставляются в тело запроса"""
+
+    pk: int
+    phone: str
+    name: str
+
+
+@dataclass(frozen=True)
+class _Template:
+    """Шаблон тела запроса, как `_AdvancePaymentTemplate`"""
+
+    body: dict[str, Any]
+    order_url_prefix: str
+    order_url_suffix: str
+    receipt: dict[str, Any]
+    receipt_item: dict[str, Any]
+
+
+def _measure(func: Callable[[], object], repeats: int) -> float:
+    """
+    Медианное время одного построения в микросекундах.
+
+    :param func: Замеряемая функция, выполняющая `_BUILDS_COUNT` построений.
+    :param repeats: Кол-во запусков.
+    """
+
+    timings: list[float] = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started_at) * 1_000_000 / _BUILDS_COUNT)
+
+    return statistics.median(timings)
+
+
+def _build_plain(order: _Order, payment_strategy: PaymentStrategyType, advance_amount: int) -> dict[str, Any]:
+    """Построение тела запроса целиком"""
+
+    now = datetime.now(timezone.utc)
+    now_without_microseconds = datetime(
+        year=now.year, month=now.month,
+        day=now.day, hour=now.hour, minute=now.minute,
+        second=now.second, tzinfo=now.tzinfo,
+    )
+    datetime_expired_iso = (now_without_microseconds + _PAYMENT_SESSION_LIFETIME).isoformat()
+
+    return {
+        'Amount': advance_amount,
+        'OrderId': str(order.pk),
+        'NotificationURL': _NOTIFICATIONS_URL,
+        'PayType': _PAYMENT_TYPE_MAP[payment_strategy].value,
+        'RedirectDueDate': datetime_expired_iso,
+        'SuccessURL': f'{_FRONTEND_HOST}/orders/{order.pk}' + _ORDER_URL_QUERY,
+        'FailURL': f'{_FRONTEND_HOST}/orders/{order.pk}' + _ORDER_URL_QUERY,
+        'Receipt': {
+            'Phone': order.phone,
+            'Taxation': Taxation.USN_INCOME_OUTCOME.value,
+            'Items': [
+                {
+                    'Name': order.name,
+                    'Quantity': 1,
+                    'Amount': advance_amount,
+                    'Price': advance_amount,
+                    'PaymentMethod': PaymentMethod.PREPAYMENT.value,
+                    'PaymentObject': PaymentObject.SERVICE.value,
+                    'Tax': Tax.NONE.value,
+                }
+            ],
+        },
+    }
+
+
+def _compile_template(payment_strategy: PaymentStrategyType, advance_amount: int) -> _Template:
+    """Сборка шаблона тела запроса"""
+
+    return _Template(
+        body={
+            'Amount': advance_amount,
+            'NotificationURL': _NOTIFICATIONS_URL,
+            'PayType': _PAYMENT_TYPE_MAP[payment_strategy].value,
+        },
+        order_url_prefix=f'{_FRONTEND_HOST}/orders/',
+        order_url_suffix=_ORDER_URL_QUERY,
+        receipt={
+            'Taxation': Taxation.USN_INCOME_OUTCOME.value,
+        },
+        receipt_item={
+            'Quantity': 1,
+            'Amount': advance_amount,
+            'Price': advance_amount,
+            'PaymentMethod': PaymentMethod.PREPAYMENT.value,
+            'PaymentObject': PaymentObject.SERVICE.value,
+            'Tax': Tax.NONE.value,
+        },
+    )
+
+
+def _build_templated(
+    templates: LRUCache,
+    order: _Order,
+    payment_strategy: PaymentStrategyType,
+    advance_amount: int,
+) -> dict[str, Any]:
+    """Построение тела запроса по шаблону"""
+
+    key = (_Template, (advance_amount, payment_strategy))
+
+    template = templates.get(key)
+    if template is None:
+        template = _compile_template(payment_strategy, advance_amount)
+        templates.set(key, template)
+
+    expired_at = datetime.now(timezone.utc).replace(microsecond=0) + _PAYMENT_SESSION_LIFETIME
+    order_url = f'{template.order_url_prefix}{order.pk}{template.order_url_suffix}'
+
+    return {
+        **template.body,
+        'OrderId': str(order.pk),
+        'RedirectDueDate': expired_at.isoformat(),
+        'SuccessURL': order_url,
+        'FailURL': order_url,
+        'Receipt': {
+            **template.receipt,
+            'Phone': order.phone,
+            'Items': [
+                {
+                    **template.receipt_item,
+                    'Name': order.name,
+                }
+            ],
+        },
+    }
+
+
+def _bench(repeats: int = 20) -> None:
+    """Сравнение построений тела запроса"""
+
+    orders = [
+        _Order(pk=pk, phone=f'+7900{pk:07d}', name=f'Заказ №{pk}')
+        for pk in range(1, _BUILDS_COUNT + 1)
+    ]
+    templates: LRUCache = LRUCache(maxsize=64)
+
+    for payment_strategy in _PAYMENT_TYPE_MAP:
+        plain = _build_plain(orders[0], payment_strategy, _ADVANCE_AMOUNT)
+        templated = _build_templated(templates, orders[0], payment_strategy, _ADVANCE_AMOUNT)
+        # Время истечения ссылки может различаться на секунду между вызовами.
+        plain.pop('RedirectDueDate'), templated.pop('RedirectDueDate')
+        assert plain == templated
+
+    print(f'Построений: {_BUILDS_COUNT}')
+    for payment_strategy in _PAYMENT_TYPE_MAP:
+        plain_time = _measure(
+            lambda: [_build_plain(order, payment_strategy, _ADVANCE_AMOUNT) for order in orders],
+            repeats,
+        )
+        templated_time = _measure(
+            lambda: [_build_templated(templates, order, payment_strategy, _ADVANCE_AMOUNT) for order in orders],
+            repeats,
+        )
+
+        print(
+            f'{payment_strategy.value:>5}: целиком {plain_time:6.2f} мкс, '
+            f'по шаблону {templated_time:6.2f} мкс на построение'
+        )
+
+
+if __name__ == '__main__':
+    _bench()
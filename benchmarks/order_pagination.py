@@ -0,0 +1,132 @@
+"""
+Замер keyset-пагинации заказов против пагинации по смещению.
+
+Таблица заказов моделируется в SQLite в памяти с тем же индексом
+(`created_at` DESC, `id` DESC), что и `order_created_at_id_idx`.
+Сравнивается время выборки страницы на разной глубине:
+- `LIMIT ... OFFSET ...` (`LimitOffsetPagination`);
+- условие из одного OR `created_at < ... OR (created_at = ... AND id < ...)`;
+- то же условие с границей `created_at <= ...` (`OrderKeysetPagination`).
+
+Условие из одного OR не задает границу поиска по индексу, и индекс
+проходится с начала - медленнее, чем по смещению.
+
+Запуск: `python -m benchmarks.order_pagination`.
+"""
+
+import time
+import random
+import sqlite3
+import statistics
+from typing import Callable
+from datetime import (
+    datetime,
+    timedelta,
+)
+
+
+_ORDERS_COUNT = 200_000
+_PAGE_SIZE = 20
+_DEPTHS = (0, 1_000, 10_000, 100_000, 190_000)
+
+
+def _measure(func: Callable[[], object], repeats: int) -> float:
+    """
+    Медианное время выполнения функции в миллисекундах.
+
+    :param func: Замеряемая функция.
+    :param repeats: Кол-во запусков.
+    """
+
+    timings: list[float] = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started_at) * 1000)
+
+    return statistics.median(timings)
+
+
+def _create_orders(connection: sqlite3.Connection) -> None:
+    """Создание таблицы заказов с индексом для пагинации"""
+
+    connection.execute('CREATE TABLE rent_order (id INTEGER PRIMARY KEY, created_at TEXT NOT NULL)')
+    connection.execute('CREATE INDEX order_created_at_id_idx ON rent_order (created_at DESC, id DESC)')
+
+    # Часть заказов создана в одну секунду, чтобы порядок держался на `id`.
+    started_at = datetime(2024, 1, 1)
+    rows = (
+        (pk, (started_at + timedelta(seconds=pk // 3 + random.randint(0, 1))).isoformat())
+        for pk in range(1, _ORDERS_COUNT + 1)
+    )
+    connection.executemany('INSERT INTO rent_order (id, created_at) VALUES (?, ?)', rows)
+    connection.execute('ANALYZE')
+
+
+def _offset_page(connection: sqlite3.Connection, offset: int) -> list[tuple]:
+    """Страница по смещению"""
+
+    return connection.execute(
+        'SELECT id, created_at FROM rent_order ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?',
+        (_PAGE_SIZE, offset),
+    ).fetchall()
+
+
+def _or_keyset_page(connection: sqlite3.Connection, position: tuple[str, int]) -> list[tuple]:
+    """Страница по курсору с условием из одного OR"""
+
+    created_at, pk = position
+
+    return connection.execute(
+        'SELECT id, created_at FROM rent_order '
+        'WHERE created_at < ? OR (created_at = ? AND id < ?) '
+        'ORDER BY created_at DESC, id DESC LIMIT ?',
+        (created_at, created_at, pk, _PAGE_SIZE + 1),
+    ).fetchall()
+
+
+def _keyset_page(connection: sqlite3.Connection, position: tuple[str, int]) -> list[tuple]:
+    """Страница по курсору (последнему заказу предыдущей страницы), как в `OrderKeysetPagination`"""
+
+    created_at, pk = position
+
+    # Лишний элемент - признак следующей страницы.
+    return connection.execute(
+        'SELECT id, created_at FROM rent_order '
+        'WHERE created_at <= ? AND (created_at < ? OR id < ?) '
+        'ORDER BY created_at DESC, id DESC LIMIT ?',
+        (created_at, created_at, pk, _PAGE_SIZE + 1),
+    ).fetchall()
+
+
+def _bench(repeats: int = 20) -> None:
+    """Сравнение пагинаций на разной глубине"""
+
+    connection = sqlite3.connect(':memory:')
+    _create_orders(connection)
+
+    print(f'Заказов: {_ORDERS_COUNT}, страница: {_PAGE_SIZE}')
+    for depth in _DEPTHS:
+        # Курсор - последний заказ перед страницей на той же глубине.
+        if depth:
+            last_pk, last_created_at = _offset_page(connection, depth - 1)[0]
+            position = (last_created_at, last_pk)
+        else:
+            position = ('9999-12-31', 0)
+
+        assert [row[0] for row in _keyset_page(connection, position)[:_PAGE_SIZE]] == [
+            row[0] for row in _offset_page(connection, depth)
+        ]
+
+        offset_time = _measure(lambda: _offset_page(connection, depth), repeats)
+        or_keyset_time = _measure(lambda: _or_keyset_page(connection, position), repeats)
+        keyset_time = _measure(lambda: _keyset_page(connection, position), repeats)
+
+        print(
+            f'глубина {depth:>7}: OFFSET {offset_time:8.3f} мс, '
+            f'keyset (OR) {or_keyset_time:8.3f} мс, keyset {keyset_time:8.3f} мс'
+        )
+
+
+if __name__ == '__main__':
+    _bench()
@@ -1,7 +1,10 @@
+import weakref
 import requests
+import threading
 from typing import Any
 from typing_extensions import Self
 
+from .hedging import RequestHedger
 from .http_statuses import HTTPStatus
 
 
@@ -15,19 +18,59 @@ class BaseAPIClient:
     Также позволяет реализовать логику авторизации в случае неавторизованного запроса.
     Также позволяет слать запросы в рамках одной сессии, делать настройка по
     умолчанию для сессий и использовать свои кастомные сессии.
+
+    Запросы к идемпотентным маршрутам (`_IDEMPOTENT_ROUTES`) можно дублировать
+    для снижения хвостовых задержек, передав `hedger` (см. `RequestHedger`).
+
+    Долгоживущий клиент может переиспользовать соединения между запросами
+    (`reuse_sessions=True`): каждый поток получает свою сессию, которая
+    живет до вызова `close` либо до завершения потока. Такой клиент можно использовать из нескольких
+    потоков, но не как контекстный менеджер.
+
+    Время ожидания ответа ограничивается параметром `timeout`, чтобы
+    зависший внешний сервис не задерживал вызывающий код бесконечно.
     """
 
     _REQUESTS_THAT_HAVE_BODY = ("post", "put", "putch")
 
-    def __init__(self, base_url: str) -> None:
+    # Маршруты, повторный запрос к которым не меняет состояние внешнего сервиса.
+    # Только их запросы дублируются при включенном `hedger`.
+    _IDEMPOTENT_ROUTES: frozenset[str] = frozenset()
+
+    def __init__(
+        self,
+        base_url: str,
+        hedger: RequestHedger | None = None,
+        reuse_sessions: bool = False,
+        timeout: float | tuple[float, float] | None = None,
+    ) -> None:
         """
         Инициализатор класса.
 
         :param base_url: Базовый URL внешнего сервиса.
+        :param hedger:
+            Объект для дублирования запросов к идемпотентным маршрутам.
+            Если None, запросы не дублируются.
+        :param reuse_sessions:
+            Переиспользовать сессии (и соединения) между запросами вместо
+            одноразовой сессии на запрос. Сессии создаются по одной на поток.
+        :param timeout:
+            Время ожидания ответа в секундах (см. `timeout` в `requests`):
+            общее либо пара из времени подключения и чтения. Если None, не ограничено.
         """
 
         self._base_url = base_url
+        self.__timeout = timeout
         self._session: requests.Session | None = None
+        self.__hedger = hedger
+        self.__reuse_sessions = reuse_sessions
+        self.__thread_local = threading.local()
+        # Сессии потоков для `close`. Ключи слабые, поэтому сессия
+        # завершившегося потока не удерживается и освобождается вместе с ним.
+        self.__thread_sessions: weakref.WeakKeyDictionary[threading.Thread, requests.Session] = (
+            weakref.WeakKeyDictionary()
+        )
+        self.__thread_sessions_lock = threading.Lock()
 
     @property
     def base_url(self) -> str:
@@ -64,17 +107,69 @@ class BaseAPIClient:
         :return: Объект ответа `requests.Response`.
         """
 
+        # Запросы к идемпотентным маршрутам при необходимости дублируем.
+        if self.__hedger is not None and url_postfix in self._IDEMPOTENT_ROUTES:
+            send = self.__hedged_request
+        else:
+            send = self.__request
+
         # Делаем запрос.
-        response = self.__request(method, url_postfix, data, is_json, params, headers, session)
+        response = send(method, url_postfix, data, is_json, params, headers, session)
 
         # Если запрос был неавторизированным, производим авторизационный запрос
         # и повторяем исходный запрос.
         if self._is_unauthorized_request(response):
             self._authorization()
-            response = self.__request(method, url_postfix, data, is_json, params, headers, session)
+            response = send(method, url_postfix, data, is_json, params, headers, session)
 
         return response
 
+    def __hedged_request(
+        self,
+        method: str,
+        url_postfix: str,
+        data: dict[str, Any] | None = None,
+        is_json: bool = True,
+        params: dict[str, Any] | None = None,
+        headers: dict[str, Any] | None = None,
+        session: requests.Session | None = None,
+    ) -> requests.Response:
+        """
+        Отправка запроса с дублированием.
+
+        Исходная попытка выполняется как обычный запрос: в переданной,
+        открытой в контекстном менеджере либо переиспользуемой сессии,
+        поэтому соединения не открываются заново. Дубль выполняется
+        параллельно, а сессии `requests` не потокобезопасны, поэтому
+        для него открывается одноразовая сессия.
+
+        Проигравшая попытка не прерывается: она завершается в фоне
+        (не дольше `timeout`), а ее результат игнорируется.
+        """
+
+        def attempt(attempt_number: int) -> requests.Response:
+            attempt_session = session
+            if attempt_number > 0:
+                attempt_session = requests.Session()
+                self._setup_session(attempt_session)
+
+            try:
+                # Данные копируем: к ним добавляются общие поля и подпись запроса.
+                return self.__request(
+                    method,
+                    url_postfix,
+                    dict(data) if data is not None else None,
+                    is_json,
+                    dict(params) if params is not None else None,
+                    dict(headers) if headers is not None else None,
+                    attempt_session,
+                )
+            finally:
+                if attempt_number > 0:
+                    attempt_session.close()
+
+        return self.__hedger.execute(url_postfix, attempt)
+
     def __request(
         self,
         method: str,
@@ -121,6 +216,10 @@ class BaseAPIClient:
         # контекстного менеджера __enter__ и __exit__.
         current_session = session or self._session
 
+        # Долгоживущий клиент использует сессию текущего потока.
+        if current_session is None and self.__reuse_sessions:
+            current_session = self.__get_thread_session()
+
         # Если не было предоставлено сессии от пользователя или ранее
         # инициализированной сессии, создадим одноразовую сессию для запроса.
         is_onetime_session = False
@@ -129,13 +228,40 @@ class BaseAPIClient:
             self._setup_session(current_session)
             is_onetime_session = True
 
-        response = current_session.send(request.prepare())
-
-        if is_onetime_session:
-            current_session.close()
+        try:
+            response = current_session.send(request.prepare(), timeout=self.__timeout)
+        finally:
+            if is_onetime_session:
+                current_session.close()
 
         return response
 
+    def close(self) -> None:
+        """Закрытие переиспользуемых сессий всех потоков"""
+
+        with self.__thread_sessions_lock:
+            thread_sessions = list(self.__thread_sessions.values())
+            self.__thread_sessions = weakref.WeakKeyDictionary()
+            self.__thread_local = threading.local()
+
+        for thread_session in thread_sessions:
+            thread_session.close()
+
+    def __get_thread_session(self) -> requests.Session:
+        """Получение переиспользуемой сессии текущего потока"""
+
+        thread_local = self.__thread_local
+        thread_session: requests.Session | None = getattr(thread_local, 'session', None)
+        if thread_session is None:
+            thread_session = requests.Session()
+            self._setup_session(thread_session)
+            thread_local.session = thread_session
+
+            with self.__thread_sessions_lock:
+                self.__thread_sessions[threading.current_thread()] = thread_session
+
+        return thread_session
+
     def _authorization(self) -> None:
         """Метод для проведения авторизации во внешнем сервисе"""
 
@@ -0,0 +1,293 @@
+import math
+import time
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import (
+    Callable,
+    TypeVar,
+)
+from concurrent.futures import (
+    wait,
+    Future,
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+)
+
+
+logger = logging.getLogger(__name__)
+
+_R = TypeVar('_R')
+
+
+@dataclass(frozen=True)
+class HedgingPolicy:
+    """
+    Настройки дублирования (хеджирования) запросов.
+
+    :param percentile:
+        Перцентиль времени ответа, после которого отправляется
+        дублирующий запрос. Например, 0.95 - дубль уходит только для 5%
+        самых медленных запросов.
+    :param default_delay: Задержка дубля в секундах, пока не набрано `min_samples` замеров.
+    :param min_delay: Минимальная задержка дубля в секундах.
+    :param max_delay: Максимальная задержка дубля в секундах.
+    :param window: Кол-во последних замеров, по которым считается перцентиль.
+    :param min_samples: Минимальное кол-во замеров для расчета перцентиля.
+    :param max_workers: Кол-во потоков для выполнения попыток.
+    :param log_every: Раз в сколько запросов писать статистику в лог. 0 - не писать.
+    """
+
+    percentile: float = 0.95
+    default_delay: float = 0.5
+    min_delay: float = 0.05
+    max_delay: float = 5.0
+    window: int = 200
+    min_samples: int = 20
+    max_workers: int = 16
+    log_every: int = 100
+
+
+@dataclass(frozen=True)
+class HedgingStats:
+    """
+    Статистика дублирования запросов к маршруту.
+
+    :param requests: Кол-во запросов.
+    :param hedged: Кол-во запросов, для которых был отправлен дубль.
+    :param hedge_wins: Кол-во запросов, в которых дубль ответил первым.
+    :param delay: Текущая задержка дубля в секундах.
+    """
+
+    requests: int
+    hedged: int
+    hedge_wins: int
+    delay: float
+
+    @property
+    def hedge_rate(self) -> float:
+        """Доля запросов, для которых был отправлен дубль"""
+
+        return self.hedged / self.requests if self.requests else 0.0
+
+    @property
+    def hedge_win_rate(self) -> float:
+        """Доля дублей, ответивших раньше исходного запроса"""
+
+        return self.hedge_wins / self.hedged if self.hedged else 0.0
+
+
+class _RouteTracker:
+    """Замеры времени ответа и счетчики дублирования для одного маршрута"""
+
+    def __init__(self, policy: HedgingPolicy) -> None:
+        """
+        Инициализатор класса.
+
+        :param policy: Настройки дублирования.
+        """
+
+        self.__policy = policy
+        self.__latencies: deque[float] = deque(maxlen=policy.window)
+        self.__lock = threading.Lock()
+        self.__requests = 0
+        self.__hedged = 0
+        self.__hedge_wins = 0
+
+    def get_delay(self) -> float:
+        """Получение задержки дубля по перцентилю времени ответа"""
+
+        with self.__lock:
+            if len(self.__latencies) < self.__policy.min_samples:
+                delay = self.__policy.default_delay
+            else:
+                latencies = sorted(self.__latencies)
+                index = min(math.ceil(self.__policy.percentile * len(latencies)) - 1, len(latencies) - 1)
+                delay = latencies[max(index, 0)]
+
+        return min(max(delay, self.__policy.min_delay), self.__policy.max_delay)
+
+    def record(self, latency: float, hedged: bool, hedge_won: bool) -> int:
+        """
+        Учет выполненного запроса.
+
+        :param latency:
+            Время ответа исходной попытки в секундах. Если исходная попытка
+            была отменена, передается время до отмены (оценка снизу).
+        :param hedged: Был ли отправлен дубль.
+        :param hedge_won: Ответил ли дубль первым.
+
+        :return: Общее кол-во учтенных запросов.
+        """
+
+        with self.__lock:
+            self.__latencies.append(latency)
+            self.__requests += 1
+            self.__hedged += hedged
+            self.__hedge_wins += hedge_won
+
+            return self.__requests
+
+    def get_stats(self) -> HedgingStats:
+        """Получение статистики дублирования"""
+
+        delay = self.get_delay()
+
+        with self.__lock:
+            return HedgingStats(
+                requests=self.__requests,
+                hedged=self.__hedged,
+                hedge_wins=self.__hedge_wins,
+                delay=delay,
+            )
+
+
+class RequestHedger:
+    """
+    Дублирование запросов для снижения хвостовых задержек.
+
+    Подходит только для идемпотентных запросов. Если исходная попытка
+    не ответила за время, равное заданному перцентилю времени ответа
+    маршрута, отправляется вторая попытка. Используется первый успешный
+    ответ, а результат проигравшей попытки игнорируется: если она еще
+    не начата, она снимается с очереди, иначе завершается в фоне.
+
+    Экземпляр хранит замеры и статистику маршрутов и должен
+    переиспользоваться между запросами.
+    """
+
+    def __init__(self, policy: HedgingPolicy | None = None) -> None:
+        """
+        Инициализатор класса.
+
+        :param policy: Настройки дублирования. По умолчанию `HedgingPolicy()`.
+        """
+
+        self.__policy = policy or HedgingPolicy()
+        self.__trackers: dict[str, _RouteTracker] = {}
+        self.__lock = threading.Lock()
+        self.__executor: ThreadPoolExecutor | None = None
+
+    @property
+    def policy(self) -> HedgingPolicy:
+        """Настройки дублирования"""
+
+        return self.__policy
+
+    def execute(
+        self,
+        route: str,
+        attempt: Callable[[int], _R],
+    ) -> _R:
+        """
+        Выполнение запроса с дублированием.
+
+        :param route: Маршрут запроса. Замеры и статистика ведутся по маршрутам.
+        :param attempt:
+            Функция одной попытки запроса, принимающая номер попытки
+            (0 - исходная, 1 - дубль). Вызывается в отдельном потоке
+            и должна быть безопасна для параллельного вызова. Начатая попытка
+            не прерывается, поэтому ее время должно быть ограничено (например,
+            таймаутом запроса).
+
+        :raises Exception: Ошибка последней попытки, если ни одна не завершилась успешно.
+
+        :return: Результат первой успешной попытки.
+        """
+
+        tracker = self.__get_tracker(route)
+        executor = self.__get_executor()
+
+        started_at = time.monotonic()
+        primary = executor.submit(attempt, 0)
+
+        done, _ = wait([primary], timeout=tracker.get_delay())
+        if done:
+            self.__record(route, tracker, time.monotonic() - started_at, hedged=False, hedge_won=False)
+            return primary.result()
+
+        hedge = executor.submit(attempt, 1)
+        pending = {primary, hedge}
+        winner: Future | None = None
+        error: BaseException | None = None
+        primary_latency: float | None = None
+
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future is primary:
+                    primary_latency = time.monotonic() - started_at
+
+                if future.exception() is None:
+                    winner = future
+                    break
+
+                error = future.exception()
+
+        # Проигравшую попытку снимаем с очереди, если она еще не начата.
+        # Начатая завершится в фоне, ее результат игнорируется.
+        for future in pending:
+            future.cancel()
+
+        if primary_latency is None:
+            primary_latency = time.monotonic() - started_at
+
+        self.__record(route, tracker, primary_latency, hedged=True, hedge_won=winner is hedge)
+
+        if winner is None:
+            raise error
+
+        return winner.result()
+
+    def get_stats(self) -> dict[str, HedgingStats]:
+        """Получение статистики дублирования по маршрутам"""
+
+        with self.__lock:
+            trackers = dict(self.__trackers)
+
+        return {route: tracker.get_stats() for route, tracker in trackers.items()}
+
+    def __record(
+        self,
+        route: str,
+        tracker: _RouteTracker,
+        latency: float,
+        hedged: bool,
+        hedge_won: bool,
+    ) -> None:
+        """Учет запроса и периодическая запись статистики в лог"""
+
+        requests_count = tracker.record(latency, hedged, hedge_won)
+
+        log_every = self.__policy.log_every
+        if log_every and requests_count % log_every == 0:
+            stats = tracker.get_stats()
+            logger.info(
+                f'Дублирование запросов {route}: запросов={stats.requests}, '
+                f'дублей={stats.hedge_rate:.1%}, побед дублей={stats.hedge_win_rate:.1%}, '
+                f'задержка={stats.delay:.3f}s'
+            )
+
+    def __get_tracker(self, route: str) -> _RouteTracker:
+        """Получение замеров маршрута"""
+
+        with self.__lock:
+            tracker = self.__trackers.get(route)
+            if tracker is None:
+                tracker = self.__trackers[route] = _RouteTracker(self.__policy)
+
+        return tracker
+
+    def __get_executor(self) -> ThreadPoolExecutor:
+        """Получение пула потоков для попыток"""
+
+        if self.__executor is None:
+            with self.__lock:
+                if self.__executor is None:
+                    self.__executor = ThreadPoolExecutor(
+                        max_workers=self.__policy.max_workers,
+                        thread_name_prefix='request-hedger',
+                    )
+
+        return self.__executor
@@ -0,0 +1,4 @@
+from .lru_cache import (
+    LRUCache,
+    CacheStats,
+)
@@ -0,0 +1,131 @@
+import time
+import threading
+from typing import (
+    Any,
+    Generic,
+    TypeVar,
+    Hashable,
+)
+from dataclasses import dataclass
+from collections import OrderedDict
+
+
+_K = TypeVar('_K', bound=Hashable)
+_V = TypeVar('_V')
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """
+    Статистика использования кэша.
+
+    :param hits: Кол-во попаданий.
+    :param misses: Кол-во промахов.
+    :param size: Текущее кол-во элементов.
+    """
+
+    hits: int
+    misses: int
+    size: int
+
+    @property
+    def hit_rate(self) -> float:
+        """Доля попаданий в кэш"""
+
+        total = self.hits + self.misses
+
+        return self.hits / total if total else 0.0
+
+
+class LRUCache(Generic[_K, _V]):
+    """
+    Потокобезопасный LRU-кэш в памяти процесса.
+
+    При переполнении вытесняются давно не использованные элементы.
+    Опционально элементы устаревают через `ttl` секунд.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None) -> None:
+        """
+        Инициализатор класса.
+
+        :param maxsize: Максимальное кол-во элементов в кэше.
+        :param ttl: Время жизни элемента в секундах. Если None, элементы не устаревают.
+        """
+
+        self.__maxsize = maxsize
+        self.__ttl = ttl
+        self.__data: OrderedDict[_K, tuple[float | None, _V]] = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+    def get(self, key: _K, default: Any = None) -> _V | Any:
+        """
+        Получение элемента из кэша.
+
+        :param key: Ключ элемента.
+        :param default: Значение, если элемента нет в кэше.
+        """
+
+        with self.__lock:
+            item = self.__data.get(key, self._MISSING)
+            if item is self._MISSING or self.__is_expired(item[0]):
+                if item is not self._MISSING:
+                    del self.__data[key]
+                self.__misses += 1
+                return default
+
+            self.__data.move_to_end(key)
+            self.__hits += 1
+
+            return item[1]
+
+    def set(self, key: _K, value: _V) -> None:
+        """
+        Сохранение элемента в кэш.
+
+        :param key: Ключ элемента.
+        :param value: Значение элемента.
+        """
+
+        expires_at = time.monotonic() + self.__ttl if self.__ttl is not None else None
+
+        with self.__lock:
+            self.__data[key] = (expires_at, value)
+            self.__data.move_to_end(key)
+
+            while len(self.__data) > self.__maxsize:
+                self.__data.popitem(last=False)
+
+    def delete(self, key: _K) -> None:
+        """
+        Удаление элемента из кэша.
+
+        :param key: Ключ элемента.
+        """
+
+        with self.__lock:
+            self.__data.pop(key, None)
+
+    def clear(self) -> None:
+        """Очистка кэша и статистики"""
+
+        with self.__lock:
+            self.__data.clear()
+            self.__hits = 0
+            self.__misses = 0
+
+    def get_stats(self) -> CacheStats:
+        """Получение статистики использования кэша"""
+
+        with self.__lock:
+            return CacheStats(hits=self.__hits, misses=self.__misses, size=len(self.__data))
+
+    @staticmethod
+    def __is_expired(expires_at: float | None) -> bool:
+        """Проверка, устарел ли элемент"""
+
+        return expires_at is not None and expires_at <= time.monotonic()
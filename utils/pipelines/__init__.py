@@ -1,3 +1,15 @@
 from .pipeline import Pipeline
-from .pipe_like import PipeLike
+from .executor import PipelineExecutor
+from .pipe_like import (
+    PipeLike,
+    ProcessablePipe,
+)
 from .simple_pipe import SimplePipe
+from .async_pipeline import AsyncPipeline
+from .async_pipe_like import AsyncPipeLike
+from .instrumentation import (
+    PipeMetrics,
+    QueryCounter,
+    PipeMetricsHook,
+    LoggingPipeMetricsHook,
+)
@@ -0,0 +1,27 @@
+from abc import (
+    ABC,
+    abstractmethod,
+)
+from typing import (
+    TypeVar,
+    Generic,
+)
+
+
+_T = TypeVar('_T')
+
+
+class AsyncPipeLike(Generic[_T], ABC):
+    """Интерфейс для асинхронного шага в пайплайне"""
+
+    @abstractmethod
+    async def process(self, data: _T) -> _T:
+        """
+        Выполнение полезной работы шага.
+
+        :param data: Обрабатываемые данные.
+
+        :return: Данные для следующего шага.
+        """
+
+        raise NotImplementedError()
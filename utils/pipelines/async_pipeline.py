@@ -0,0 +1,131 @@
+import asyncio
+import functools
+from concurrent.futures import Executor
+from typing import (
+    TypeVar,
+    Iterable,
+)
+from typing_extensions import Self
+
+from .pipe_like import ProcessablePipe
+from .async_pipe_like import AsyncPipeLike
+from .exceptions import PipeTimeoutException
+
+
+_T = TypeVar('_T')
+
+
+class AsyncPipeline(AsyncPipeLike[_T]):
+    """
+    Класс асинхронного пайплайна.
+
+    Может содержать как асинхронные шаги (`AsyncPipeLike`), так и обычные
+    (`ProcessablePipe`). Обычные шаги выполняются через `process` в пуле
+    потоков, чтобы не блокировать цикл событий.
+
+    Для каждого шага можно задать время выполнения. По его истечении
+    ожидание шага отменяется и выбрасывается `PipeTimeoutException`.
+    Синхронный шаг при этом не прерывается, а дорабатывает в своем потоке,
+    т.к. поток нельзя остановить извне.
+
+    Отмена задачи, выполняющей пайплайн, отменяет ожидание текущего шага,
+    и следующие шаги не запускаются.
+    """
+
+    def __init__(
+        self,
+        executor: Executor | None = None,
+        timeout: float | None = None,
+    ) -> None:
+        """
+        Инициализатор класса.
+
+        :param executor: Пул для синхронных шагов. По умолчанию пул цикла событий.
+        :param timeout: Время выполнения шага по умолчанию в секундах.
+        """
+
+        self.__executor = executor
+        self.__timeout = timeout
+        self.__pipes: list[tuple[ProcessablePipe | AsyncPipeLike, float | None]] = []
+
+    def pipe(self, new_pipe: ProcessablePipe | AsyncPipeLike, timeout: float | None = None) -> Self:
+        """
+        Добавление нового шага в пайплайн.
+
+        :param new_pipe: Новый шаг для пайплайна.
+        :param timeout: Время выполнения шага. По умолчанию время пайплайна.
+        """
+
+        self.__pipes.append((new_pipe, timeout if timeout is not None else self.__timeout))
+
+        return self
+
+    async def process(self, data: _T) -> _T:
+        """
+        Выполнение всех шагов пайплайна по очереди.
+
+        :param data: Обрабатываемые данные.
+
+        :return: Результат последнего шага.
+        """
+
+        for pipe, timeout in self.__pipes:
+            data = await self.run_pipe(pipe, data, timeout)
+
+        return data
+
+    async def process_many(
+        self,
+        items: Iterable[_T],
+        concurrency: int,
+    ) -> list[_T | BaseException]:
+        """
+        Параллельная обработка нескольких наборов данных в одном цикле событий.
+
+        Ошибка обработки одного набора не прерывает обработку остальных.
+
+        :param items: Наборы данных для обработки.
+        :param concurrency: Максимальное кол-во одновременно обрабатываемых наборов.
+
+        :return: Результаты либо исключения в порядке входных данных.
+        """
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def process_item(item: _T) -> _T:
+            async with semaphore:
+                return await self.process(item)
+
+        return await asyncio.gather(
+            *(process_item(item) for item in items),
+            return_exceptions=True,
+        )
+
+    async def run_pipe(
+        self,
+        pipe: ProcessablePipe | AsyncPipeLike,
+        data: _T,
+        timeout: float | None = None,
+    ) -> _T:
+        """
+        Выполнение одного шага.
+
+        :param pipe: Шаг пайплайна.
+        :param data: Обрабатываемые данные.
+        :param timeout: Время выполнения шага в секундах.
+
+        :return: Результат шага.
+        """
+
+        if isinstance(pipe, AsyncPipeLike):
+            awaitable = pipe.process(data)
+        else:
+            awaitable = asyncio.get_running_loop().run_in_executor(
+                self.__executor,
+                functools.partial(pipe.process, data),
+            )
+
+        try:
+            return await asyncio.wait_for(awaitable, timeout)
+        except asyncio.TimeoutError as e:
+            raise PipeTimeoutException(pipe, timeout) from e
@@ -1,10 +1,10 @@
-from .pipe_like import PipeLike
+from .pipe_like import ProcessablePipe
 
 
 class PipeProcessException(Exception):
     """Исключение при работе шага"""
 
-    def __init__(self, pipe: PipeLike, message: str = '', *args, **kwargs) -> None:
+    def __init__(self, pipe: ProcessablePipe, message: str = '', *args, **kwargs) -> None:
         """
         Инициализатор класса.
 
@@ -16,3 +16,26 @@ class PipeProcessException(Exception):
             f'Ошибка обработки данных на шаге {pipe.__class__.__name__}\n'
             f'Детали: {message}'
         )
+
+
+class PipeTransientException(PipeProcessException):
+    """
+    Исключение при временной ошибке шага.
+
+    Например, при сбое внешнего сервиса. Шаг можно выполнить повторно.
+    """
+
+
+class PipeTimeoutException(PipeProcessException):
+    """Исключение при превышении времени выполнения шага"""
+
+    def __init__(self, pipe, timeout: float, *args, **kwargs) -> None:
+        """
+        Инициализатор класса.
+
+        :param pipe: Шаг пайплайна, который не уложился во время.
+        :param timeout: Допустимое время выполнения шага в секундах.
+        """
+
+        self.timeout = timeout
+        super().__init__(pipe, f'Шаг не выполнен за {timeout} сек.', *args, **kwargs)
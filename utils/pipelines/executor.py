@@ -0,0 +1,112 @@
+import time
+from typing import (
+    Type,
+    Generic,
+    TypeVar,
+    Iterable,
+)
+
+from .pipe_like import ProcessablePipe
+from .instrumentation import (
+    PipeMetrics,
+    QueryCounter,
+    PipeMetricsHook,
+)
+
+
+_T = TypeVar('_T')
+
+
+class PipelineExecutor(Generic[_T]):
+    """
+    Исполнитель шагов пайплайна в цикле.
+
+    В отличие от запуска через `invoke`, где каждый шаг вызывает следующий,
+    шаги выполняются по очереди через `ProcessablePipe.process`. Глубина стека
+    не зависит от длины пайплайна, а исключения шагов пробрасываются как есть.
+
+    Для каждого шага замеряется реальное и процессорное время и,
+    при наличии счетчика, кол-во запросов к БД. Метрики передаются
+    в `PipeMetricsHook`.
+
+    Объект исполнителя не хранит состояние запуска и может
+    использоваться из нескольких потоков одновременно.
+    """
+
+    def __init__(
+        self,
+        metrics_hook: PipeMetricsHook | None = None,
+        query_counter_class: Type[QueryCounter] | None = None,
+    ) -> None:
+        """
+        Инициализатор класса.
+
+        :param metrics_hook: Получатель метрик шагов. Если None, метрики не собираются.
+        :param query_counter_class: Класс счетчика запросов к БД.
+        """
+
+        self.__metrics_hook = metrics_hook
+        self.__query_counter_class = query_counter_class
+
+    def execute(self, pipes: Iterable[ProcessablePipe[_T]], data: _T) -> _T:
+        """
+        Выполнение шагов по очереди.
+
+        :param pipes: Шаги в порядке выполнения.
+        :param data: Обрабатываемые данные.
+
+        :return: Результат последнего шага.
+        """
+
+        for pipe in pipes:
+            data = self.execute_pipe(pipe, data)
+
+        return data
+
+    def execute_pipe(self, pipe: ProcessablePipe[_T], data: _T) -> _T:
+        """
+        Выполнение одного шага с замером метрик.
+
+        :param pipe: Шаг пайплайна.
+        :param data: Обрабатываемые данные.
+
+        :return: Результат шага.
+        """
+
+        if self.__metrics_hook is None:
+            return pipe.process(data)
+
+        query_counter = (
+            self.__query_counter_class()
+            if self.__query_counter_class is not None
+            else None
+        )
+        error: BaseException | None = None
+        wall_started_at = time.perf_counter()
+        cpu_started_at = time.thread_time()
+
+        try:
+            if query_counter is not None:
+                with query_counter:
+                    return pipe.process(data)
+
+            return pipe.process(data)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self.__metrics_hook.on_pipe_executed(
+                PipeMetrics(
+                    pipe_name=self.get_pipe_name(pipe),
+                    wall_time=time.perf_counter() - wall_started_at,
+                    cpu_time=time.thread_time() - cpu_started_at,
+                    db_queries=query_counter.count if query_counter is not None else None,
+                    error=error,
+                )
+            )
+
+    @staticmethod
+    def get_pipe_name(pipe: ProcessablePipe) -> str:
+        """Получение названия шага для метрик"""
+
+        return pipe.__class__.__name__
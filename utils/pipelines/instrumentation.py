@@ -0,0 +1,104 @@
+import logging
+from abc import (
+    ABC,
+    abstractmethod,
+)
+from dataclasses import dataclass
+from typing_extensions import Self
+
+
+@dataclass(frozen=True)
+class PipeMetrics:
+    """
+    Метрики выполнения шага пайплайна.
+
+    :param pipe_name: Название шага.
+    :param wall_time: Реальное время выполнения в секундах.
+    :param cpu_time: Процессорное время потока в секундах.
+    :param db_queries: Кол-во запросов к БД либо None, если не подсчитывалось.
+    :param error: Исключение, если шаг завершился с ошибкой.
+    """
+
+    pipe_name: str
+    wall_time: float
+    cpu_time: float
+    db_queries: int | None = None
+    error: BaseException | None = None
+
+    @property
+    def succeeded(self) -> bool:
+        """Шаг выполнен успешно"""
+
+        return self.error is None
+
+
+class PipeMetricsHook(ABC):
+    """Интерфейс для получателей метрик выполнения шагов пайплайна"""
+
+    @abstractmethod
+    def on_pipe_executed(self, metrics: PipeMetrics) -> None:
+        """
+        Обработка метрик выполненного шага.
+
+        Вызывается как после успешного выполнения шага, так и после ошибки.
+
+        :param metrics: Метрики выполнения шага.
+        """
+
+        raise NotImplementedError()
+
+
+class LoggingPipeMetricsHook(PipeMetricsHook):
+    """Запись метрик выполнения шагов в лог"""
+
+    def __init__(self, logger: logging.Logger | None = None) -> None:
+        """
+        Инициализатор класса.
+
+        :param logger: Логгер для записи метрик. По умолчанию логгер модуля.
+        """
+
+        self.__logger = logger or logging.getLogger(__name__)
+
+    def on_pipe_executed(self, metrics: PipeMetrics) -> None:
+        """
+        Запись метрик шага в лог.
+
+        :param metrics: Метрики выполнения шага.
+        """
+
+        self.__logger.info(
+            f'Шаг {metrics.pipe_name}: '
+            f'{"успешно" if metrics.succeeded else "ошибка"}, '
+            f'wall={metrics.wall_time:.4f}s, cpu={metrics.cpu_time:.4f}s, '
+            f'db_queries={metrics.db_queries}'
+        )
+
+
+class QueryCounter(ABC):
+    """
+    Интерфейс счетчика запросов к БД.
+
+    Используется как контекстный менеджер вокруг выполнения шага.
+    Сам пакет не зависит от конкретной БД или ORM, поэтому реализация
+    передается извне.
+    """
+
+    @abstractmethod
+    def __enter__(self) -> Self:
+        """Начало подсчета запросов"""
+
+        raise NotImplementedError()
+
+    @abstractmethod
+    def __exit__(self, *args, **kwargs) -> None:
+        """Окончание подсчета запросов"""
+
+        raise NotImplementedError()
+
+    @property
+    @abstractmethod
+    def count(self) -> int:
+        """Кол-во выполненных запросов"""
+
+        raise NotImplementedError()
@@ -11,7 +11,26 @@ from typing import (
 _T = TypeVar('_T')
 
 
-class PipeLike(Generic[_T], ABC):
+class ProcessablePipe(Generic[_T], ABC):
+    """
+    Интерфейс для шага, выполняемого исполнителем (`PipelineExecutor`,
+    `AsyncPipeline`), который сам запускает шаги по очереди.
+    """
+
+    @abstractmethod
+    def process(self, data: _T) -> _T:
+        """
+        Выполнение полезной работы шага без запуска следующих шагов.
+
+        :param data: Обрабатываемые данные.
+
+        :return: Данные для следующего шага.
+        """
+
+        raise NotImplementedError()
+
+
+class PipeLike(ProcessablePipe[_T]):
     """Интерфейс для шага в пайплайне"""
 
     @abstractmethod
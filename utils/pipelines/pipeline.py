@@ -1,6 +1,7 @@
 from typing import TypeVar
 from typing_extensions import Self
 
+from .executor import PipelineExecutor
 from .pipe_like import PipeLike
 from .simple_pipe import SimplePipe
 
@@ -9,11 +10,21 @@ _T = TypeVar('_T')
 
 
 class Pipeline(PipeLike[_T]):
-    """Класс пайплайна"""
+    """
+    Класс пайплайна.
 
-    def __init__(self) -> None:
-        """Инициализатор класса"""
+    Шаги выполняются в цикле через `PipelineExecutor`, поэтому глубина
+    стека не зависит от кол-ва шагов.
+    """
 
+    def __init__(self, executor: PipelineExecutor | None = None) -> None:
+        """
+        Инициализатор класса.
+
+        :param executor: Исполнитель шагов. По умолчанию без сбора метрик.
+        """
+
+        self.__executor = executor or PipelineExecutor()
         self.__pipes: list[PipeLike] = []
         self.__terminate: PipeLike = SimplePipe(lambda data: None)
 
@@ -44,8 +55,19 @@ class Pipeline(PipeLike[_T]):
         :param data: Обрабатываемые данные.
         """
 
-        first_pipe = self.__pipes[0] if len(self.__pipes) > 0 else self.__terminate
-        first_pipe.invoke(data)
+        # Терминатор запускает следующий за пайплайном шаг, если он есть.
+        self.__terminate.invoke(self.process(data))
+
+    def process(self, data: _T) -> _T:
+        """
+        Выполнение всех шагов пайплайна.
+
+        :param data: Обрабатываемые данные.
+
+        :return: Результат последнего шага.
+        """
+
+        return self.__executor.execute(self.__pipes, data)
 
     def set_next(self, next_pipe: PipeLike) -> None:
         """
@@ -30,13 +30,26 @@ class SimplePipe(PipeLike[_T]):
         :param data: Обрабатываемые данные.
         """
 
+        self.process(data)
+
+        if self.__next is not None:
+            self.__next.invoke(data)
+
+    def process(self, data: _T) -> _T:
+        """
+        Выполнение действия шага.
+
+        :param data: Обрабатываемые данные.
+
+        :return: Те же данные для следующего шага.
+        """
+
         try:
             self.__action(data)
         except Exception as e:
             raise PipeProcessException(self) from e
-        else:
-            if self.__next is not None:
-                self.__next.invoke(data)
+
+        return data
 
     def set_next(self, next_pipe: PipeLike) -> None:
         """